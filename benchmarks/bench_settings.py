@@ -0,0 +1,32 @@
+"""
+Django settings for load tests
+
+The project settings, with a local SQLite database, the LLM pointed at the
+stub server and Server-Timing headers on chat responses. Overridable through
+environment variables so the load generator can start servers with them.
+"""
+
+import os
+import tempfile
+
+from tmcm.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ["*"]
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(tempfile.gettempdir(), "sahayak_bench.sqlite3"),
+    }
+}
+
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "stub")
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "http://127.0.0.1:9000")
+WELFARE_DATASET_PATH = os.environ.get(
+    "WELFARE_DATASET_PATH", os.path.join(tempfile.gettempdir(), "sahayak_bench_kb.json")
+)
+
+SERVER_TIMING_HEADER = True
+KB_RELOAD_CHECK_INTERVAL = 0
+RESPONSE_CACHE_BACKEND = os.environ.get("RESPONSE_CACHE_BACKEND", "local") or None
@@ -0,0 +1,399 @@
+"""
+Open-loop load generator for the chat API
+
+Replays benchmarks/corpus.jsonl (mixed citizen/employee/leader questions in
+English, Hindi and Marathi) at a fixed arrival rate, so a slow server builds a
+queue instead of slowing the generator down, and reports throughput, latency
+percentiles, errors, per-persona latency and the per-stage breakdown from the
+Server-Timing header (set SERVER_TIMING_HEADER = True, as bench_settings does).
+
+Against a running server:
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --rps 20 --duration 30
+
+Comparing deployments (starts the stub LLM and each server itself):
+    python benchmarks/load_test.py --matrix wsgi:1,wsgi:4,asgi:1,asgi:4 \\
+        --start-stub --rps 50 --duration 30
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from synthetic_kb import write_kb
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+DEFAULT_CORPUS = BENCH_DIR / "corpus.jsonl"
+
+SERVER_COMMANDS = {
+    "wsgi": [
+        "gunicorn",
+        "tmcm.wsgi:application",
+        "--workers",
+        "{workers}",
+        "--threads",
+        "{threads}",
+        "--bind",
+        "127.0.0.1:{port}",
+    ],
+    "asgi": [
+        "uvicorn",
+        "tmcm.asgi:application",
+        "--workers",
+        "{workers}",
+        "--port",
+        "{port}",
+        "--no-access-log",
+    ],
+}
+# Under ASGI the async endpoint keeps many LLM calls in flight per worker
+SERVER_PATHS = {"wsgi": "/api/chat/", "asgi": "/api/chat/async/"}
+
+
+def load_corpus(path) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """Parse "stage;dur=1.234, other;dur=5" into {stage: milliseconds}"""
+    stages = {}
+    for entry in (header or "").split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        for param in params:
+            if name and param.startswith("dur="):
+                stages[name] = float(param[4:])
+    return stages
+
+
+async def _send(client, path, item, session_id, use_cache, results, started):
+    payload = {
+        "message": item["message"],
+        "language": item.get("language"),
+        "session_id": session_id,
+        "use_cache": use_cache,
+    }
+    record = {"persona": item.get("persona", "unknown"), "lag": 0.0}
+    start = time.perf_counter()
+    record["lag"] = start - started
+    try:
+        response = await client.post(path, json=payload)
+        record["status"] = response.status_code
+        if response.status_code == 200:
+            body = response.json()
+            record["persona"] = body.get("persona", record["persona"])
+            record["stages"] = parse_server_timing(
+                response.headers.get("server-timing")
+            )
+    except httpx.HTTPError as e:
+        record["status"] = type(e).__name__
+    record["latency"] = time.perf_counter() - start
+    results.append(record)
+
+
+async def run_load(
+    url: str,
+    path: str,
+    corpus: List[Dict],
+    rps: float,
+    duration: float,
+    poisson: bool = False,
+    use_cache: bool = True,
+    sessions: int = 100,
+    timeout: float = 60.0,
+    seed: int = 0,
+) -> Dict:
+    """Send requests at `rps` for `duration` seconds and summarize the results"""
+    rng = random.Random(seed)
+    items = itertools.cycle(rng.sample(corpus, len(corpus)))
+    results: List[Dict] = []
+    tasks = []
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=200)
+    async with httpx.AsyncClient(
+        base_url=url, timeout=timeout, limits=limits
+    ) as client:
+        begin = time.perf_counter()
+        next_at = 0.0
+        sent = 0
+        while next_at < duration:
+            delay = begin + next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            session_id = f"load-{sent % sessions}"
+            tasks.append(
+                asyncio.create_task(
+                    _send(
+                        client,
+                        path,
+                        next(items),
+                        session_id,
+                        use_cache,
+                        results,
+                        begin + next_at,
+                    )
+                )
+            )
+            sent += 1
+            next_at += rng.expovariate(rps) if poisson else 1 / rps
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - begin
+    return summarize(results, elapsed)
+
+
+def summarize(results: List[Dict], elapsed: float) -> Dict:
+    ok = [r for r in results if r["status"] == 200]
+    errors = defaultdict(int)
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] += 1
+
+    def latency_stats(records):
+        latencies = [r["latency"] * 1000 for r in records]
+        return {
+            "count": len(records),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+        }
+
+    by_persona = defaultdict(list)
+    stage_values = defaultdict(list)
+    for r in ok:
+        by_persona[r["persona"]].append(r)
+        for stage, ms in r.get("stages", {}).items():
+            stage_values[stage].append(ms)
+
+    return {
+        "requests": len(results),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(results), 4) if results else 0.0,
+        "errors": dict(errors),
+        "max_send_lag_ms": round(max((r["lag"] for r in results), default=0) * 1000, 1),
+        "latency": latency_stats(ok),
+        "personas": {
+            name: latency_stats(rs) for name, rs in sorted(by_persona.items())
+        },
+        "stages": {
+            stage: {
+                "count": len(values),
+                "mean_ms": round(sum(values) / len(values), 3),
+                "p95_ms": round(percentile(values, 95), 3),
+            }
+            for stage, values in sorted(stage_values.items())
+        },
+    }
+
+
+def print_report(summary: Dict, title: str = ""):
+    if title:
+        print(f"\n=== {title} ===")
+    latency = summary["latency"]
+    print(
+        f"requests {summary['requests']}  throughput {summary['throughput_rps']} req/s  "
+        f"errors {summary['error_rate']:.2%} {summary['errors'] or ''}"
+    )
+    print(
+        f"latency p50 {latency['p50_ms']} ms  p95 {latency['p95_ms']} ms  "
+        f"p99 {latency['p99_ms']} ms  (max send lag {summary['max_send_lag_ms']} ms)"
+    )
+    print(f"\n{'persona':<12}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in summary["personas"].items():
+        print(
+            f"{name:<12}{stats['count']:>8}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+        )
+    if summary["stages"]:
+        print(f"\n{'stage':<14}{'count':>8}{'mean ms':>12}{'p95 ms':>12}")
+        for stage, stats in summary["stages"].items():
+            print(
+                f"{stage:<14}{stats['count']:>8}{stats['mean_ms']:>12}"
+                f"{stats['p95_ms']:>12}"
+            )
+
+
+def print_matrix(rows: List[Dict]):
+    print(
+        f"\n{'server':<10}{'workers':>8}{'req/s':>10}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}"
+    )
+    for row in rows:
+        summary, latency = row["summary"], row["summary"]["latency"]
+        print(
+            f"{row['server']:<10}{row['workers']:>8}{summary['throughput_rps']:>10}"
+            f"{latency['p50_ms']:>10}{latency['p95_ms']:>10}{latency['p99_ms']:>10}"
+            f"{summary['error_rate']:>9.2%}"
+        )
+
+
+def _wait_ready(url: str, process, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server not ready at {url} after {timeout}s")
+
+
+def _stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def run_matrix(args, corpus) -> List[Dict]:
+    """Start each server configuration in turn and load it with the same traffic"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE="benchmarks.bench_settings")
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(REPO_DIR), env.get("PYTHONPATH")])
+    )
+    env["GROQ_BASE_URL"] = args.stub_url
+
+    kb_path = env.get("WELFARE_DATASET_PATH") or os.path.join(
+        tempfile.gettempdir(), f"sahayak_bench_kb_{args.kb_records}.json"
+    )
+    if not os.path.exists(kb_path):
+        write_kb(kb_path, args.kb_records, args.seed)
+    env["WELFARE_DATASET_PATH"] = kb_path
+
+    stub = None
+    if args.start_stub:
+        port = httpx.URL(args.stub_url).port
+        stub = subprocess.Popen(
+            [sys.executable, str(BENCH_DIR / "stub_llm_server.py"), "--port", str(port)]
+            + args.stub_args.split()
+        )
+        _wait_ready(f"{args.stub_url}/health", stub)
+
+    rows = []
+    try:
+        for spec in args.matrix.split(","):
+            server, _, workers = spec.strip().partition(":")
+            workers = int(workers or 1)
+            command = [
+                part.format(workers=workers, threads=args.threads, port=args.port)
+                for part in SERVER_COMMANDS[server]
+            ]
+            process = subprocess.Popen(command, cwd=REPO_DIR, env=env)
+            url = f"http://127.0.0.1:{args.port}"
+            try:
+                _wait_ready(f"{url}/api/ready/", process)
+                summary = asyncio.run(
+                    run_load(
+                        url,
+                        SERVER_PATHS[server],
+                        corpus,
+                        args.rps,
+                        args.duration,
+                        args.poisson,
+                        not args.no_cache,
+                        args.sessions,
+                        args.timeout,
+                        args.seed,
+                    )
+                )
+            finally:
+                _stop(process)
+            print_report(summary, f"{server} x{workers}")
+            rows.append({"server": server, "workers": workers, "summary": summary})
+    finally:
+        if stub:
+            _stop(stub)
+    print_matrix(rows)
+    return rows
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/api/chat/", help="chat endpoint to load")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--poisson", action="store_true", help="exponential inter-arrival times"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="send use_cache=false on every request"
+    )
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-out", help="write the summary as JSON to this file")
+
+    matrix = parser.add_argument_group("server matrix")
+    matrix.add_argument(
+        "--matrix", help="comma-separated server:workers, e.g. wsgi:1,wsgi:4,asgi:4"
+    )
+    matrix.add_argument("--port", type=int, default=8765)
+    matrix.add_argument("--threads", type=int, default=8, help="gunicorn threads")
+    matrix.add_argument("--stub-url", default="http://127.0.0.1:9000")
+    matrix.add_argument("--start-stub", action="store_true")
+    matrix.add_argument(
+        "--stub-args", default="", help='extra stub options, e.g. "--latency fixed:0.5"'
+    )
+    matrix.add_argument(
+        "--kb-records",
+        type=int,
+        default=1000,
+        help="size of the synthetic KB served (generated if missing; "
+        "WELFARE_DATASET_PATH overrides)",
+    )
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    corpus = load_corpus(args.corpus)
+    if args.matrix:
+        output = run_matrix(args, corpus)
+    else:
+        output = asyncio.run(
+            run_load(
+                args.url,
+                args.path,
+                corpus,
+                args.rps,
+                args.duration,
+                args.poisson,
+                not args.no_cache,
+                args.sessions,
+                args.timeout,
+                args.seed,
+            )
+        )
+        print_report(output)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
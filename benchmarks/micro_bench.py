@@ -0,0 +1,365 @@
+"""
+Micro-benchmarks for the non-LLM hot path
+
+Times the CPU-bound work around each chat request: AIController.analyze, the
+KnowledgeRetriever getters and scheme search, the fast path, handler context
+packing and message building, and JsonResponse encoding of the result. Each
+stage runs against synthetic KBs from 100 to 1M records with the questions in
+benchmarks/corpus.jsonl (English, Hindi and Marathi), and the report marks the
+stages whose cost grows with KB size.
+
+Usage:
+    python benchmarks/micro_bench.py                       # report only
+    python benchmarks/micro_bench.py --save benchmarks/micro_baseline.json
+    python benchmarks/micro_bench.py --check benchmarks/micro_baseline.json
+
+--check exits with status 1 when a stage is slower than its baseline by more
+than the threshold stored in the baseline file (or --threshold).
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path[:0] = [str(REPO_DIR), str(BENCH_DIR)]
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.bench_settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from synthetic_kb import generate_kb  # noqa: E402
+from welfare_app.services.ai_controller import AIController  # noqa: E402
+from welfare_app.services.fast_path import FastPathResolver  # noqa: E402
+from welfare_app.services.handlers import (  # noqa: E402
+    CitizenHandler,
+    EmployeeHandler,
+    LeaderHandler,
+)
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever  # noqa: E402
+from welfare_app.services.prompt_context import PromptContextCache  # noqa: E402
+from welfare_app.views import _chat_response  # noqa: E402
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000, 1000000)
+DEFAULT_THRESHOLD = 1.5
+# Differences below this many microseconds are timer noise, not regressions
+MIN_DELTA_US = 2.0
+
+SAMPLE_RESPONSE = {
+    "English": (
+        "You can apply for the Pension Support Scheme at your ward office. "
+        "Bring your Aadhaar card, ration card and income certificate. " * 6
+    ),
+    "Hindi": "आप अपने वार्ड कार्यालय में पेंशन सहायता योजना के लिए आवेदन कर सकते हैं। "
+    * 8,
+    "Marathi": "तुम्ही तुमच्या प्रभाग कार्यालयात निवृत्तीवेतन सहाय्य योजनेसाठी अर्ज करू शकता. "
+    * 8,
+}
+
+
+class BenchEnv:
+    """One synthetic KB with the components a request touches, ready to time"""
+
+    def __init__(self, records: int, queries: List[Dict]):
+        self.kb = generate_kb(records)
+        self.retriever = KnowledgeRetriever(self.kb)
+        self.controller = AIController()
+        self.context_cache = PromptContextCache()
+        self.handlers = {
+            handler.name: handler
+            for handler in (
+                cls(self.retriever, None, self.context_cache)
+                for cls in (CitizenHandler, EmployeeHandler, LeaderHandler)
+            )
+        }
+        self.fast_path = FastPathResolver()
+        self.queries = queries
+        self.contexts = [
+            self.controller.analyze(q["message"], q["language"]) for q in queries
+        ]
+        # One entry per query, so every stage cycles with the same period
+        self.scheme_ids = [s["scheme_id"] for s in self.kb["schemes"]][: len(queries)]
+        self.ward_ids = [w["ward_id"] for w in self.kb["wards"]][: len(queries)]
+
+
+def _cycle(values: List) -> Callable:
+    return itertools.cycle(values).__next__
+
+
+def _messages(env: BenchEnv, persona: str) -> Callable:
+    handler = env.handlers[persona]
+    next_context = _cycle([dict(c, persona=persona) for c in env.contexts])
+    return lambda: handler.build_messages(dict(next_context()))
+
+
+def _context(env: BenchEnv, persona: str) -> Callable:
+    # Uncached: the packing (json.dumps) done once per KB version and language
+    handler = env.handlers[persona]
+    next_language = _cycle(["English", "Hindi", "Marathi"])
+    return lambda: handler.build_context(next_language())
+
+
+def _fast_path(env: BenchEnv) -> Callable:
+    items = list(zip(env.queries, env.contexts))
+    next_item = _cycle(items)
+
+    def run():
+        query, context = next_item()
+        env.fast_path.resolve(query["message"], dict(context), env.retriever)
+
+    return run
+
+
+def _json_response(env: BenchEnv) -> Callable:
+    results = [
+        {
+            "response": SAMPLE_RESPONSE[c["language"]],
+            "language": c["language"],
+            "persona": c["persona"],
+            "intent": c["intent"],
+            "stages": {"analyze": 3.1e-05, "cache": 6.2e-05, "llm": 0.81},
+        }
+        for c in env.contexts
+    ]
+    next_result = _cycle(results)
+    return lambda: _chat_response(next_result()).content
+
+
+def _analyze(env: BenchEnv) -> Callable:
+    next_query = _cycle(env.queries)
+
+    def run():
+        query = next_query()
+        env.controller.analyze(query["message"], query["language"])
+
+    return run
+
+
+def _search(env: BenchEnv) -> Callable:
+    next_query = _cycle(env.queries)
+    return lambda: env.retriever.search_schemes(next_query()["message"], k=3)
+
+
+def _scheme_by_id(env: BenchEnv) -> Callable:
+    next_id = _cycle(env.scheme_ids)
+    return lambda: env.retriever.get_schemes(scheme_id=next_id())
+
+
+def _ward_by_id(env: BenchEnv) -> Callable:
+    next_id = _cycle(env.ward_ids)
+    return lambda: env.retriever.get_wards(next_id())
+
+
+# name -> factory(env) returning a zero-argument callable that does one operation
+STAGES: Dict[str, Callable[[BenchEnv], Callable]] = {
+    "analyze": _analyze,
+    "get_schemes": lambda env: env.retriever.get_schemes,
+    "get_scheme_by_id": _scheme_by_id,
+    "get_schemes_by_category": lambda env: (
+        lambda: env.retriever.get_schemes(category="Pension")
+    ),
+    "get_ward_by_id": _ward_by_id,
+    "get_stats": lambda env: env.retriever.get_stats,
+    "search_schemes": _search,
+    "fast_path": _fast_path,
+    "context_citizen": lambda env: _context(env, "citizen"),
+    "context_employee": lambda env: _context(env, "employee"),
+    "context_leader": lambda env: _context(env, "leader"),
+    "messages_citizen": lambda env: _messages(env, "citizen"),
+    "messages_employee": lambda env: _messages(env, "employee"),
+    "messages_leader": lambda env: _messages(env, "leader"),
+    "json_response": _json_response,
+}
+
+
+def measure(
+    fn: Callable, period: int = 1, target: float = 0.02, repeats: int = 5
+) -> float:
+    """
+    Best-of-`repeats` time per call in microseconds
+
+    Calls are made in whole multiples of `period` (the number of queries the
+    stage cycles through), since per-query cost varies a lot. The garbage
+    collector is paused while timing, as in timeit; otherwise a full
+    collection over a large KB lands in whichever stage happens to run.
+    """
+    fn()  # warm caches and lazily built indexes
+    gc.collect()
+    gc.disable()
+    try:
+        return _best_time(fn, period, target, repeats) * 1e6
+    finally:
+        gc.enable()
+
+
+def _best_time(fn: Callable, period: int, target: float, repeats: int) -> float:
+    number = period
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target / 10 or number >= 1 << 20:
+            break
+        number *= 10
+    number = max(1, round(number * target / max(elapsed, 1e-9) / period)) * period
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def run(sizes, stages, queries, repeats: int = 5) -> Dict[str, Dict[str, float]]:
+    """Time every stage at every KB size: {stage: {size: microseconds per op}}"""
+    results = {stage: {} for stage in stages}
+    for size in sizes:
+        started = time.perf_counter()
+        env = BenchEnv(size, queries)
+        print(
+            f"  {size:>8} records: KB ready in {time.perf_counter() - started:.1f}s",
+            file=sys.stderr,
+        )
+        for stage in stages:
+            results[stage][str(size)] = round(
+                measure(STAGES[stage](env), len(queries), repeats=repeats), 3
+            )
+        del env
+    return results
+
+
+def print_report(results: Dict, scaling_factor: float):
+    sizes = list(next(iter(results.values())))
+    header = f"{'stage (us/op)':<26}" + "".join(f"{s:>11}" for s in sizes)
+    print(header + f"{'growth':>9}")
+    for stage, timings in results.items():
+        values = [timings[s] for s in sizes]
+        growth = values[-1] / values[0] if values[0] else float("inf")
+        flag = "  <- scales with KB size" if growth >= scaling_factor else ""
+        print(
+            f"{stage:<26}"
+            + "".join(f"{v:>11.2f}" for v in values)
+            + f"{growth:>8.1f}x{flag}"
+        )
+
+
+def check(results: Dict, baseline: Dict, threshold: float = None) -> List[str]:
+    """Return a message for every stage and size slower than its baseline allows"""
+    thresholds = baseline.get("thresholds", {})
+    default = threshold or thresholds.get("default", DEFAULT_THRESHOLD)
+    failures = []
+    for stage, timings in results.items():
+        limit = threshold or thresholds.get(stage, default)
+        for size, current in timings.items():
+            reference = baseline["results"].get(stage, {}).get(size)
+            if reference is None:
+                continue
+            if current > reference * limit and current - reference > MIN_DELTA_US:
+                failures.append(
+                    f"{stage} @ {size} records: {current:.2f} us/op vs baseline "
+                    f"{reference:.2f} ({current / reference:.2f}x > {limit}x)"
+                )
+    return failures
+
+
+def confirm(results: Dict, baseline: Dict, threshold, queries, repeats) -> Dict:
+    """Run the failing stages again at the failing sizes, keeping the best time"""
+    failing = {}
+    for stage, timings in results.items():
+        for size in timings:
+            if check({stage: {size: timings[size]}}, baseline, threshold):
+                failing.setdefault(int(size), []).append(stage)
+    merged = {stage: dict(timings) for stage, timings in results.items()}
+    for size, stages in failing.items():
+        retry = run([size], stages, queries, repeats)
+        for stage in stages:
+            key = str(size)
+            merged[stage][key] = min(merged[stage][key], retry[stage][key])
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="comma-separated KB sizes in records",
+    )
+    parser.add_argument("--stages", help="comma-separated subset of stages to run")
+    parser.add_argument("--corpus", default=str(BENCH_DIR / "corpus.jsonl"))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--scaling-factor",
+        type=float,
+        default=3.0,
+        help="growth from the smallest to the largest KB that marks a stage",
+    )
+    parser.add_argument("--save", help="write results as a baseline to this file")
+    parser.add_argument("--check", help="compare against this baseline file")
+    parser.add_argument(
+        "--threshold", type=float, help="allowed slowdown factor for --check"
+    )
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        queries = [json.loads(line) for line in f if line.strip()]
+    sizes = [int(s) for s in args.sizes.split(",")]
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    results = run(sizes, stages, queries, args.repeats)
+    print_report(results, args.scaling_factor)
+
+    if args.save:
+        previous = {}
+        if os.path.exists(args.save):
+            with open(args.save, encoding="utf-8") as f:
+                previous = json.load(f)
+        baseline = {
+            "machine": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+            },
+            "thresholds": previous.get("thresholds", {"default": DEFAULT_THRESHOLD}),
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.check:
+        with open(args.check, encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = check(results, baseline, args.threshold)
+        if failures:
+            # Re-measure what failed and keep the faster time, so one noisy
+            # sample doesn't fail the build
+            print("\nRe-measuring slow stages...", file=sys.stderr)
+            results = confirm(results, baseline, args.threshold, queries, args.repeats)
+            failures = check(results, baseline, args.threshold)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
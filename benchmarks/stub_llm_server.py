@@ -0,0 +1,260 @@
+"""
+Stub OpenAI/Groq-compatible LLM server for load tests
+
+Answers POST .../chat/completions (e.g. /openai/v1/chat/completions, the path
+the Groq SDK uses) after a delay drawn from a configurable distribution, with
+optional injected errors and hangs, and supports "stream": true (SSE chunks
+with usage on the last one, like Groq). Point the app at it with
+GROQ_BASE_URL=http://127.0.0.1:9000.
+
+Latency specs (seconds):
+    fixed:0.8            always 0.8
+    uniform:0.2:1.5      uniform between 0.2 and 1.5
+    normal:0.8:0.2       mean 0.8, std dev 0.2 (clipped at 0)
+    lognormal:0.8:0.5    median 0.8, sigma 0.5 (long right tail, like real LLMs)
+    exp:0.8              exponential with mean 0.8
+
+Usage:
+    python benchmarks/stub_llm_server.py --port 9000 --latency lognormal:0.8:0.5 \\
+        --error-rate 0.02 --error-status 500,429 --token-interval 0.01
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+WORDS = (
+    "You can apply for this scheme at your ward office with your Aadhaar card "
+    "and ration card. The application is usually processed within 30 days and "
+    "the benefit is paid directly to your bank account."
+).split()
+
+
+def parse_latency(spec: str, rng: random.Random) -> Callable[[], float]:
+    """Turn a latency spec such as "lognormal:0.8:0.5" into a sampler"""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        mu = math.log(values[0])
+        return lambda: rng.lognormvariate(mu, values[1])
+    if kind == "exp":
+        return lambda: rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+class StubConfig:
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.rng_lock = threading.Lock()
+        self.latency = parse_latency(args.latency, self.rng)
+        self.error_rate = args.error_rate
+        self.error_statuses = [int(s) for s in args.error_status.split(",")]
+        self.hang_rate = args.hang_rate
+        self.completion_tokens = args.completion_tokens
+        self.token_interval = args.token_interval
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self.hangs = 0
+
+    def draw(self):
+        """(latency, error status or None, hang) for one request"""
+        with self.rng_lock:
+            roll = self.rng.random()
+            latency = self.latency()
+            status = None
+            if roll < self.error_rate:
+                status = self.rng.choice(self.error_statuses)
+            hang = not status and self.rng.random() < self.hang_rate
+        return latency, status, hang
+
+    def count(self, **increments):
+        with self.lock:
+            for name, amount in increments.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "streams": self.streams,
+                "errors": self.errors,
+                "hangs": self.hangs,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config: StubConfig = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/stats"):
+            self._json(200, self.config.stats())
+        else:
+            self._json(200, {"status": "ok"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "Not found"}})
+            return
+
+        config = self.config
+        config.count(requests=1)
+        latency, status, hang = config.draw()
+        if hang:
+            # Never answers in time; exercises client deadlines
+            config.count(hangs=1)
+            time.sleep(300)
+            return
+        if status:
+            time.sleep(latency * 0.2)
+            config.count(errors=1)
+            self._json(
+                status,
+                {"error": {"message": "Injected stub error", "type": "stub_error"}},
+            )
+            return
+
+        prompt_tokens = sum(
+            len(str(m.get("content", ""))) // 4 for m in body.get("messages", [])
+        )
+        completion_tokens = min(
+            config.completion_tokens, body.get("max_tokens") or config.completion_tokens
+        )
+        words = [WORDS[i % len(WORDS)] for i in range(completion_tokens)]
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        model = body.get("model", "stub-model")
+        completion_id = "chatcmpl-" + uuid.uuid4().hex[:24]
+
+        if body.get("stream"):
+            config.count(streams=1)
+            self._stream(completion_id, model, words, usage, latency)
+            return
+
+        time.sleep(latency)
+        self._json(
+            200,
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": " ".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            },
+        )
+
+    def _stream(self, completion_id, model, words, usage, latency):
+        # Latency is time to first token; the rest arrive token_interval apart
+        time.sleep(latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def chunk(delta, finish_reason=None, x_groq=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            if x_groq:
+                payload["x_groq"] = x_groq
+            self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        chunk({"role": "assistant", "content": ""})
+        for i, word in enumerate(words):
+            chunk({"content": word if i == 0 else " " + word})
+            if self.config.token_interval:
+                time.sleep(self.config.token_interval)
+        chunk({}, "stop", {"id": completion_id, "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def make_server(host: str, port: int, config: StubConfig) -> ThreadingHTTPServer:
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:0.8:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", default="500")
+    parser.add_argument(
+        "--hang-rate", type=float, default=0.0, help="share of requests never answered"
+    )
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument(
+        "--token-interval",
+        type=float,
+        default=0.01,
+        help="seconds between streamed tokens",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    server = make_server(args.host, args.port, StubConfig(args))
+    print(f"Stub LLM server on http://{args.host}:{args.port} (latency {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Synthetic knowledge base generator for benchmarks
+
+Produces a dataset with the same collections and field names as the social
+welfare dataset, at any size, deterministically from a seed.
+
+Usage:
+    python benchmarks/synthetic_kb.py --records 10000 --out /tmp/kb.json
+"""
+
+import argparse
+import json
+import random
+from typing import Dict
+
+CATEGORIES = [
+    ("Pension", "पेंशन", "निवृत्तीवेतन"),
+    ("Education", "शिक्षा", "शिक्षण"),
+    ("Health", "स्वास्थ्य", "आरोग्य"),
+    ("Housing", "आवास", "गृहनिर्माण"),
+    ("Women", "महिला", "महिला"),
+    ("Disability", "दिव्यांग", "दिव्यांग"),
+    ("Employment", "रोजगार", "रोजगार"),
+    ("Agriculture", "कृषि", "शेती"),
+]
+
+WARD_NAMES = [
+    "Naupada",
+    "Kopri",
+    "Wagle Estate",
+    "Vartak Nagar",
+    "Majiwada",
+    "Manpada",
+    "Kasarvadavali",
+    "Kolshet",
+    "Balkum",
+    "Kalwa",
+    "Mumbra",
+    "Diva",
+    "Uthalsar",
+    "Lokmanya Nagar",
+    "Hiranandani",
+]
+
+DOCUMENTS = [
+    "Aadhaar card",
+    "Ration card",
+    "Income certificate",
+    "Residence proof",
+    "Bank passbook",
+    "Age proof",
+    "Caste certificate",
+    "Disability certificate",
+]
+
+ELIGIBILITY = [
+    (
+        "Age above 60 and annual income below ₹1 lakh",
+        "60 वर्ष से अधिक आयु",
+        "60 वर्षांवरील वय",
+    ),
+    (
+        "Resident of Thane for 3 years",
+        "ठाणे में 3 वर्ष से निवास",
+        "ठाण्यात 3 वर्षे रहिवास",
+    ),
+    (
+        "Girl students in classes 8-12",
+        "कक्षा 8-12 की छात्राएं",
+        "इयत्ता 8-12 च्या विद्यार्थिनी",
+    ),
+    ("BPL card holders", "बीपीएल कार्ड धारक", "बीपीएल कार्डधारक"),
+    (
+        "Persons with 40% or more disability",
+        "40% या अधिक दिव्यांगता",
+        "40% किंवा अधिक दिव्यांगत्व",
+    ),
+]
+
+
+def scaled_counts(records: int) -> Dict[str, int]:
+    """Split a total record count across the collections in realistic proportions"""
+    schemes = min(max(records // 50, 10), 20000)
+    wards = min(max(records // 100, 10), 5000)
+    performance = max(records * 3 // 10, schemes)
+    grievances = max(records // 10, 10)
+    citizens = max(records - schemes - 3 * wards - performance - grievances, 0)
+    return {
+        "schemes": schemes,
+        "wards": wards,
+        "scheme_performance": performance,
+        "grievances_summary": grievances,
+        "citizens": citizens,
+    }
+
+
+def generate_kb(records: int = 1000, seed: int = 0) -> Dict:
+    """Build a synthetic knowledge base of roughly `records` records in total"""
+    rng = random.Random(seed)
+    counts = scaled_counts(records)
+
+    schemes = []
+    for i in range(1, counts["schemes"] + 1):
+        en, hi, mr = CATEGORIES[i % len(CATEGORIES)]
+        eligibility = ELIGIBILITY[i % len(ELIGIBILITY)]
+        schemes.append(
+            {
+                "scheme_id": f"SCH{i:05d}",
+                "name": f"{en} Support Scheme {i}",
+                "name_hi": f"{hi} सहायता योजना {i}",
+                "name_mr": f"{mr} सहाय्य योजना {i}",
+                "category": en,
+                "description": f"Financial support for {en.lower()} needs of Thane citizens",
+                "description_hi": f"ठाणे के नागरिकों के लिए {hi} सहायता",
+                "description_mr": f"ठाणे नागरिकांसाठी {mr} सहाय्य",
+                "eligibility": eligibility[0],
+                "eligibility_hi": eligibility[1],
+                "eligibility_mr": eligibility[2],
+                "documents_required": rng.sample(DOCUMENTS, 3),
+                "benefit_amount": rng.randrange(1000, 50000, 500),
+            }
+        )
+
+    wards = []
+    for i in range(1, counts["wards"] + 1):
+        base = WARD_NAMES[(i - 1) % len(WARD_NAMES)]
+        suffix = (i - 1) // len(WARD_NAMES)
+        wards.append(
+            {
+                "ward_id": f"W{i:04d}",
+                "ward_name": base if suffix == 0 else f"{base} {suffix + 1}",
+                "population": rng.randint(20000, 200000),
+            }
+        )
+
+    def pick(collection):
+        return collection[rng.randrange(len(collection))]
+
+    performance = []
+    for _ in range(counts["scheme_performance"]):
+        received = rng.randint(50, 5000)
+        allocated = rng.randrange(100000, 50000000, 10000)
+        performance.append(
+            {
+                "scheme_id": pick(schemes)["scheme_id"],
+                "ward_id": pick(wards)["ward_id"],
+                "applications_received": received,
+                "applications_approved": rng.randint(0, received),
+                "budget_allocated": allocated,
+                "budget_utilized": rng.randint(0, allocated),
+            }
+        )
+
+    grievances = []
+    for _ in range(counts["grievances_summary"]):
+        total = rng.randint(1, 300)
+        resolved = rng.randint(0, total)
+        grievances.append(
+            {
+                "scheme_id": pick(schemes)["scheme_id"],
+                "ward_id": pick(wards)["ward_id"],
+                "total_grievances": total,
+                "resolved": resolved,
+                "pending": total - resolved,
+                "avg_resolution_days": round(rng.uniform(1, 45), 1),
+            }
+        )
+
+    coverage, vulnerability = [], []
+    for ward in wards:
+        eligible = rng.randint(1000, ward["population"] // 2)
+        coverage.append(
+            {
+                "ward_id": ward["ward_id"],
+                "eligible_population": eligible,
+                "enrolled_beneficiaries": rng.randint(0, eligible),
+            }
+        )
+        score = round(rng.random(), 3)
+        vulnerability.append(
+            {
+                "ward_id": ward["ward_id"],
+                "vulnerability_score": score,
+                "risk_level": (
+                    "High" if score > 0.66 else "Medium" if score > 0.33 else "Low"
+                ),
+            }
+        )
+
+    citizens = [
+        {
+            "citizen_id": f"C{i:07d}",
+            "ward_id": pick(wards)["ward_id"],
+            "age": rng.randint(18, 90),
+            "enrolled_schemes": [pick(schemes)["scheme_id"]],
+        }
+        for i in range(counts["citizens"])
+    ]
+
+    return {
+        "meta": {"city": "Thane", "synthetic": True, "records": records, "seed": seed},
+        "schemes": schemes,
+        "wards": wards,
+        "scheme_performance": performance,
+        "grievances_summary": grievances,
+        "beneficiary_coverage": coverage,
+        "vulnerability_scores": vulnerability,
+        "citizens": citizens,
+    }
+
+
+def write_kb(path, records: int = 1000, seed: int = 0):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(generate_kb(records, seed), f, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    write_kb(args.out, args.records, args.seed)
+    print(f"Wrote {args.records} records to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
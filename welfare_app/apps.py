@@ -1,5 +1,35 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class WelfareAppConfig(AppConfig):
     name = "welfare_app"
+
+    def ready(self):
+        if getattr(settings, "WARMUP_ON_START", False) and _is_server_process():
+            from .services.warmup import warm_up
+
+            warm_up(freeze=getattr(settings, "WARMUP_GC_FREEZE", True))
+
+
+# Programs that serve the app; anything else (migrate, pytest, celery, ...)
+# skips the warm-up
+SERVER_PROGRAMS = {"gunicorn", "uvicorn", "daphne", "hypercorn", "uwsgi"}
+MANAGEMENT_PROGRAMS = {"manage.py", "django-admin", "django-admin.py"}
+
+
+def _is_server_process() -> bool:
+    """True for WSGI/ASGI servers and runserver, False for everything else"""
+    program = os.path.basename(sys.argv[0]) if sys.argv else ""
+    if program == "__main__.py":
+        # python -m gunicorn, python -m uvicorn, ...
+        program = os.path.basename(os.path.dirname(sys.argv[0]))
+    if program in SERVER_PROGRAMS:
+        return True
+    if program not in MANAGEMENT_PROGRAMS or sys.argv[1:2] != ["runserver"]:
+        return False
+    # The autoreloader's parent only watches files; its child serves
+    return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
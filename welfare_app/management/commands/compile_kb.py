@@ -0,0 +1,64 @@
+"""
+Compile the knowledge base into a binary snapshot for fast worker startup
+
+Usage: python manage.py compile_kb [--path PATH]
+
+The JSON dataset is validated, indexed and written next to it as a
+.kbsnap file. Workers load the snapshot instead of parsing JSON whenever it
+matches the current dataset file.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from welfare_app.services.kb_loader import (
+    file_signature,
+    get_dataset_path,
+    load_knowledge_base,
+    load_snapshot,
+    validate_knowledge_base,
+    write_snapshot,
+)
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+
+
+class Command(BaseCommand):
+    help = "Validate the knowledge base and write a compiled binary snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", help="Dataset path (defaults to WELFARE_DATASET_PATH)"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or get_dataset_path()
+
+        started = time.perf_counter()
+        # Taken before reading, so an edit made meanwhile invalidates the snapshot
+        signature = file_signature(path)
+        try:
+            knowledge_base = load_knowledge_base(path)
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+
+        errors = validate_knowledge_base(knowledge_base)
+        if errors:
+            raise CommandError("Invalid knowledge base:\n  " + "\n  ".join(errors))
+
+        retriever = KnowledgeRetriever(knowledge_base)
+        json_seconds = time.perf_counter() - started
+        snapshot = write_snapshot(path, knowledge_base, retriever.indexes, signature)
+
+        started = time.perf_counter()
+        if load_snapshot(path) is None:
+            raise CommandError(f"Snapshot at {snapshot} could not be read back")
+        snapshot_seconds = time.perf_counter() - started
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {snapshot} ({snapshot.stat().st_size / 1024:.0f} KiB); "
+                f"load time {snapshot_seconds * 1000:.1f} ms vs "
+                f"{json_seconds * 1000:.1f} ms for JSON, validation and indexing"
+            )
+        )
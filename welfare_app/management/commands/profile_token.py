@@ -0,0 +1,21 @@
+"""
+Print a signed header value that turns on profiling for a request
+
+Usage: python manage.py profile_token
+
+Send it as X-Sahayak-Profile on a chat request to profile that request, or on
+GET /api/profiles/ to list saved profiles. It is valid for
+PROFILING_TOKEN_MAX_AGE seconds and signed with SECRET_KEY, so every worker
+accepts it.
+"""
+
+from django.core.management.base import BaseCommand
+
+from welfare_app.services.profiling import PROFILE_HEADER, make_token
+
+
+class Command(BaseCommand):
+    help = "Print a signed X-Sahayak-Profile header value for on-demand profiling"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{PROFILE_HEADER}: {make_token()}")
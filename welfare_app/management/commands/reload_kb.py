@@ -0,0 +1,90 @@
+"""
+Validate the knowledge base and signal running workers to reload it
+
+Usage: python manage.py reload_kb [--path PATH] [--compile]
+
+Workers watch the dataset file's mtime/inode, so after validation the file is
+touched and every worker swaps in the new version within
+KB_RELOAD_CHECK_INTERVAL seconds, without a restart.
+
+A compiled snapshot is only used while it matches the dataset's mtime, so the
+touch invalidates it. With --compile a new snapshot is written first, recording
+the mtime the touch is about to set, and workers reload from it.
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from welfare_app.services.kb_loader import (
+    file_signature,
+    get_dataset_path,
+    load_knowledge_base,
+    snapshot_path,
+    validate_knowledge_base,
+    write_snapshot,
+)
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+
+
+class Command(BaseCommand):
+    help = (
+        "Validate the knowledge base file and trigger a hot reload in running workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", help="Dataset path (defaults to WELFARE_DATASET_PATH)"
+        )
+        parser.add_argument(
+            "--compile",
+            action="store_true",
+            help="Write the binary snapshot before signalling workers",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or get_dataset_path()
+
+        signature = file_signature(path)
+        try:
+            knowledge_base = load_knowledge_base(path)
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+
+        # Workers would fail to index an invalid file, so never signal them
+        errors = validate_knowledge_base(knowledge_base)
+        if errors:
+            raise CommandError("Invalid knowledge base:\n  " + "\n  ".join(errors))
+
+        # Strictly newer, so workers notice even within the clock's resolution
+        mtime_ns = max(time.time_ns(), signature[0] + 1)
+        if options["compile"]:
+            retriever = KnowledgeRetriever(knowledge_base)
+            write_snapshot(
+                path,
+                knowledge_base,
+                retriever.indexes,
+                (mtime_ns,) + signature[1:],
+            )
+        elif snapshot_path(path).exists():
+            self.stderr.write(
+                self.style.WARNING(
+                    "The compiled snapshot no longer matches the dataset; workers "
+                    "reload from JSON. Use --compile to rewrite it."
+                )
+            )
+
+        if file_signature(path) != signature:
+            raise CommandError(
+                f"{path} changed while it was being read; run reload_kb again"
+            )
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Knowledge base at {path} is valid "
+                f"({len(knowledge_base.get('schemes', []))} schemes, "
+                f"{len(knowledge_base.get('wards', []))} wards); workers will reload it"
+            )
+        )
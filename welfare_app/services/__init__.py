@@ -1,2 +1,2 @@
 # Sahayak AI Services
-from .chatbot import SahayakChatbot, get_chatbot_instance
+from .chatbot import SahayakChatbot, get_chatbot_instance, aget_chatbot_instance
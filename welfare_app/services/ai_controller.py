@@ -4,15 +4,84 @@ Detects language, persona, and intent from user input
 """
 
 import re
-from typing import Dict
+from collections import defaultdict
+from typing import Dict, FrozenSet, List
+
+DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Build a regex matching any of the words, structured as a trie
+
+    Each position in the text then costs one branch per character instead of
+    one attempt per keyword, and the longest keyword starting there wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Finds every keyword contained in a text with a single compiled trie regex
+
+    Each match is the longest keyword starting at that position; keywords
+    contained in it are implied. Scanning resumes at the first offset where
+    another keyword could start inside the match, so the result is the same as
+    checking each keyword as a substring independently.
+    """
+
+    def __init__(self, keywords: List[str]):
+        keywords = sorted({kw.lower() for kw in keywords if kw})
+        self.pattern = re.compile(_trie_pattern(keywords))
+        self.implied: Dict[str, FrozenSet[str]] = {
+            kw: frozenset(other for other in keywords if other in kw) for kw in keywords
+        }
+        # Offset into each keyword where the next match could begin: the first
+        # proper suffix that is a prefix of some keyword, else the keyword's end
+        self.resume_offset: Dict[str, int] = {
+            kw: next(
+                (
+                    i
+                    for i in range(1, len(kw))
+                    if any(other.startswith(kw[i:]) for other in keywords)
+                ),
+                len(kw),
+            )
+            for kw in keywords
+        }
+
+    def scan(self, text_lower: str) -> FrozenSet[str]:
+        """Return the set of keywords found in the (lowercased) text"""
+        found = set()
+        search = self.pattern.search
+        match = search(text_lower)
+        while match:
+            keyword = match.group()
+            found |= self.implied[keyword]
+            match = search(text_lower, match.start() + self.resume_offset[keyword])
+        return found
 
 
 class AIController:
     """The Brain - Detects Intent, Language & Persona"""
 
-    def __init__(self):
-        self.hindi_chars = re.compile(r"[\u0900-\u097F]")
+    LANGUAGE_CHOICES = {"1": "English", "2": "Hindi", "3": "Marathi"}
 
+    def __init__(self):
         self.leader_keywords = [
             "report",
             "kpi",
@@ -51,80 +120,122 @@ class AIController:
             "status update",
         ]
 
+        # Intent keywords, in priority order (first match wins)
+        self.intent_keywords = [
+            ("check_status", ["status", "track", "where", "स्थिती", "स्थिति"]),
+            (
+                "apply_scheme",
+                ["apply", "how to", "eligibility", "अर्ज", "कसे", "आवेदन"],
+            ),
+            ("grievance", ["complaint", "problem", "issue", "तक्रार", "शिकायत"]),
+            ("metrics", ["performance", "report", "data", "कामगिरी", "रिपोर्ट"]),
+            ("scheme_info", ["scheme", "योजना", "pension", "पेंशन"]),
+        ]
+
+        self._build_matcher()
+
+    def _build_matcher(self):
+        """Compile every keyword list into one matcher (call again after editing them)"""
+        labelled = [("leader", kw) for kw in self.leader_keywords]
+        labelled += [("employee", kw) for kw in self.employee_keywords]
+        for intent, keywords in self.intent_keywords:
+            labelled += [(intent, kw) for kw in keywords]
+
+        labels = defaultdict(set)
+        for label, kw in labelled:
+            labels[kw.lower()].add(label)
+
+        # Per keyword: (counts for leader, counts for employee, best intent rank)
+        intent_rank = {name: i for i, (name, _) in enumerate(self.intent_keywords)}
+        no_intent = len(self.intent_keywords)
+        self.keyword_info = {
+            kw: (
+                int("leader" in found),
+                int("employee" in found),
+                min(
+                    (intent_rank[l] for l in found if l in intent_rank),
+                    default=no_intent,
+                ),
+            )
+            for kw, found in labels.items()
+        }
+        self.matcher = KeywordMatcher(list(self.keyword_info))
+
+    def classify(self, text: str) -> Dict:
+        """
+        Detect language, persona scores, persona and intent in one keyword pass
+
+        Returns:
+            {"language", "persona", "intent", "persona_scores"}
+        """
+        stripped = text.strip()
+
+        leader_score = employee_score = 0
+        rank = len(self.intent_keywords)
+        keyword_info = self.keyword_info
+        for kw in self.matcher.scan(text.lower()):
+            is_leader, is_employee, kw_rank = keyword_info[kw]
+            leader_score += is_leader
+            employee_score += is_employee
+            if kw_rank < rank:
+                rank = kw_rank
+
+        if stripped in self.LANGUAGE_CHOICES:
+            language = self.LANGUAGE_CHOICES[stripped]
+        elif not text.isascii() and DEVANAGARI.search(text):
+            # Could add more sophisticated Hindi vs Marathi detection
+            language = "Hindi"
+        else:
+            language = "English"
+
+        if leader_score > 0:
+            persona = "leader"
+        elif employee_score > 0:
+            persona = "employee"
+        else:
+            persona = "citizen"
+
+        if rank < len(self.intent_keywords):
+            intent = self.intent_keywords[rank][0]
+        else:
+            intent = "general_query"
+
+        return {
+            "language": language,
+            "persona": persona,
+            "intent": intent,
+            "persona_scores": {"leader": leader_score, "employee": employee_score},
+        }
+
     def detect_language(self, text: str) -> str:
         """
         Detect language from input
         Supports: English, Hindi, Marathi
         """
-        text = text.strip()
-
-        # Check for numeric language selection
-        if text == "1":
-            return "English"
-        elif text == "2":
-            return "Hindi"
-        elif text == "3":
-            return "Marathi"
-
-        # Check for Devanagari script (Hindi/Marathi)
-        if self.hindi_chars.search(text):
-            # Could add more sophisticated Hindi vs Marathi detection
-            return "Hindi"
-
-        return "English"
+        return self.classify(text)["language"]
 
     def detect_persona(self, text: str) -> str:
         """
         Detect user persona based on query keywords
         Returns: 'citizen', 'employee', or 'leader'
         """
-        text_lower = text.lower()
-
-        leader_score = sum(1 for kw in self.leader_keywords if kw in text_lower)
-        employee_score = sum(1 for kw in self.employee_keywords if kw in text_lower)
-
-        if leader_score > 0:
-            return "leader"
-        elif employee_score > 0:
-            return "employee"
-        return "citizen"
+        return self.classify(text)["persona"]
 
     def detect_intent(self, text: str) -> str:
         """
         Detect user intent from query
         """
-        text_lower = text.lower()
-
-        if any(w in text_lower for w in ["status", "track", "where", "स्थिती", "स्थिति"]):
-            return "check_status"
-        elif any(
-            w in text_lower
-            for w in ["apply", "how to", "eligibility", "अर्ज", "कसे", "आवेदन"]
-        ):
-            return "apply_scheme"
-        elif any(
-            w in text_lower
-            for w in ["complaint", "problem", "issue", "तक्रार", "शिकायत"]
-        ):
-            return "grievance"
-        elif any(
-            w in text_lower
-            for w in ["performance", "report", "data", "कामगिरी", "रिपोर्ट"]
-        ):
-            return "metrics"
-        elif any(w in text_lower for w in ["scheme", "योजना", "pension", "पेंशन"]):
-            return "scheme_info"
-        return "general_query"
+        return self.classify(text)["intent"]
 
     def analyze(self, user_input: str, language_override: str = None) -> Dict:
         """
         Analyze user input and return context dictionary
         """
-        detected_language = self.detect_language(user_input)
+        result = self.classify(user_input)
 
         return {
             "original_query": user_input,
-            "language": language_override or detected_language,
-            "persona": self.detect_persona(user_input),
-            "intent": self.detect_intent(user_input),
+            "language": language_override or result["language"],
+            "persona": result["persona"],
+            "intent": result["intent"],
         }
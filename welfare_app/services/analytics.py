@@ -0,0 +1,471 @@
+"""
+Analytics Engine for Sahayak AI
+Precomputes ward and scheme aggregates with NumPy when the knowledge base loads
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # analytics are optional; the chatbot works without them
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Accepted field names for each measure, in order of preference
+FIELD_NAMES = {
+    "population": ("population", "total_population"),
+    "eligible": ("eligible_population", "eligible_beneficiaries", "eligible"),
+    "enrolled": ("enrolled_beneficiaries", "enrolled", "beneficiaries_covered"),
+    "vulnerability": ("vulnerability_score", "vulnerability_index", "score"),
+    "applications": ("applications_received", "total_applications", "applications"),
+    "approved": ("applications_approved", "approved_applications", "approved"),
+    "allocated": ("budget_allocated", "allocated_budget", "budget"),
+    "utilized": ("budget_utilized", "budget_spent", "utilized_budget", "spent"),
+    "grievances": ("total_grievances", "grievances", "total"),
+    "resolved": ("resolved", "resolved_grievances"),
+    "pending": ("pending", "pending_grievances"),
+    "resolution_days": ("avg_resolution_days", "average_resolution_days"),
+}
+
+CRORE = 1e7
+
+
+def _value(record: Dict, measure: str) -> float:
+    for field in FIELD_NAMES[measure]:
+        value = record.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+    return float("nan")
+
+
+def _column(records: Sequence[Dict], measure: str):
+    """Extract one measure from every record as a float array (NaN if missing)"""
+    # Collections use one naming scheme, so resolve the field name once
+    sample = next((record for record in records if record), {})
+    field = next((f for f in FIELD_NAMES[measure] if f in sample), None)
+    if field is None:
+        return np.full(len(records), np.nan)
+    try:
+        # None becomes NaN
+        return np.array([record.get(field) for record in records], dtype=float)
+    except (TypeError, ValueError):
+        # Mixed or textual values: check record by record
+        return np.fromiter(
+            (_value(record, measure) for record in records),
+            dtype=float,
+            count=len(records),
+        )
+
+
+def _ratio(numerator, denominator):
+    """Element-wise ratio, NaN where the denominator is missing or zero"""
+    out = np.full(np.shape(numerator), np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _round(value, digits: int = 4):
+    """Convert a NumPy scalar to a JSON-safe Python number (None for NaN)"""
+    value = float(value)
+    if value != value:
+        return None
+    return int(value) if value.is_integer() and digits == 0 else round(value, digits)
+
+
+class GroupedTable:
+    """
+    Sums measures from a collection into one row per key (ward or scheme)
+
+    Rows are positioned by a fixed key order, so every table for the same
+    keys lines up and can be combined with plain array arithmetic.
+    """
+
+    def __init__(self, keys: List[str]):
+        self.keys = keys
+        self.position = {key: i for i, key in enumerate(keys)}
+        self._positions = {}
+
+    def positions(self, records: Sequence[Dict], key_field: str):
+        """Row position of each record (-1 if it has no key), computed once"""
+        cache_key = (id(records), key_field)
+        if cache_key not in self._positions:
+            position = self.position
+            self._positions[cache_key] = np.fromiter(
+                (
+                    position.get(str(record.get(key_field, "")).upper(), -1)
+                    for record in records
+                ),
+                dtype=np.int64,
+                count=len(records),
+            )
+        return self._positions[cache_key]
+
+    def sum(self, records: Sequence[Dict], key_field: str, measure: str):
+        """Per-key totals; NaN for keys with no value at all"""
+        positions = self.positions(records, key_field)
+        values = _column(records, measure)
+        keep = (positions >= 0) & ~np.isnan(values)
+        totals = np.bincount(
+            positions[keep], weights=values[keep], minlength=len(self.keys)
+        )
+        seen = np.bincount(positions[keep], minlength=len(self.keys)) > 0
+        return np.where(seen, totals, np.nan)
+
+    def mean(self, records, key_field: str, measure: str, weight_measure: str = None):
+        """Per-key mean of a measure, optionally weighted (e.g. days by grievances)"""
+        positions = self.positions(records, key_field)
+        values = _column(records, measure)
+        weights = np.ones(len(records))
+        if weight_measure:
+            weights = np.nan_to_num(_column(records, weight_measure), nan=1.0)
+        keep = (positions >= 0) & ~np.isnan(values)
+        size = len(self.keys)
+        weighted = np.bincount(
+            positions[keep], weights=values[keep] * weights[keep], minlength=size
+        )
+        total = np.bincount(positions[keep], weights=weights[keep], minlength=size)
+        return _ratio(weighted, total)
+
+
+def _ids(field: str, *collections: Sequence[Dict]) -> List[str]:
+    """Unique upper-cased ids across collections, in first-seen order"""
+    return list(
+        dict.fromkeys(
+            str(record[field]).upper()
+            for records in collections
+            for record in records
+            if record.get(field)
+        )
+    )
+
+
+def _top(rows: List[Dict], metric: str, n: int, lowest: bool, fields: tuple):
+    """The n rows with the lowest (or highest) known value of a metric"""
+    values = np.array(
+        [np.nan if row[metric] is None else row[metric] for row in rows], dtype=float
+    )
+    known = np.flatnonzero(~np.isnan(values))
+    order = known[
+        np.argsort(values[known] if lowest else -values[known], kind="stable")
+    ]
+    return [{field: rows[i][field] for field in fields} for i in order[:n]]
+
+
+class KBAnalytics:
+    """
+    Ward and scheme aggregates for one knowledge base version
+
+    Everything is computed once in __init__ with vectorized NumPy operations
+    and stored as JSON-ready dicts, so serving an endpoint or building the
+    leader prompt is a dictionary lookup.
+    """
+
+    def __init__(self, kb: Dict, top_n: int = 10):
+        self.top_n = top_n
+        self.wards = self._ward_rows(kb)
+        self.schemes = self._scheme_rows(kb)
+        self.ward_index = {row["ward_id"]: row for row in self.wards}
+        self.scheme_index = {row["scheme_id"]: row for row in self.schemes}
+        self.budget_by_category = self._budget_by_category()
+        self.summary = self._summary(kb)
+        self.bottlenecks = self._bottlenecks(top_n)
+
+    def _ward_rows(self, kb: Dict) -> List[Dict]:
+        wards = kb.get("wards", [])
+        performance = kb.get("scheme_performance", [])
+        grievances = kb.get("grievances_summary", [])
+        coverage = kb.get("beneficiary_coverage", [])
+        vulnerability = kb.get("vulnerability_scores", [])
+
+        keys = _ids("ward_id", wards, coverage, vulnerability, performance, grievances)
+        table = GroupedTable(keys)
+
+        eligible = table.sum(coverage, "ward_id", "eligible")
+        enrolled = table.sum(coverage, "ward_id", "enrolled")
+        coverage_ratio = _ratio(enrolled, eligible)
+        vulnerability_score = table.mean(vulnerability, "ward_id", "vulnerability")
+        applications = table.sum(performance, "ward_id", "applications")
+        approved = table.sum(performance, "ward_id", "approved")
+        allocated = table.sum(performance, "ward_id", "allocated")
+        utilized = table.sum(performance, "ward_id", "utilized")
+        total_grievances = table.sum(grievances, "ward_id", "grievances")
+        resolved = table.sum(grievances, "ward_id", "resolved")
+        pending = table.sum(grievances, "ward_id", "pending")
+        # Vulnerable wards with low coverage need attention first
+        priority = vulnerability_score * (1 - np.clip(coverage_ratio, 0, 1))
+
+        names = {str(w.get("ward_id", "")).upper(): w for w in wards}
+        risk = {str(v.get("ward_id", "")).upper(): v for v in vulnerability}
+        rows = []
+        for i, ward_id in enumerate(keys):
+            ward = names.get(ward_id, {})
+            rows.append(
+                {
+                    "ward_id": ward_id,
+                    "ward_name": ward.get("ward_name") or ward.get("name") or ward_id,
+                    "population": _round(_value(ward, "population"), 0),
+                    "eligible_population": _round(eligible[i], 0),
+                    "enrolled_beneficiaries": _round(enrolled[i], 0),
+                    "coverage_ratio": _round(coverage_ratio[i]),
+                    "vulnerability_score": _round(vulnerability_score[i]),
+                    "risk_level": risk.get(ward_id, {}).get("risk_level"),
+                    "applications_received": _round(applications[i], 0),
+                    "applications_approved": _round(approved[i], 0),
+                    "approval_rate": _round(_ratio(approved[i], applications[i])),
+                    "budget_allocated": _round(allocated[i], 2),
+                    "budget_utilized": _round(utilized[i], 2),
+                    "budget_utilization": _round(_ratio(utilized[i], allocated[i])),
+                    "grievances_total": _round(total_grievances[i], 0),
+                    "grievances_resolved": _round(resolved[i], 0),
+                    "grievances_pending": _round(pending[i], 0),
+                    "resolution_rate": _round(_ratio(resolved[i], total_grievances[i])),
+                    "priority_score": _round(priority[i]),
+                }
+            )
+        return rows
+
+    def _scheme_rows(self, kb: Dict) -> List[Dict]:
+        schemes = kb.get("schemes", [])
+        performance = kb.get("scheme_performance", [])
+        grievances = kb.get("grievances_summary", [])
+
+        keys = _ids("scheme_id", schemes, performance, grievances)
+        table = GroupedTable(keys)
+
+        applications = table.sum(performance, "scheme_id", "applications")
+        approved = table.sum(performance, "scheme_id", "approved")
+        allocated = table.sum(performance, "scheme_id", "allocated")
+        utilized = table.sum(performance, "scheme_id", "utilized")
+        total_grievances = table.sum(grievances, "scheme_id", "grievances")
+        resolved = table.sum(grievances, "scheme_id", "resolved")
+        pending = table.sum(grievances, "scheme_id", "pending")
+        resolution_days = table.mean(
+            grievances, "scheme_id", "resolution_days", "grievances"
+        )
+
+        by_id = {str(s.get("scheme_id", "")).upper(): s for s in schemes}
+        rows = []
+        for i, scheme_id in enumerate(keys):
+            scheme = by_id.get(scheme_id, {})
+            rows.append(
+                {
+                    "scheme_id": scheme_id,
+                    "name": scheme.get("name")
+                    or scheme.get("scheme_name")
+                    or scheme_id,
+                    "category": scheme.get("category"),
+                    "applications_received": _round(applications[i], 0),
+                    "applications_approved": _round(approved[i], 0),
+                    "approval_rate": _round(_ratio(approved[i], applications[i])),
+                    "budget_allocated": _round(allocated[i], 2),
+                    "budget_utilized": _round(utilized[i], 2),
+                    "budget_utilization": _round(_ratio(utilized[i], allocated[i])),
+                    "grievances_total": _round(total_grievances[i], 0),
+                    "grievances_resolved": _round(resolved[i], 0),
+                    "grievances_pending": _round(pending[i], 0),
+                    "resolution_rate": _round(_ratio(resolved[i], total_grievances[i])),
+                    "avg_resolution_days": _round(resolution_days[i], 2),
+                }
+            )
+        return rows
+
+    def _budget_by_category(self) -> List[Dict]:
+        """Allocated and spent budget per scheme category, in ₹ crores"""
+        categories = list(
+            dict.fromkeys(row["category"] or "Uncategorized" for row in self.schemes)
+        )
+        position = {category: i for i, category in enumerate(categories)}
+        index = np.array(
+            [position[row["category"] or "Uncategorized"] for row in self.schemes],
+            dtype=np.int64,
+        )
+        allocated = np.array(
+            [row["budget_allocated"] or 0 for row in self.schemes], dtype=float
+        )
+        utilized = np.array(
+            [row["budget_utilized"] or 0 for row in self.schemes], dtype=float
+        )
+        allocated = np.bincount(index, weights=allocated, minlength=len(categories))
+        utilized = np.bincount(index, weights=utilized, minlength=len(categories))
+        utilization = _ratio(utilized, allocated)
+        return [
+            {
+                "category": category,
+                "allocated": _round(allocated[i] / CRORE),
+                "spent": _round(utilized[i] / CRORE),
+                "utilization": _round(utilization[i]),
+            }
+            for i, category in enumerate(categories)
+        ]
+
+    def _summary(self, kb: Dict) -> Dict:
+        def total(rows, field):
+            values = np.array(
+                [np.nan if row[field] is None else row[field] for row in rows],
+                dtype=float,
+            )
+            return np.nansum(values) if (~np.isnan(values)).any() else np.nan
+
+        eligible = total(self.wards, "eligible_population")
+        enrolled = total(self.wards, "enrolled_beneficiaries")
+        applications = total(self.schemes, "applications_received")
+        approved = total(self.schemes, "applications_approved")
+        allocated = total(self.schemes, "budget_allocated")
+        utilized = total(self.schemes, "budget_utilized")
+        grievances = total(self.schemes, "grievances_total")
+        resolved = total(self.schemes, "grievances_resolved")
+
+        risk_levels = {}
+        for row in self.wards:
+            if row["risk_level"]:
+                risk_levels[row["risk_level"]] = (
+                    risk_levels.get(row["risk_level"], 0) + 1
+                )
+
+        return {
+            "total_wards": len(self.wards),
+            "total_schemes": len(self.schemes),
+            "total_citizens": len(kb.get("citizens", [])),
+            "population": _round(total(self.wards, "population"), 0),
+            "eligible_population": _round(eligible, 0),
+            "enrolled_beneficiaries": _round(enrolled, 0),
+            "coverage_ratio": _round(_ratio(enrolled, eligible)),
+            "applications_received": _round(applications, 0),
+            "applications_approved": _round(approved, 0),
+            "approval_rate": _round(_ratio(approved, applications)),
+            "budget_allocated": _round(allocated, 2),
+            "budget_utilized": _round(utilized, 2),
+            "budget_utilization": _round(_ratio(utilized, allocated)),
+            "grievances_total": _round(grievances, 0),
+            "grievances_resolved": _round(resolved, 0),
+            "grievances_pending": _round(total(self.schemes, "grievances_pending"), 0),
+            "resolution_rate": _round(_ratio(resolved, grievances)),
+            "wards_by_risk_level": risk_levels,
+        }
+
+    def _bottlenecks(self, n: int) -> Dict[str, List[Dict]]:
+        ward = ("ward_id", "ward_name")
+        scheme = ("scheme_id", "name")
+        return {
+            "priority_wards": _top(
+                self.wards,
+                "priority_score",
+                n,
+                lowest=False,
+                fields=ward
+                + ("priority_score", "vulnerability_score", "coverage_ratio"),
+            ),
+            "lowest_coverage_wards": _top(
+                self.wards,
+                "coverage_ratio",
+                n,
+                lowest=True,
+                fields=ward + ("coverage_ratio", "eligible_population"),
+            ),
+            "most_vulnerable_wards": _top(
+                self.wards,
+                "vulnerability_score",
+                n,
+                lowest=False,
+                fields=ward + ("vulnerability_score", "risk_level"),
+            ),
+            "most_pending_grievance_wards": _top(
+                self.wards,
+                "grievances_pending",
+                n,
+                lowest=False,
+                fields=ward + ("grievances_pending", "resolution_rate"),
+            ),
+            "lowest_resolution_schemes": _top(
+                self.schemes,
+                "resolution_rate",
+                n,
+                lowest=True,
+                fields=scheme + ("resolution_rate", "avg_resolution_days"),
+            ),
+            "lowest_approval_schemes": _top(
+                self.schemes,
+                "approval_rate",
+                n,
+                lowest=True,
+                fields=scheme + ("approval_rate", "applications_received"),
+            ),
+            "underutilized_schemes": _top(
+                self.schemes,
+                "budget_utilization",
+                n,
+                lowest=True,
+                fields=scheme + ("budget_utilization", "budget_allocated"),
+            ),
+        }
+
+    def get_wards(
+        self, sort: Optional[str] = None, descending: bool = False, limit: int = None
+    ) -> List[Dict]:
+        """Get ward rows, optionally sorted by a metric (unknown values last)"""
+        return self._sorted(self.wards, sort, descending, limit)
+
+    def get_schemes(
+        self,
+        sort: Optional[str] = None,
+        descending: bool = False,
+        limit: int = None,
+        category: Optional[str] = None,
+    ) -> List[Dict]:
+        """Get scheme rows, optionally filtered by category and sorted by a metric"""
+        rows = self.schemes
+        if category:
+            rows = [
+                row
+                for row in rows
+                if (row["category"] or "").lower() == category.lower()
+            ]
+        return self._sorted(rows, sort, descending, limit)
+
+    @staticmethod
+    def _sorted(rows, sort, descending, limit) -> List[Dict]:
+        if sort:
+            if rows and sort not in rows[0]:
+                raise ValueError(f"Unknown sort field: {sort}")
+            known = [row for row in rows if row[sort] is not None]
+            unknown = [row for row in rows if row[sort] is None]
+            rows = (
+                sorted(known, key=lambda row: row[sort], reverse=descending) + unknown
+            )
+        return rows[:limit] if limit else list(rows)
+
+    def get_ward(self, ward_id: str) -> Optional[Dict]:
+        return self.ward_index.get(ward_id.upper())
+
+    def get_scheme(self, scheme_id: str) -> Optional[Dict]:
+        return self.scheme_index.get(scheme_id.upper())
+
+    def get_bottlenecks(self, n: Optional[int] = None) -> Dict[str, List[Dict]]:
+        """Get the top-N bottleneck lists (at most the precomputed top_n)"""
+        if n is None or n >= self.top_n:
+            return self.bottlenecks
+        return {name: rows[:n] for name, rows in self.bottlenecks.items()}
+
+    def facts(self, n: int = 5) -> Dict:
+        """Compact precomputed facts for the leader prompt"""
+        return {
+            "city_summary": self.summary,
+            "budget_by_category": self.budget_by_category,
+            **self.get_bottlenecks(n),
+        }
+
+
+def build_analytics(kb: Dict, top_n: int = 10) -> Optional[KBAnalytics]:
+    """
+    Build analytics for a knowledge base, or None if NumPy is not installed
+    or the data cannot be aggregated
+    """
+    if np is None:
+        return None
+    try:
+        return KBAnalytics(kb, top_n=top_n)
+    except Exception:
+        logger.exception("Could not build knowledge base analytics")
+        return None
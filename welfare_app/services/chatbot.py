@@ -3,16 +3,57 @@ Sahayak AI Chatbot - Main Service
 Integrates all components into a single interface
 """
 
-import json
+import asyncio
+import logging
 import os
-from pathlib import Path
-from typing import Dict, Optional
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional
 from django.conf import settings
-from groq import Groq
+from asgiref.sync import sync_to_async
 
 from .knowledge_retriever import KnowledgeRetriever
 from .ai_controller import AIController
 from .handlers import CitizenHandler, EmployeeHandler, LeaderHandler, HandlerRegistry
+from .llm_client import build_llm_client
+from .metrics import build_metrics, record_stage, timed
+from .fast_path import build_fast_path
+from .kb_loader import (
+    KnowledgeBaseWatcher,
+    file_signature,
+    get_dataset_path,
+    load_knowledge_base,
+    load_snapshot,
+)
+from .profiling import build_profiler
+from .prompt_context import PromptContextCache
+from .response_cache import build_response_cache
+from .session_store import PAGE_FIELDS, SessionLocks, build_session_store
+from .single_flight import build_single_flight
+
+logger = logging.getLogger(__name__)
+
+
+class KnowledgeSnapshot:
+    """
+    One loaded version of the knowledge base with the retriever and handlers built on it
+
+    Requests take the current snapshot once and use it throughout, so a reload
+    swapped in mid-request never mixes two versions.
+    """
+
+    __slots__ = ("knowledge_base", "retriever", "registry", "version", "modified")
+
+    def __init__(self, knowledge_base, retriever, registry, version, modified):
+        self.knowledge_base = knowledge_base
+        self.retriever = retriever
+        self.registry = registry
+        self.version = version
+        # Unix time the dataset file was last modified (Last-Modified headers)
+        self.modified = modified
 
 
 class SahayakChatbot:
@@ -79,44 +120,150 @@ I can help you with:
         if not api_key:
             raise ValueError("GROQ_API_KEY not found in settings or environment")
 
-        self.client = Groq(api_key=api_key)
-
-        # Load knowledge base
-        if dataset_path is None:
-            dataset_path = getattr(settings, "WELFARE_DATASET_PATH", None)
-            if dataset_path is None:
-                # Default path
-                dataset_path = (
-                    Path(settings.BASE_DIR).parent / "SOCIAL_WELFAER_DATASET1.json"
-                )
-
-        self.knowledge_base = self._load_knowledge_base(dataset_path)
+        # Shared, pooled client with deadlines, retries and a circuit breaker
+        self.llm = build_llm_client(api_key)
+        self.client = self.llm.client
+        self.async_client = self.llm.async_client
 
         # Initialize components
-        self.retriever = KnowledgeRetriever(self.knowledge_base)
         self.controller = AIController()
 
-        # Initialize handlers
-        citizen_handler = CitizenHandler(self.retriever, self.client)
-        employee_handler = EmployeeHandler(self.retriever, self.client)
-        leader_handler = LeaderHandler(self.retriever, self.client)
+        # Caches shared by every knowledge base version (keyed by KB version)
+        self.context_cache = PromptContextCache()
+        self.response_cache = build_response_cache()
+        self.single_flight = build_single_flight()
+        self.fast_path = build_fast_path()
+        self.metrics = build_metrics()
+        self.profiler = build_profiler()
 
-        self.registry = HandlerRegistry(
-            citizen_handler, employee_handler, leader_handler
+        # Load knowledge base
+        self.dataset_path = dataset_path or get_dataset_path()
+        self.kb_watcher = KnowledgeBaseWatcher(
+            self.dataset_path,
+            check_interval=getattr(settings, "KB_RELOAD_CHECK_INTERVAL", 5),
         )
+        self._reload_lock = threading.Lock()
+        self._snapshot = None
+        self.reload_knowledge_base()
 
         # Session storage for conversation history
-        self.conversation_history = {}
+        self.session_store = build_session_store()
+        self.session_locks = SessionLocks()
+
+        # Bounded pool for batch requests (created on first use)
+        self._batch_executor = None
+        self._batch_executor_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> KnowledgeSnapshot:
+        """The current knowledge base snapshot"""
+        return self._snapshot
+
+    @property
+    def knowledge_base(self) -> Dict:
+        return self._snapshot.knowledge_base
+
+    @property
+    def retriever(self) -> KnowledgeRetriever:
+        return self._snapshot.retriever
+
+    @property
+    def registry(self) -> HandlerRegistry:
+        return self._snapshot.registry
+
+    @property
+    def kb_version(self) -> int:
+        return self._snapshot.version
+
+    def _build_registry(self, retriever: KnowledgeRetriever) -> HandlerRegistry:
+        """Build the persona handlers for one knowledge base version"""
+        handler_args = (
+            retriever,
+            self.llm,
+            self.context_cache,
+            self.response_cache,
+            self.single_flight,
+        )
+        citizen_handler = CitizenHandler(*handler_args)
+        employee_handler = EmployeeHandler(*handler_args)
+        leader_handler = LeaderHandler(*handler_args)
 
-    def _load_knowledge_base(self, path) -> Dict:
-        """Load the knowledge base from JSON file"""
+        return HandlerRegistry(citizen_handler, employee_handler, leader_handler)
+
+    def reload_knowledge_base(self) -> int:
+        """
+        Parse and index the dataset, then atomically swap it in
+
+        A compiled snapshot (manage.py compile_kb) is used instead of the JSON
+        file when one exists for the current file. The new version number is the file's mtime in nanoseconds, so workers
+        reading the same file agree on it (bumped if the mtime did not move).
+
+        Returns:
+            The version number of the loaded knowledge base
+        """
+        with self._reload_lock:
+            signature = file_signature(self.dataset_path)
+            try:
+                compiled = load_snapshot(self.dataset_path)
+                if compiled is not None:
+                    knowledge_base, indexes = compiled
+                else:
+                    knowledge_base, indexes = (
+                        load_knowledge_base(self.dataset_path),
+                        None,
+                    )
+            finally:
+                # Don't retry a broken file until it changes again
+                self.kb_watcher.mark_loaded(signature)
+
+            version = signature[0] if signature else 1
+            if self._snapshot is not None and version <= self._snapshot.version:
+                version = self._snapshot.version + 1
+
+            retriever = KnowledgeRetriever(
+                knowledge_base,
+                version=version,
+                indexes=indexes,
+                analytics_top_n=getattr(settings, "ANALYTICS_TOP_N", 10),
+            )
+            registry = self._build_registry(retriever)
+            self._snapshot = KnowledgeSnapshot(
+                knowledge_base,
+                retriever,
+                registry,
+                version,
+                signature[0] / 1e9 if signature else time.time(),
+            )
+        return version
+
+    def _reload_in_background(self):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Knowledge base not found at: {path}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in knowledge base: {e}")
+            version = self.reload_knowledge_base()
+            logger.info("Reloaded knowledge base (version %s)", version)
+            self.warm_up()
+        except Exception:
+            logger.exception("Knowledge base reload failed; keeping current version")
+
+    def warm_up(self):
+        """
+        Build everything the first requests would otherwise build
+
+        Packs the prompt context of every persona and language and builds
+        the fast-path name index for the current knowledge base version.
+        """
+        snapshot = self.snapshot
+        for handler in snapshot.registry.handlers.values():
+            for language in sorted(set(self.LANGUAGE_MAP.values())):
+                handler.get_context(language)
+        if self.fast_path is not None:
+            self.fast_path.prepare(snapshot.retriever)
+
+    def check_for_kb_update(self):
+        """Start a background reload if the dataset file changed on disk"""
+        if self.kb_watcher.changed() and not self._reload_lock.locked():
+            threading.Thread(
+                target=self._reload_in_background, name="kb-reload", daemon=True
+            ).start()
 
     def get_greeting(self, language: str = "English") -> str:
         """Get greeting message in specified language"""
@@ -133,7 +280,11 @@ I can help you with:
         return self.LANGUAGE_MAP.get(language_input.lower(), "English")
 
     def chat(
-        self, user_message: str, session_id: str = "default", language: str = None
+        self,
+        user_message: str,
+        session_id: str = "default",
+        language: str = None,
+        use_cache: bool = True,
     ) -> Dict:
         """
         Process a chat message and return response
@@ -142,34 +293,30 @@ I can help you with:
             user_message: The user's input message
             session_id: Unique session identifier for conversation history
             language: Override language (optional)
+            use_cache: Set False to bypass the LLM response cache
 
         Returns:
             Dictionary with response and metadata
         """
         # Check for language change request
-        if user_message.strip() in ["1", "2", "3"]:
-            new_lang = self.set_language(user_message.strip())
-            return {
-                "response": self.get_greeting(new_lang),
-                "language": new_lang,
-                "persona": None,
-                "intent": "language_change",
-                "language_changed": True,
-            }
+        if self._is_language_change(user_message):
+            return self._language_change_result(user_message)
 
-        # Analyze the input
-        context = self.controller.analyze(user_message, language_override=language)
+        # Pin the knowledge base version for this request
+        self.check_for_kb_update()
+        snapshot = self.snapshot
 
-        # Get response from appropriate handler
-        response = self.registry.route(context)
+        with self._session_lock(session_id):
+            # Analyze the input
+            context = self._analyze(user_message, language)
 
-        # Store in conversation history
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
+            # Answer structured questions from the KB, the rest from the handlers
+            response = self._fast_answer(user_message, context, snapshot)
+            if response is None:
+                response = snapshot.registry.route(context, use_cache=use_cache)
 
-        self.conversation_history[session_id].append(
-            {"user": user_message, "assistant": response, "metadata": context}
-        )
+            # Store in conversation history
+            self._record_turn(session_id, user_message, response, context)
 
         return {
             "response": response,
@@ -177,24 +324,381 @@ I can help you with:
             "persona": context["persona"],
             "intent": context["intent"],
             "language_changed": False,
+            "context_tokens": context.get("context_tokens"),
+            "fast_path": context.get("fast_path"),
+            "stages": context.get("stages"),
+        }
+
+    async def achat(
+        self,
+        user_message: str,
+        session_id: str = "default",
+        language: str = None,
+        use_cache: bool = True,
+    ) -> Dict:
+        """
+        Async version of chat() for ASGI deployments
+
+        The LLM call awaits the AsyncGroq client, so no thread is held while
+        waiting on the network.
+        """
+        if self._is_language_change(user_message):
+            return self._language_change_result(user_message)
+
+        self.check_for_kb_update()
+        snapshot = self.snapshot
+
+        async with self._asession_lock(session_id):
+            context = self._analyze(user_message, language)
+            response = self._fast_answer(user_message, context, snapshot)
+            if response is None:
+                response = await snapshot.registry.aroute(context, use_cache=use_cache)
+            self._record_turn(session_id, user_message, response, context)
+
+        return {
+            "response": response,
+            "language": context["language"],
+            "persona": context["persona"],
+            "intent": context["intent"],
+            "language_changed": False,
+            "context_tokens": context.get("context_tokens"),
+            "fast_path": context.get("fast_path"),
+            "stages": context.get("stages"),
+        }
+
+    def chat_batch(self, items: List[Dict], use_cache: bool = True) -> List[Dict]:
+        """
+        Process many chat messages concurrently
+
+        Messages of the same session run one after another in input order (so
+        history stays ordered); different sessions run in parallel on a
+        bounded thread pool, so the batch takes about as long as its slowest
+        session rather than the sum of all calls.
+
+        Args:
+            items: [{"message", "session_id" (optional), "language" (optional)}]
+
+        Returns:
+            One result per item, in input order, each with "success" and either
+            the chat() fields or an "error"
+        """
+        results = [None] * len(items)
+        sessions = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not str(item.get("message", "")).strip():
+                results[index] = {"success": False, "error": "Message is required"}
+                continue
+            session_id = item.get("session_id")
+            if session_id is None:
+                session_id = "default"
+            elif not isinstance(session_id, str):
+                results[index] = {
+                    "success": False,
+                    "error": "session_id must be a string",
+                }
+                continue
+            sessions.setdefault(session_id, []).append(index)
+
+        def run_session(session_id: str, indexes: List[int]):
+            for index in indexes:
+                item = items[index]
+                try:
+                    result = self.chat(
+                        str(item["message"]).strip(),
+                        session_id=session_id,
+                        language=item.get("language"),
+                        use_cache=use_cache,
+                    )
+                    results[index] = {"success": True, **result}
+                except Exception as e:
+                    results[index] = {"success": False, "error": str(e)}
+
+        executor = self._get_batch_executor()
+        futures = [
+            executor.submit(run_session, session_id, indexes)
+            for session_id, indexes in sessions.items()
+        ]
+        for future in futures:
+            future.result()
+        return results
+
+    def _get_batch_executor(self) -> ThreadPoolExecutor:
+        if self._batch_executor is None:
+            with self._batch_executor_lock:
+                if self._batch_executor is None:
+                    self._batch_executor = ThreadPoolExecutor(
+                        max_workers=getattr(settings, "CHAT_BATCH_MAX_WORKERS", 8),
+                        thread_name_prefix="chat-batch",
+                    )
+        return self._batch_executor
+
+    def chat_stream(
+        self,
+        user_message: str,
+        session_id: str = "default",
+        language: str = None,
+        use_cache: bool = True,
+    ) -> Iterator[Dict]:
+        """
+        Process a chat message and stream the response as events
+
+        Yields a "meta" event (language, persona, intent) first, then one
+        "token" event per response chunk, then a "done" event once the turn
+        has been saved to conversation history, or an "error" event.
+
+        The answer is produced on its own thread (see _produce_stream), so
+        the session lock is never held while waiting on a slow client.
+        """
+        events = queue.Queue()
+        self._start_stream(events.put, user_message, session_id, language, use_cache)
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+
+    async def achat_stream(
+        self,
+        user_message: str,
+        session_id: str = "default",
+        language: str = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[Dict]:
+        """Async version of chat_stream(), for streaming responses under ASGI"""
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        self._start_stream(
+            lambda event: loop.call_soon_threadsafe(events.put_nowait, event),
+            user_message,
+            session_id,
+            language,
+            use_cache,
+        )
+        while True:
+            event = await events.get()
+            if event is None:
+                return
+            yield event
+
+    def _start_stream(self, emit: Callable[[Optional[Dict]], None], *args):
+        threading.Thread(
+            target=self._produce_stream,
+            args=(emit,) + args,
+            name="chat-stream",
+            daemon=True,
+        ).start()
+
+    def _produce_stream(
+        self,
+        emit: Callable[[Optional[Dict]], None],
+        user_message: str,
+        session_id: str,
+        language: Optional[str],
+        use_cache: bool,
+    ):
+        """
+        Run a streamed turn, passing each event to emit() and None at the end
+
+        The turn runs to completion and is recorded even if the client has
+        gone away, so the session lock is released at the LLM's pace.
+        """
+        try:
+            if self._is_language_change(user_message):
+                result = self._language_change_result(user_message)
+                response = result.pop("response")
+                emit({"event": "meta", "data": result})
+                emit({"event": "token", "data": {"text": response}})
+                emit({"event": "done", "data": {"response": response}})
+                return
+
+            self.check_for_kb_update()
+            snapshot = self.snapshot
+
+            with self._session_lock(session_id):
+                context = self._analyze(user_message, language)
+                fast_response = self._fast_answer(user_message, context, snapshot)
+                emit(
+                    {
+                        "event": "meta",
+                        "data": {
+                            "language": context["language"],
+                            "persona": context["persona"],
+                            "intent": context["intent"],
+                            "language_changed": False,
+                        },
+                    }
+                )
+
+                if fast_response is not None:
+                    stream = iter([fast_response])
+                else:
+                    stream = snapshot.registry.route_stream(
+                        context, use_cache=use_cache
+                    )
+
+                chunks = []
+                for text in stream:
+                    chunks.append(text)
+                    emit({"event": "token", "data": {"text": text}})
+
+                response = "".join(chunks)
+                self._record_turn(session_id, user_message, response, context)
+            emit({"event": "done", "data": {"response": response}})
+        except Exception as e:
+            logger.exception("Streamed chat turn failed")
+            emit({"event": "error", "data": {"error": str(e)}})
+        finally:
+            emit(None)
+
+    def _session_lock(self, session_id: str):
+        """
+        Lock that keeps the turns of one session in order
+
+        The shared "default" session of clients that send no session_id is not
+        locked; otherwise all of their requests would run one at a time.
+        """
+        if session_id == "default":
+            return nullcontext()
+        return self.session_locks.hold(session_id)
+
+    def _asession_lock(self, session_id: str):
+        if session_id == "default":
+            return nullcontext()
+        return self.session_locks.ahold(session_id)
+
+    def _analyze(self, user_message: str, language: Optional[str]) -> Dict:
+        started = time.perf_counter()
+        # Client-supplied, so map it to one of the supported languages
+        if not isinstance(language, str) or not language:
+            language = None
+        else:
+            language = self.set_language(language)
+        context = self.controller.analyze(user_message, language_override=language)
+        context["started_at"] = started
+        record_stage(context, "analyze", time.perf_counter() - started)
+        return context
+
+    def _fast_answer(
+        self, user_message: str, context: Dict, snapshot: KnowledgeSnapshot
+    ) -> Optional[str]:
+        """Answer from the knowledge base without the LLM, if the question allows"""
+        if self.fast_path is None:
+            return None
+        with timed(context, "fast_path"):
+            response = self.fast_path.resolve(user_message, context, snapshot.retriever)
+        if response is not None:
+            context["source"] = "fast_path"
+        return response
+
+    def _is_language_change(self, user_message: str) -> bool:
+        return user_message.strip() in ["1", "2", "3"]
+
+    def _language_change_result(self, user_message: str) -> Dict:
+        new_lang = self.set_language(user_message.strip())
+        return {
+            "response": self.get_greeting(new_lang),
+            "language": new_lang,
+            "persona": None,
+            "intent": "language_change",
+            "language_changed": True,
         }
 
+    def _record_turn(
+        self, session_id: str, user_message: str, response: str, context: Dict
+    ):
+        """Store a completed turn in conversation history and record its metrics"""
+        with timed(context, "history"):
+            self.session_store.append(session_id, user_message, response, context)
+        if self.metrics is not None:
+            record_stage(context, "total", time.perf_counter() - context["started_at"])
+            self.metrics.observe(context)
+
     def get_conversation_history(self, session_id: str = "default") -> list:
         """Get conversation history for a session"""
-        return self.conversation_history.get(session_id, [])
+        return self.session_store.get(session_id)
+
+    def get_history_page(
+        self,
+        session_id: str = "default",
+        limit: int = 50,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        since: Optional[float] = None,
+        fields=PAGE_FIELDS,
+    ) -> Dict:
+        """
+        Get one page of a session's history, oldest turn first
+
+        Pages back from before (or the newest turn), or forward from after or
+        since (a Unix time). The cursors of the page continue in either direction.
+        """
+        turns, has_more = self.session_store.page(
+            session_id, limit, before=before, after=after, since=since
+        )
+        return {
+            "history": [turn.to_dict(fields) for turn in turns],
+            "has_more": has_more,
+            "cursors": {
+                "before": turns[0].id if turns else before,
+                "after": turns[-1].id if turns else after,
+            },
+        }
 
     def clear_conversation_history(self, session_id: str = "default"):
         """Clear conversation history for a session"""
-        if session_id in self.conversation_history:
-            del self.conversation_history[session_id]
+        self.session_store.clear(session_id)
+
+    def get_history_stats(self) -> Dict:
+        """Get session store memory and eviction statistics"""
+        stats = self.session_store.get_stats()
+        stats["session_locks"] = self.session_locks.get_stats()
+        return stats
 
     def get_stats(self) -> Dict:
         """Get knowledge base statistics"""
         return self.retriever.get_stats()
 
+    def get_llm_stats(self) -> Dict:
+        """Get LLM client, circuit breaker and request coalescing statistics"""
+        stats = self.llm.get_stats()
+        stats["coalescing"] = (
+            self.single_flight.get_stats() if self.single_flight else None
+        )
+        return stats
+
+    def get_fast_path_stats(self) -> Optional[Dict]:
+        """Get how many requests were answered without calling the LLM"""
+        return self.fast_path.get_stats() if self.fast_path else None
+
+    def get_profiling_stats(self) -> Optional[Dict]:
+        """Get how many requests were profiled and how many profiles were kept"""
+        return self.profiler.get_stats() if self.profiler else None
+
+    def render_metrics(self) -> Optional[str]:
+        """Get request and component metrics in Prometheus text format"""
+        if self.metrics is None:
+            return None
+        return self.metrics.render(
+            {
+                "cache": self.get_cache_stats(),
+                "llm": self.get_llm_stats(),
+                "fast_path": self.get_fast_path_stats(),
+            }
+        )
+
+    def get_cache_stats(self) -> Dict:
+        """Get prompt-context and response cache statistics"""
+        return {
+            "prompt_context": self.context_cache.get_stats(),
+            "response": (
+                self.response_cache.get_stats() if self.response_cache else None
+            ),
+        }
+
 
 # Singleton instance
 _chatbot_instance = None
+_chatbot_instance_lock = threading.Lock()
 
 
 def get_chatbot_instance() -> SahayakChatbot:
@@ -204,5 +708,18 @@ def get_chatbot_instance() -> SahayakChatbot:
     """
     global _chatbot_instance
     if _chatbot_instance is None:
-        _chatbot_instance = SahayakChatbot()
+        # Threads arriving together wait for one build instead of each loading the KB
+        with _chatbot_instance_lock:
+            if _chatbot_instance is None:
+                _chatbot_instance = SahayakChatbot()
     return _chatbot_instance
+
+
+async def aget_chatbot_instance() -> SahayakChatbot:
+    """
+    Async version of get_chatbot_instance()
+    The first call builds the chatbot in a worker thread so the event loop is not blocked
+    """
+    if _chatbot_instance is not None:
+        return _chatbot_instance
+    return await sync_to_async(get_chatbot_instance)()
@@ -0,0 +1,150 @@
+"""
+Context Packer for Sahayak AI
+Fills a prompt token budget with whole knowledge base records
+"""
+
+import json
+import math
+from typing import Dict, Iterable, List, Union
+
+from django.conf import settings
+
+# Average characters per token. ASCII text (English, JSON syntax, numbers)
+# packs about 4 characters into a token; Devanagari costs far more per char.
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 1.5
+
+# Default context budgets (tokens) per persona
+DEFAULT_TOKEN_BUDGETS = {"citizen": 600, "employee": 900, "leader": 1200}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the LLM token count of a string without running a tokenizer"""
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    other_chars = len(text) - ascii_chars
+    return math.ceil(
+        ascii_chars / ASCII_CHARS_PER_TOKEN + other_chars / OTHER_CHARS_PER_TOKEN
+    )
+
+
+def get_token_budget(persona: str, model: str) -> int:
+    """
+    Get the context token budget for a persona and model
+
+    CONTEXT_TOKEN_BUDGETS may map personas to budgets, and/or model names to
+    per-persona budgets, e.g. {"citizen": 500, "llama-3.3-70b-versatile": {"leader": 3000}}
+    """
+    budgets = getattr(settings, "CONTEXT_TOKEN_BUDGETS", {})
+    per_model = budgets.get(model)
+    if isinstance(per_model, dict) and persona in per_model:
+        return per_model[persona]
+    if isinstance(budgets.get(persona), int):
+        return budgets[persona]
+    return DEFAULT_TOKEN_BUDGETS.get(persona, 600)
+
+
+class EncodedRecord:
+    """A JSON-encoded record with its estimated token cost"""
+
+    __slots__ = ("text", "tokens")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = estimate_tokens(text)
+
+    @classmethod
+    def from_record(cls, record) -> "EncodedRecord":
+        return cls(json.dumps(record, ensure_ascii=False))
+
+
+class PackedContext:
+    """Serialized prompt context and how much of its budget it used"""
+
+    __slots__ = ("text", "tokens", "budget", "records", "dropped")
+
+    def __init__(self, text: str, tokens: int, budget: int, records: int, dropped: int):
+        self.text = text
+        self.tokens = tokens
+        self.budget = budget
+        self.records = records
+        self.dropped = dropped
+
+    def __str__(self):
+        return self.text
+
+
+def _encode(records: Iterable[Union[Dict, EncodedRecord]]) -> List[EncodedRecord]:
+    return [
+        r if isinstance(r, EncodedRecord) else EncodedRecord.from_record(r)
+        for r in records
+    ]
+
+
+def pack_records(
+    records: Iterable[Union[Dict, EncodedRecord]], budget: int
+) -> PackedContext:
+    """
+    Pack records, in priority order, into a JSON array within a token budget
+
+    Records are kept whole; one that does not fit is skipped and smaller
+    records after it may still be used, so the budget is neither exceeded
+    nor left unused while something fits.
+    """
+    used = 1  # brackets
+    parts = []
+    dropped = 0
+    for record in _encode(records):
+        cost = record.tokens + 1  # separator
+        if used + cost > budget:
+            dropped += 1
+            continue
+        parts.append(record.text)
+        used += cost
+    return PackedContext(
+        "[" + ", ".join(parts) + "]", used, budget, len(parts), dropped
+    )
+
+
+def pack_sections(sections: Dict, budget: int) -> PackedContext:
+    """
+    Pack a dict of named sections into a JSON object within a token budget
+
+    Non-list sections (stats, meta) are always included. List sections are
+    filled round-robin, one record from each in turn, so every section is
+    represented by its highest-priority records.
+    """
+    fixed = {}
+    queues = {}
+    used = 1  # braces
+    for key, value in sections.items():
+        key_cost = estimate_tokens(json.dumps(key)) + 1
+        if isinstance(value, list):
+            queues[key] = _encode(value)
+            used += key_cost + 1  # brackets
+        else:
+            fixed[key] = EncodedRecord.from_record(value)
+            used += key_cost + fixed[key].tokens
+
+    chosen = {key: [] for key in queues}
+    dropped = 0
+    depth = max((len(q) for q in queues.values()), default=0)
+    for i in range(depth):
+        for key, queue in queues.items():
+            if i >= len(queue):
+                continue
+            cost = queue[i].tokens + 1
+            if used + cost > budget:
+                dropped += 1
+                continue
+            chosen[key].append(queue[i].text)
+            used += cost
+
+    parts = []
+    for key in sections:
+        if key in fixed:
+            value = fixed[key].text
+        else:
+            value = "[" + ", ".join(chosen[key]) + "]"
+        parts.append(f"{json.dumps(key, ensure_ascii=False)}: {value}")
+    records = sum(len(items) for items in chosen.values())
+    return PackedContext("{" + ", ".join(parts) + "}", used, budget, records, dropped)
@@ -0,0 +1,298 @@
+"""
+Fast Path for Sahayak AI
+Answers structured factual questions straight from the knowledge base, without the LLM
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .handlers import localized
+from .knowledge_retriever import KnowledgeRetriever
+from .scheme_search import tokenize
+
+# Vocabularies are in tokenize() form: lowercased, stopwords removed and
+# English plurals folded ("schemes" -> "scheme")
+COUNT_WORDS = frozenset(
+    "many total number count कितनी कितने कितना कुल संख्या किती एकूण".split()
+)
+COUNT_ENTITIES = {
+    "schemes": frozenset(
+        "scheme योजना योजनाएं योजनाएँ योजनाओं योजनांची योजनाची".split()
+    ),
+    "wards": frozenset("ward वार्ड वॉर्ड प्रभाग प्रभागांची".split()),
+    "citizens": frozenset("citizen नागरिक नागरिकों नागरिकांची".split()),
+}
+ELIGIBILITY_WORDS = frozenset(
+    "eligibility eligible criteria qualify पात्रता योग्यता पात्र".split()
+)
+DOCUMENT_WORDS = frozenset(
+    "document paper दस्तावेज दस्तावेज़ कागजात कागज कागदपत्रे कागदपत्र".split()
+)
+COVERAGE_WORDS = frozenset(
+    "coverage covered enrolled enrollment enrolment beneficiarie beneficiary "
+    "कवरेज कव्हरेज लाभार्थी नामांकन".split()
+)
+# Words that add nothing to a structured question
+FILLER_WORDS = frozenset(
+    "there thane tmc city currently available have we exist registered running "
+    "under all list show give need needed required require which much "
+    "शहर ठाणे उपलब्ध चाहिए आवश्यक बताइए बताओ सभी शहरात लागतात लागणारे हवे "
+    "कोणते कोणती सांगा सर्व".split()
+)
+
+TEMPLATES = {
+    "English": {
+        "schemes": "There are {count} welfare schemes.",
+        "wards": "There are {count} wards.",
+        "citizens": "There are {count} registered citizens.",
+        "eligibility": "Eligibility for {name}: {value}",
+        "documents": "Documents required for {name}: {value}",
+        "coverage": (
+            "{name} coverage: {enrolled} of {eligible} eligible residents "
+            "enrolled ({ratio})."
+        ),
+    },
+    "Hindi": {
+        "schemes": "कुल {count} कल्याण योजनाएं हैं।",
+        "wards": "कुल {count} वार्ड हैं।",
+        "citizens": "कुल {count} पंजीकृत नागरिक हैं।",
+        "eligibility": "{name} के लिए पात्रता: {value}",
+        "documents": "{name} के लिए आवश्यक दस्तावेज़: {value}",
+        "coverage": (
+            "{name} में कवरेज: {eligible} पात्र निवासियों में से {enrolled} "
+            "नामांकित ({ratio})।"
+        ),
+    },
+    "Marathi": {
+        "schemes": "एकूण {count} कल्याण योजना आहेत.",
+        "wards": "एकूण {count} प्रभाग आहेत.",
+        "citizens": "एकूण {count} नोंदणीकृत नागरिक आहेत.",
+        "eligibility": "{name} साठी पात्रता: {value}",
+        "documents": "{name} साठी आवश्यक कागदपत्रे: {value}",
+        "coverage": (
+            "{name} मधील कव्हरेज: {eligible} पात्र रहिवाशांपैकी {enrolled} "
+            "नोंदणीकृत ({ratio})."
+        ),
+    },
+}
+
+STAT_KEYS = {
+    "schemes": "total_schemes",
+    "wards": "total_wards",
+    "citizens": "total_citizens",
+}
+
+
+class NameIndex:
+    """
+    Scheme and ward names of one KB version, keyed by their token sequence
+
+    A query is matched by looking up each of its word n-grams, so the cost
+    depends on the query length, not on how many names the KB holds.
+    """
+
+    MAX_NAME_WORDS = 8
+
+    def __init__(self, retriever: KnowledgeRetriever):
+        self.version = retriever.version
+        self.schemes = self._index(
+            retriever.get_schemes(), "scheme_id", ("name", "scheme_name")
+        )
+        self.wards = self._index(
+            retriever.get_wards(), "ward_id", ("ward_name", "name")
+        )
+        longest = max((len(key) for key in (*self.schemes, *self.wards)), default=1)
+        self.max_words = min(longest, self.MAX_NAME_WORDS)
+
+    def _index(self, records: List[Dict], id_field: str, name_fields: tuple):
+        index = {}
+        for record in records:
+            names = [str(record.get(id_field, ""))]
+            for field in name_fields:
+                names += [
+                    value
+                    for key, value in record.items()
+                    if key.startswith(field) and isinstance(value, str)
+                ]
+            for name in names:
+                key = tuple(tokenize(name))
+                if key:
+                    index.setdefault(key, record)
+        return index
+
+    def find(self, tokens: List[str]) -> Tuple[Optional[Dict], Optional[Dict], set]:
+        """
+        Find the scheme and ward named in the query
+
+        Returns (scheme, ward, positions of the tokens they cover); a kind is
+        None unless exactly one distinct record of it was named.
+        """
+        schemes, wards, covered = {}, {}, set()
+        for size in range(min(self.max_words, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                span = range(start, start + size)
+                if covered.intersection(span):
+                    continue
+                key = tuple(tokens[start : start + size])
+                for index, found in ((self.schemes, schemes), (self.wards, wards)):
+                    record = index.get(key)
+                    if record is not None:
+                        found[id(record)] = record
+                        covered.update(span)
+                        break
+        scheme = next(iter(schemes.values())) if len(schemes) == 1 else None
+        ward = next(iter(wards.values())) if len(wards) == 1 else None
+        return scheme, ward, covered
+
+
+class FastPathResolver:
+    """
+    Recognizes structured questions and answers them from templates
+
+    - counts: "how many schemes are there", "total wards", "कुल योजनाएं"
+    - a scheme's eligibility or required documents
+    - a ward's beneficiary coverage (needs the precomputed analytics)
+
+    Anything else returns None and goes to the LLM handlers as usual.
+    """
+
+    def __init__(self, max_words: int = 12, max_unknown_words: int = 1):
+        self.max_words = max_words
+        self.max_unknown_words = max_unknown_words
+        self._names = None
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.answered = 0
+        self.by_kind = {}
+
+    def _name_index(self, retriever: KnowledgeRetriever) -> NameIndex:
+        names = self._names
+        if names is None or names.version != retriever.version:
+            # Built by one thread; the others wait for it rather than build their own
+            with self._lock:
+                names = self._names
+                if names is None or names.version != retriever.version:
+                    names = self._names = NameIndex(retriever)
+        return names
+
+    def prepare(self, retriever: KnowledgeRetriever):
+        """Build the name index now instead of on the first question"""
+        self._name_index(retriever)
+
+    def resolve(
+        self, query: str, context: Dict, retriever: KnowledgeRetriever
+    ) -> Optional[str]:
+        """
+        Answer the query from the knowledge base, or return None
+
+        On success context["fast_path"] is set to the kind of answer given.
+        """
+        with self._lock:
+            self.checked += 1
+        tokens = tokenize(query)
+        if not tokens or len(tokens) > self.max_words:
+            return None
+
+        kind, response = self._answer(tokens, context["language"], retriever)
+        if response is None:
+            return None
+
+        with self._lock:
+            self.answered += 1
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + 1
+        context["fast_path"] = kind
+        return response
+
+    def _answer(self, tokens: List[str], language: str, retriever):
+        templates = TEMPLATES.get(language, TEMPLATES["English"])
+        words = set(tokens)
+
+        # Counts: only count, entity and filler words are allowed
+        entities = [name for name, vocab in COUNT_ENTITIES.items() if words & vocab]
+        if words & COUNT_WORDS and len(entities) == 1:
+            allowed = COUNT_WORDS | COUNT_ENTITIES[entities[0]] | FILLER_WORDS
+            if words <= allowed:
+                count = retriever.get_stats()[STAT_KEYS[entities[0]]]
+                return "count", templates[entities[0]].format(count=count)
+
+        aspects = [
+            (kind, vocab)
+            for kind, vocab in (
+                ("eligibility", ELIGIBILITY_WORDS),
+                ("documents", DOCUMENT_WORDS),
+                ("coverage", COVERAGE_WORDS),
+            )
+            if words & vocab
+        ]
+        if len(aspects) != 1:
+            return None, None
+        kind, vocab = aspects[0]
+
+        scheme, ward, covered = self._name_index(retriever).find(tokens)
+        unknown = [
+            token
+            for i, token in enumerate(tokens)
+            if i not in covered and token not in vocab and token not in FILLER_WORDS
+        ]
+        if len(unknown) > self.max_unknown_words:
+            return None, None
+
+        if kind == "coverage":
+            if ward is None or scheme is not None:
+                return None, None
+            return kind, self._coverage(ward, templates, retriever)
+        if scheme is None or ward is not None:
+            return None, None
+        return kind, self._scheme_detail(kind, scheme, templates, language)
+
+    def _scheme_detail(self, kind, scheme, templates, language) -> Optional[str]:
+        if kind == "eligibility":
+            value = localized(scheme, ("eligibility", "eligibility_criteria"), language)
+        else:
+            value = localized(scheme, ("documents_required", "documents"), language)
+        if not value:
+            return None
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        name = localized(scheme, ("name", "scheme_name"), language)
+        return templates[kind].format(name=name or scheme.get("scheme_id"), value=value)
+
+    def _coverage(self, ward, templates, retriever) -> Optional[str]:
+        analytics = retriever.get_analytics()
+        if analytics is None:
+            return None
+        row = analytics.get_ward(str(ward.get("ward_id", "")))
+        if row is None or row["coverage_ratio"] is None:
+            return None
+        return templates["coverage"].format(
+            name=row["ward_name"],
+            enrolled=f"{row['enrolled_beneficiaries']:,}",
+            eligible=f"{row['eligible_population']:,}",
+            ratio=f"{row['coverage_ratio']:.1%}",
+        )
+
+    def _by_kind(self) -> Dict:
+        with self._lock:
+            return dict(self.by_kind)
+
+    def get_stats(self) -> Dict:
+        return {
+            "checked": self.checked,
+            "answered": self.answered,
+            "share": round(self.answered / self.checked, 4) if self.checked else 0.0,
+            "by_kind": self._by_kind(),
+        }
+
+
+def build_fast_path() -> Optional[FastPathResolver]:
+    """
+    Build the fast-path resolver configured in settings
+
+    FAST_PATH_ENABLED: set False to send every question to the LLM
+    FAST_PATH_MAX_WORDS: longer questions always go to the LLM
+    """
+    if not getattr(settings, "FAST_PATH_ENABLED", True):
+        return None
+    return FastPathResolver(max_words=getattr(settings, "FAST_PATH_MAX_WORDS", 12))
@@ -3,29 +3,308 @@ Handler Classes for Sahayak AI
 Each handler provides persona-specific responses
 """
 
-import json
-from typing import Dict
-from groq import Groq
+import logging
+import time
+from typing import Dict, Iterator, List
 from django.conf import settings
 
 from .knowledge_retriever import KnowledgeRetriever
+from .context_packer import (
+    EncodedRecord,
+    PackedContext,
+    get_token_budget,
+    pack_records,
+    pack_sections,
+)
+from .llm_client import LLMClient
+from .metrics import record_stage, record_usage, timed
+from .prompt_context import PromptContextCache
+from .response_cache import ResponseCache, request_key
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_SUFFIXES = {"Hindi": ("_hi", "_hindi"), "Marathi": ("_mr", "_marathi")}
+
+
+def localized(record: Dict, fields: tuple, language: str):
+    """Get the first present field of a record, preferring its language variant"""
+    for field in fields:
+        for suffix in LANGUAGE_SUFFIXES.get(language, ()):
+            if record.get(field + suffix):
+                return record[field + suffix]
+        if record.get(field):
+            return record[field]
+    return None
 
 
 class BaseHandler:
     """Base handler class"""
 
-    def __init__(self, retriever: KnowledgeRetriever, client: Groq):
+    name = "base"
+    temperature = 0.7
+    max_tokens = 500
+
+    def __init__(
+        self,
+        retriever: KnowledgeRetriever,
+        llm: LLMClient,
+        context_cache: PromptContextCache = None,
+        response_cache: ResponseCache = None,
+        single_flight: SingleFlight = None,
+    ):
         self.retriever = retriever
-        self.client = client
+        self.llm = llm
         self.model = getattr(settings, "GROQ_MODEL", "llama-3.1-8b-instant")
+        self.context_cache = context_cache or PromptContextCache()
+        self.response_cache = response_cache
+        self.single_flight = single_flight
+        self.token_budget = get_token_budget(self.name, self.model)
+
+    def build_context(self, language: str) -> PackedContext:
+        """Pack the knowledge base slice this handler sends to the LLM"""
+        raise NotImplementedError
+
+    def get_context(self, language: str) -> PackedContext:
+        """Get the packed prompt context, built once per KB version"""
+        return self.context_cache.get_or_build(
+            self.name,
+            language,
+            self.retriever.version,
+            lambda: self.build_context(language),
+        )
 
-    def handle(self, context: Dict) -> str:
+    def build_messages(self, context: Dict) -> List[Dict]:
+        """Build the chat messages sent to the LLM for this query"""
         raise NotImplementedError
 
+    def fallback_response(self, context: Dict) -> str:
+        """Deterministic answer from the knowledge base when the LLM is unavailable"""
+        raise NotImplementedError
+
+    def _fallback(self, context: Dict, error: Exception) -> str:
+        logger.warning("LLM call failed for %s handler: %s", self.name, error)
+        return self.fallback_response(context)
+
+    def generate(self, context: Dict) -> str:
+        """Call the LLM and return its answer; raises on failure"""
+        messages = self.build_messages(context)
+        with timed(context, "llm"):
+            response = self.llm.complete(
+                self.name,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+            )
+        record_usage(context, getattr(response, "usage", None))
+        return response.choices[0].message.content
+
+    def cache_key(self, context: Dict) -> str:
+        return self.response_cache.make_key(
+            self.name,
+            context["language"],
+            context["original_query"],
+            self.model,
+            self.retriever.version,
+        )
+
+    def flight_key(self, context: Dict) -> str:
+        return request_key(
+            self.name,
+            context["language"],
+            context["original_query"],
+            self.model,
+            self.retriever.version,
+        )
+
+    def handle(self, context: Dict, use_cache: bool = True) -> str:
+        """
+        Answer a query, serving repeated questions from the response cache
+
+        Concurrent identical queries that miss the cache share one LLM call.
+
+        Args:
+            context: Analysis context from AIController.analyze
+            use_cache: Set False to bypass the response cache for this request
+        """
+        context["model"] = self.model
+        key = None
+        if use_cache and self.response_cache is not None:
+            with timed(context, "cache"):
+                key = self.cache_key(context)
+                cached = self.response_cache.get(key)
+            if cached is not None:
+                context["source"] = "cache"
+                return cached
+
+        if self.single_flight is None:
+            return self._answer(context, key)
+        started = time.perf_counter()
+        response = self.single_flight.do(
+            self.flight_key(context), lambda: self._answer(context, key)
+        )
+        self._mark_coalesced(context, started)
+        return response
+
+    def _mark_coalesced(self, context: Dict, started: float):
+        if "source" not in context:
+            # Another request made the LLM call; this one waited for it
+            context["source"] = "coalesced"
+            record_stage(context, "coalesced", time.perf_counter() - started)
+
+    def _answer(self, context: Dict, cache_key: str = None) -> str:
+        try:
+            response = self.generate(context)
+        except Exception as e:
+            context["source"] = "fallback"
+            return self._fallback(context, e)
+        context["source"] = "llm"
+
+        if cache_key and response:
+            self.response_cache.set(cache_key, response)
+        return response
+
+    async def agenerate(self, context: Dict) -> str:
+        """Async version of generate() on the async LLM client"""
+        messages = self.build_messages(context)
+        with timed(context, "llm"):
+            response = await self.llm.acomplete(
+                self.name,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+            )
+        record_usage(context, getattr(response, "usage", None))
+        return response.choices[0].message.content
+
+    async def ahandle(self, context: Dict, use_cache: bool = True) -> str:
+        """Async version of handle() for the ASGI request path"""
+        context["model"] = self.model
+        key = None
+        if use_cache and self.response_cache is not None:
+            with timed(context, "cache"):
+                key = self.cache_key(context)
+                cached = await self.response_cache.aget(key)
+            if cached is not None:
+                context["source"] = "cache"
+                return cached
+
+        if self.single_flight is None:
+            return await self._aanswer(context, key)
+        started = time.perf_counter()
+        response = await self.single_flight.ado(
+            self.flight_key(context), lambda: self._aanswer(context, key)
+        )
+        self._mark_coalesced(context, started)
+        return response
+
+    async def _aanswer(self, context: Dict, cache_key: str = None) -> str:
+        try:
+            response = await self.agenerate(context)
+        except Exception as e:
+            context["source"] = "fallback"
+            return self._fallback(context, e)
+        context["source"] = "llm"
+
+        if cache_key and response:
+            await self.response_cache.aset(cache_key, response)
+        return response
+
+    def stream(self, context: Dict, use_cache: bool = True) -> Iterator[str]:
+        """
+        Answer a query as a stream of text chunks using Groq token streaming
+
+        A cached answer is yielded as a single chunk; a freshly streamed answer
+        is cached once it completes.
+        """
+        context["model"] = self.model
+        use_cache = use_cache and self.response_cache is not None
+        if use_cache:
+            with timed(context, "cache"):
+                key = self.cache_key(context)
+                cached = self.response_cache.get(key)
+            if cached is not None:
+                context["source"] = "cache"
+                yield cached
+                return
+
+        chunks = []
+        context["source"] = "llm"
+        started = None
+        try:
+            messages = self.build_messages(context)
+            started = time.perf_counter()
+            stream = self.llm.stream(
+                self.name,
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+            )
+            for chunk in stream:
+                # Groq reports usage on the last chunk
+                x_groq = getattr(chunk, "x_groq", None)
+                record_usage(
+                    context,
+                    getattr(chunk, "usage", None) or getattr(x_groq, "usage", None),
+                )
+                if not chunk.choices:
+                    continue
+                text = chunk.choices[0].delta.content
+                if text:
+                    if not chunks:
+                        record_stage(
+                            context, "first_token", time.perf_counter() - started
+                        )
+                    chunks.append(text)
+                    yield text
+        except Exception as e:
+            # Once part of the answer has been sent it is left as is
+            if not chunks:
+                context["source"] = "fallback"
+                yield self._fallback(context, e)
+            else:
+                logger.warning("LLM stream failed for %s handler: %s", self.name, e)
+            return
+        finally:
+            if started is not None:
+                record_stage(context, "llm", time.perf_counter() - started)
+
+        if use_cache and chunks:
+            self.response_cache.set(key, "".join(chunks))
+
 
 class CitizenHandler(BaseHandler):
     """Handler for citizen queries - Simple, friendly responses"""
 
+    name = "citizen"
+    temperature = 0.7
+    max_tokens = 500
+    relevant_schemes = 5
+
+    FALLBACK_TEXT = {
+        "English": {
+            "intro": "Our assistant is busy right now. These schemes may help you:",
+            "eligibility": "Who can apply",
+            "documents": "Documents",
+            "outro": "Please visit your ward office or try again in a few minutes.",
+        },
+        "Hindi": {
+            "intro": "हमारा सहायक अभी व्यस्त है। ये योजनाएं आपकी मदद कर सकती हैं:",
+            "eligibility": "कौन आवेदन कर सकता है",
+            "documents": "दस्तावेज़",
+            "outro": "कृपया अपने वार्ड कार्यालय जाएं या कुछ मिनट बाद फिर से प्रयास करें।",
+        },
+        "Marathi": {
+            "intro": "आमचा सहाय्यक सध्या व्यस्त आहे. या योजना तुम्हाला मदत करू शकतात:",
+            "eligibility": "कोण अर्ज करू शकतो",
+            "documents": "कागदपत्रे",
+            "outro": "कृपया तुमच्या प्रभाग कार्यालयाला भेट द्या किंवा काही मिनिटांनी पुन्हा प्रयत्न करा.",
+        },
+    }
+
     def get_system_prompt(self, language: str) -> str:
         prompts = {
             "English": """You are Sahayak, a helpful assistant for Thane Municipal Corporation.
@@ -53,46 +332,111 @@ Rules:
         }
         return prompts.get(language, prompts["English"])
 
-    def handle(self, context: Dict) -> str:
-        query = context["original_query"]
-        language = context["language"]
+    def build_context(self, language: str) -> PackedContext:
+        # Fallback when no scheme matches the question
+        return pack_records(self.retriever.get_schemes()[:10], self.token_budget)
 
-        # Get relevant schemes data
-        data = self.retriever.get_schemes()
-        data_summary = json.dumps(data[:10], ensure_ascii=False)[
-            :2000
-        ]  # Limit data size
+    def get_scheme_context(self, query: str, language: str) -> PackedContext:
+        """Pack the schemes most relevant to the question, best match first"""
+        schemes = self.retriever.search_schemes(query, k=self.relevant_schemes)
+        return self.pack_schemes(schemes, language)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.get_system_prompt(language)},
-                    {
-                        "role": "user",
-                        "content": f"Available Schemes: {data_summary}\n\nCitizen Question: {query}",
-                    },
-                ],
-                temperature=0.7,
-                max_tokens=500,
+    def pack_schemes(self, schemes: List[Dict], language: str) -> PackedContext:
+        """Pack search results (or the default context if there are none)"""
+        if not schemes:
+            return self.get_context(language)
+
+        version = self.retriever.version
+        encoded = [
+            self.context_cache.get_or_build_record(
+                scheme.get("scheme_id", ""),
+                version,
+                lambda scheme=scheme: EncodedRecord.from_record(scheme),
             )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"I apologize, but I'm having trouble processing your request. Please try again. Error: {str(e)}"
+            for scheme in schemes
+        ]
+        return pack_records(encoded, self.token_budget)
+
+    def fallback_response(self, context: Dict) -> str:
+        language = context["language"]
+        text = self.FALLBACK_TEXT.get(language, self.FALLBACK_TEXT["English"])
+        schemes = self.retriever.search_schemes(context["original_query"], k=3)
+        schemes = schemes or self.retriever.get_schemes()[:3]
+
+        lines = [text["intro"]]
+        for i, scheme in enumerate(schemes, 1):
+            name = localized(scheme, ("name", "scheme_name"), language)
+            lines.append(f"{i}. {name or scheme.get('scheme_id', '')}")
+            eligibility = localized(scheme, ("eligibility",), language)
+            if eligibility:
+                lines.append(f"   {text['eligibility']}: {eligibility}")
+            documents = localized(scheme, ("documents_required", "documents"), language)
+            if documents:
+                if isinstance(documents, list):
+                    documents = ", ".join(str(d) for d in documents)
+                lines.append(f"   {text['documents']}: {documents}")
+        lines.append(text["outro"])
+        return "\n".join(lines)
+
+    def build_messages(self, context: Dict) -> List[Dict]:
+        query = context["original_query"]
+        language = context["language"]
+        with timed(context, "retrieval"):
+            schemes = self.retriever.search_schemes(query, k=self.relevant_schemes)
+        with timed(context, "context"):
+            packed = self.pack_schemes(schemes, language)
+        context["context_tokens"] = packed.tokens
+        data_summary = packed.text
+
+        return [
+            {"role": "system", "content": self.get_system_prompt(language)},
+            {
+                "role": "user",
+                "content": f"Available Schemes: {data_summary}\n\nCitizen Question: {query}",
+            },
+        ]
 
 
 class EmployeeHandler(BaseHandler):
     """Handler for employee queries - Operational, concise responses"""
 
-    def handle(self, context: Dict) -> str:
-        query = context["original_query"]
+    name = "employee"
+    temperature = 0.3
+    max_tokens = 400
 
+    def build_context(self, language: str) -> PackedContext:
         # Get operational data
         data = {
             "performance": self.retriever.get_performance()[:20],
             "grievances": self.retriever.get_grievances()[:20],
         }
-        data_summary = json.dumps(data, ensure_ascii=False)[:3000]
+        return pack_sections(data, self.token_budget)
+
+    def fallback_response(self, context: Dict) -> str:
+        grievances = self.retriever.get_grievances()
+        analytics = self.retriever.get_analytics()
+        if analytics is not None:
+            # Precomputed, so the fallback doesn't touch every grievance record
+            pending = analytics.summary["grievances_pending"] or 0
+        else:
+            pending = sum(
+                g.get("pending", 0)
+                for g in grievances
+                if isinstance(g.get("pending"), int)
+            )
+        return (
+            "AI assistant unavailable - operational snapshot from the knowledge base:\n"
+            f"- Scheme performance records: {len(self.retriever.get_performance())}\n"
+            f"- Grievance records: {len(grievances)} ({pending} pending)\n"
+            "Retry shortly for a detailed answer."
+        )
+
+    def build_messages(self, context: Dict) -> List[Dict]:
+        query = context["original_query"]
+        with timed(context, "context"):
+            packed = self.get_context(context["language"])
+        context["context_tokens"] = packed.tokens
+        data_summary = packed.text
 
         system_prompt = """You are an operational assistant for TMC employees.
 Rules:
@@ -102,34 +446,38 @@ Rules:
 - No filler words
 - Focus on actionable information"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": f"Operational Data: {data_summary}\n\nEmployee Query: {query}",
-                    },
-                ],
-                temperature=0.3,
-                max_tokens=400,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error processing request: {str(e)}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": f"Operational Data: {data_summary}\n\nEmployee Query: {query}",
+            },
+        ]
 
 
 class LeaderHandler(BaseHandler):
     """Handler for leader queries - Analytical, data-driven responses"""
 
-    def handle(self, context: Dict) -> str:
-        query = context["original_query"]
+    name = "leader"
+    temperature = 0.2
+    max_tokens = 600
 
-        # Get comprehensive analytics data
-        stats = self.retriever.get_stats()
+    facts_per_list = 5
+
+    def build_context(self, language: str) -> PackedContext:
+        analytics = self.retriever.get_analytics()
+        if analytics is not None:
+            # Precomputed aggregates, so the LLM reads figures instead of adding them up
+            data = {
+                "stats": self.retriever.get_stats(),
+                "meta": self.retriever.get_meta(),
+                **analytics.facts(self.facts_per_list),
+            }
+            return pack_sections(data, self.token_budget)
+
+        # Without analytics, fall back to a sample of the raw rows
         data = {
-            "stats": stats,
+            "stats": self.retriever.get_stats(),
             "meta": self.retriever.get_meta(),
             "wards": self.retriever.get_wards()[:15],
             "performance": self.retriever.get_performance()[:15],
@@ -137,7 +485,40 @@ class LeaderHandler(BaseHandler):
             "vulnerability": self.retriever.get_vulnerability()[:15],
             "grievances": self.retriever.get_grievances()[:15],
         }
-        data_summary = json.dumps(data, ensure_ascii=False)[:4000]
+        return pack_sections(data, self.token_budget)
+
+    def fallback_response(self, context: Dict) -> str:
+        stats = self.retriever.get_stats()
+        lines = [
+            "AI analytics unavailable - key figures from the knowledge base:",
+            f"- Schemes: {stats['total_schemes']}",
+            f"- Wards: {stats['total_wards']}",
+            f"- Citizens: {stats['total_citizens']}",
+        ]
+        analytics = self.retriever.get_analytics()
+        if analytics is not None:
+            summary = analytics.summary
+            for label, key in (
+                ("Beneficiary coverage", "coverage_ratio"),
+                ("Application approval rate", "approval_rate"),
+                ("Budget utilization", "budget_utilization"),
+                ("Grievance resolution rate", "resolution_rate"),
+            ):
+                if summary[key] is not None:
+                    lines.append(f"- {label}: {summary[key]:.1%}")
+            priority = analytics.bottlenecks["priority_wards"][:3]
+            if priority:
+                names = ", ".join(ward["ward_name"] for ward in priority)
+                lines.append(f"- Priority wards (vulnerable, low coverage): {names}")
+        lines.append("Retry shortly for a detailed analysis.")
+        return "\n".join(lines)
+
+    def build_messages(self, context: Dict) -> List[Dict]:
+        query = context["original_query"]
+        with timed(context, "context"):
+            packed = self.get_context(context["language"])
+        context["context_tokens"] = packed.tokens
+        data_summary = packed.text
 
         system_prompt = """You are a data analyst for TMC Commissioner.
 Rules:
@@ -147,29 +528,23 @@ Rules:
 - Use percentages and numbers
 - Be analytical, not descriptive
 - Highlight areas needing attention
-- When asked about counts (schemes, wards, citizens), use the 'stats' field"""
+- When asked about counts (schemes, wards, citizens), use the 'stats' field
+- Ratios and rates in the data are fractions (0.25 = 25%); quote them, don't recompute"""
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {
-                        "role": "user",
-                        "content": f"Analytics Data: {data_summary}\n\nLeadership Query: {query}",
-                    },
-                ],
-                temperature=0.2,
-                max_tokens=600,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            return f"Error generating analytics: {str(e)}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {
+                "role": "user",
+                "content": f"Analytics Data: {data_summary}\n\nLeadership Query: {query}",
+            },
+        ]
 
 
 class HandlerRegistry:
     """Routes requests to appropriate handlers based on persona"""
 
+    FALLBACK_RESPONSE = "I'm not sure how to process that request."
+
     def __init__(
         self,
         citizen_handler: CitizenHandler,
@@ -182,9 +557,23 @@ class HandlerRegistry:
             "leader": leader_handler,
         }
 
-    def route(self, context: Dict) -> str:
+    def route(self, context: Dict, use_cache: bool = True) -> str:
         """Route to appropriate handler based on detected persona"""
         handler = self.handlers.get(context["persona"])
         if handler:
-            return handler.handle(context)
-        return "I'm not sure how to process that request."
+            return handler.handle(context, use_cache=use_cache)
+        return self.FALLBACK_RESPONSE
+
+    async def aroute(self, context: Dict, use_cache: bool = True) -> str:
+        """Async version of route()"""
+        handler = self.handlers.get(context["persona"])
+        if handler:
+            return await handler.ahandle(context, use_cache=use_cache)
+        return self.FALLBACK_RESPONSE
+
+    def route_stream(self, context: Dict, use_cache: bool = True) -> Iterator[str]:
+        """Route to the persona handler and stream its response chunks"""
+        handler = self.handlers.get(context["persona"])
+        if handler:
+            return handler.stream(context, use_cache=use_cache)
+        return iter([self.FALLBACK_RESPONSE])
@@ -0,0 +1,77 @@
+"""
+HTTP Caching for Sahayak AI
+JSON response bodies encoded once, with validators for conditional requests
+"""
+
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class EncodedJSON:
+    """A JSON body encoded as JsonResponse would, with its ETag and Last-Modified"""
+
+    __slots__ = ("body", "etag", "last_modified")
+
+    def __init__(self, payload: Dict, last_modified: Optional[float] = None):
+        self.body = json.dumps(payload, cls=DjangoJSONEncoder).encode("utf-8")
+        # Derived from the bytes, so it changes whenever the body does
+        self.etag = '"%s"' % hashlib.blake2b(self.body, digest_size=16).hexdigest()
+        self.last_modified = int(last_modified) if last_modified is not None else None
+
+
+class EncodedResponseCache:
+    """
+    Encoded bodies of slow-changing endpoints, per key and KB version
+
+    Entries are dropped as soon as a new knowledge base version is requested.
+    At most max_entries keys are kept per version; bodies for keys beyond
+    that (e.g. arbitrary ?language= values) are encoded on every call.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._current = (None, {})  # (kb_version, key -> EncodedJSON)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        key: Hashable,
+        version: int,
+        build: Callable[[], Dict],
+        last_modified: Optional[float] = None,
+    ) -> EncodedJSON:
+        """The encoded payload of build() for key at this KB version"""
+        current = self._current
+        if current[0] != version:
+            with self._lock:
+                if self._current[0] != version:
+                    self._current = (version, {})
+                current = self._current
+        entries = current[1]
+
+        encoded = entries.get(key)
+        if encoded is not None:
+            with self._lock:
+                self.hits += 1
+            return encoded
+        encoded = EncodedJSON(build(), last_modified)
+        with self._lock:
+            self.misses += 1
+            if len(entries) < self.max_entries:
+                entries[key] = encoded
+        return encoded
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {
+                "kb_version": self._current[0],
+                "entries": len(self._current[1]),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,183 @@
+"""
+Knowledge Base Loader for Sahayak AI
+Locates, parses and watches the Social Welfare Dataset for hot reloads
+"""
+
+import json
+import os
+import pickle
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+
+def get_dataset_path() -> Path:
+    """Get the configured knowledge base path"""
+    dataset_path = getattr(settings, "WELFARE_DATASET_PATH", None)
+    if dataset_path is None:
+        # Default path
+        dataset_path = Path(settings.BASE_DIR).parent / "SOCIAL_WELFAER_DATASET1.json"
+    return Path(dataset_path)
+
+
+def load_knowledge_base(path) -> Dict:
+    """Load the knowledge base from JSON file"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Knowledge base not found at: {path}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in knowledge base: {e}")
+
+
+# Collections in the dataset and the key field every record must carry
+KB_SCHEMA = {
+    "schemes": "scheme_id",
+    "scheme_performance": "scheme_id",
+    "grievances_summary": "scheme_id",
+    "beneficiary_coverage": "ward_id",
+    "vulnerability_scores": "ward_id",
+    "wards": "ward_id",
+    "citizens": None,
+}
+KB_REQUIRED_COLLECTIONS = ("schemes", "wards")
+
+SNAPSHOT_SUFFIX = ".kbsnap"
+SNAPSHOT_FORMAT = 4
+
+
+def validate_knowledge_base(kb) -> List[str]:
+    """Check the dataset's structure, returning a list of problems (empty if valid)"""
+    if not isinstance(kb, dict):
+        return ["Knowledge base must be a JSON object"]
+
+    errors = []
+    if not isinstance(kb.get("meta", {}), dict):
+        errors.append("'meta' must be an object")
+
+    for collection, key_field in KB_SCHEMA.items():
+        records = kb.get(collection)
+        if records is None:
+            if collection in KB_REQUIRED_COLLECTIONS:
+                errors.append(f"Missing collection '{collection}'")
+            continue
+        if not isinstance(records, list):
+            errors.append(f"'{collection}' must be a list")
+            continue
+        for i, record in enumerate(records):
+            if not isinstance(record, dict):
+                errors.append(f"{collection}[{i}] must be an object")
+            elif key_field and not record.get(key_field):
+                errors.append(f"{collection}[{i}] is missing '{key_field}'")
+            if len(errors) >= 20:
+                errors.append("Too many errors, stopping")
+                return errors
+    return errors
+
+
+def snapshot_path(dataset_path) -> Path:
+    """Path of the compiled snapshot for a dataset file"""
+    return Path(dataset_path).with_suffix(SNAPSHOT_SUFFIX)
+
+
+def write_snapshot(
+    dataset_path,
+    kb: Dict,
+    indexes: Dict,
+    signature: Optional[Tuple[int, int, int]],
+) -> Path:
+    """
+    Write a compiled binary snapshot of the knowledge base and its indexes
+
+    Indexes reference the same record objects as the KB, and pickle keeps that
+    sharing, so the snapshot loads without rebuilding anything. signature is
+    the file_signature() of the dataset taken before it was read, so a file
+    edited while it was being compiled never matches the snapshot. reload_kb
+    --compile passes the mtime it is about to set, so the snapshot can be
+    written before workers are signalled.
+    """
+    path = snapshot_path(dataset_path)
+    payload = {
+        "format": SNAPSHOT_FORMAT,
+        "source_signature": signature,
+        "knowledge_base": kb,
+        "indexes": indexes,
+    }
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshot(dataset_path) -> Optional[Tuple[Dict, Dict]]:
+    """
+    Load the compiled snapshot for a dataset if it matches the current JSON file
+
+    Returns:
+        (knowledge_base, indexes), or None if there is no usable snapshot
+    """
+    path = snapshot_path(dataset_path)
+    source = file_signature(dataset_path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if payload.get("format") != SNAPSHOT_FORMAT:
+        return None
+    recorded = payload.get("source_signature")
+    # Compare mtime and size; the inode changes whenever the file is copied
+    if source is not None and (
+        recorded is None or (recorded[0], recorded[2]) != (source[0], source[2])
+    ):
+        return None
+    return payload["knowledge_base"], payload["indexes"]
+
+
+def file_signature(path) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, inode, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+class KnowledgeBaseWatcher:
+    """
+    Detects changes to the knowledge base file by mtime/inode/size
+
+    The file is stat'ed at most once per check_interval seconds, so calling
+    changed() on every request is cheap. A check_interval of 0 disables watching.
+    """
+
+    def __init__(self, path, check_interval: float = 5.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.loaded_signature = file_signature(path)
+        self._next_check = time.monotonic() + check_interval
+        self._lock = threading.Lock()
+
+    def changed(self) -> bool:
+        if not self.check_interval:
+            return False
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+        signature = file_signature(self.path)
+        return signature is not None and signature != self.loaded_signature
+
+    def mark_loaded(self, signature: Optional[Tuple[int, int, int]]):
+        """Record the file state that was last loaded (or attempted)"""
+        self.loaded_signature = signature
@@ -7,60 +7,105 @@ import json
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from .analytics import KBAnalytics, build_analytics
+from .scheme_search import SchemeSearchIndex
+
 
 class KnowledgeRetriever:
     """Retrieves relevant data from the knowledge base"""
 
-    def __init__(self, kb: Dict):
+    # Fields each collection is indexed on at load time
+    INDEXED_FIELDS = {
+        "schemes": ("scheme_id", "category"),
+        "scheme_performance": ("scheme_id",),
+        "grievances_summary": ("scheme_id",),
+        "beneficiary_coverage": ("ward_id",),
+        "vulnerability_scores": ("ward_id",),
+        "wards": ("ward_id",),
+    }
+
+    def __init__(
+        self,
+        kb: Dict,
+        version: int = 1,
+        indexes: Optional[Dict] = None,
+        analytics_top_n: int = 10,
+    ):
         self.kb = kb
+        self.version = version
+        # Prebuilt indexes come from a compiled snapshot (manage.py compile_kb)
+        self.indexes = indexes if indexes is not None else self._build_indexes()
+        self.analytics = build_analytics(kb, top_n=analytics_top_n)
+
+    def _build_indexes(self) -> Dict[str, Dict[str, Dict[str, List[Dict]]]]:
+        """
+        Build per-collection hash indexes so filtered lookups are O(1)
+
+        Ids are indexed as stored (queries are upper-cased on lookup),
+        categories are indexed lower-cased.
+        """
+        indexes = {}
+        for collection, fields in self.INDEXED_FIELDS.items():
+            field_indexes = {field: {} for field in fields}
+            for record in self.kb.get(collection, []):
+                for field in fields:
+                    value = record.get(field)
+                    if value is None:
+                        continue
+                    if field == "category":
+                        value = str(value).lower()
+                    field_indexes[field].setdefault(value, []).append(record)
+            indexes[collection] = field_indexes
+        indexes["scheme_search"] = SchemeSearchIndex(self.kb.get("schemes", []))
+        return indexes
+
+    def _lookup(self, collection: str, field: str, key: str) -> List[Dict]:
+        """Return the indexed records for a key, or an empty list"""
+        return self.indexes[collection][field].get(key, [])
 
     def get_schemes(
         self, category: Optional[str] = None, scheme_id: Optional[str] = None
     ) -> List[Dict]:
         """Get schemes filtered by category or scheme_id"""
-        schemes = self.kb.get("schemes", [])
         if scheme_id:
-            return [s for s in schemes if s.get("scheme_id") == scheme_id.upper()]
+            return self._lookup("schemes", "scheme_id", scheme_id.upper())
         if category:
-            return [
-                s for s in schemes if s.get("category", "").lower() == category.lower()
-            ]
-        return schemes
+            return self._lookup("schemes", "category", category.lower())
+        return self.kb.get("schemes", [])
+
+    def search_schemes(self, query: str, k: int = 5) -> List[Dict]:
+        """Get the k schemes most relevant to a free-text query (BM25)"""
+        return self.indexes["scheme_search"].search(query, k)
 
     def get_performance(self, scheme_id: Optional[str] = None) -> List[Dict]:
         """Get scheme performance data"""
-        performance = self.kb.get("scheme_performance", [])
         if scheme_id:
-            return [p for p in performance if p.get("scheme_id") == scheme_id.upper()]
-        return performance
+            return self._lookup("scheme_performance", "scheme_id", scheme_id.upper())
+        return self.kb.get("scheme_performance", [])
 
     def get_grievances(self, scheme_id: Optional[str] = None) -> List[Dict]:
         """Get grievances summary"""
-        grievances = self.kb.get("grievances_summary", [])
         if scheme_id:
-            return [g for g in grievances if g.get("scheme_id") == scheme_id.upper()]
-        return grievances
+            return self._lookup("grievances_summary", "scheme_id", scheme_id.upper())
+        return self.kb.get("grievances_summary", [])
 
     def get_coverage(self, ward_id: Optional[str] = None) -> List[Dict]:
         """Get beneficiary coverage data"""
-        coverage = self.kb.get("beneficiary_coverage", [])
         if ward_id:
-            return [c for c in coverage if c.get("ward_id") == ward_id.upper()]
-        return coverage
+            return self._lookup("beneficiary_coverage", "ward_id", ward_id.upper())
+        return self.kb.get("beneficiary_coverage", [])
 
     def get_vulnerability(self, ward_id: Optional[str] = None) -> List[Dict]:
         """Get vulnerability scores"""
-        vulnerability = self.kb.get("vulnerability_scores", [])
         if ward_id:
-            return [v for v in vulnerability if v.get("ward_id") == ward_id.upper()]
-        return vulnerability
+            return self._lookup("vulnerability_scores", "ward_id", ward_id.upper())
+        return self.kb.get("vulnerability_scores", [])
 
     def get_wards(self, ward_id: Optional[str] = None) -> List[Dict]:
         """Get ward information"""
-        wards = self.kb.get("wards", [])
         if ward_id:
-            return [w for w in wards if w.get("ward_id") == ward_id.upper()]
-        return wards
+            return self._lookup("wards", "ward_id", ward_id.upper())
+        return self.kb.get("wards", [])
 
     def get_stats(self) -> Dict:
         """Get summary statistics"""
@@ -70,6 +115,10 @@ class KnowledgeRetriever:
             "total_citizens": len(self.kb.get("citizens", [])),
         }
 
+    def get_analytics(self) -> Optional[KBAnalytics]:
+        """Get precomputed ward and scheme analytics (None without NumPy)"""
+        return self.analytics
+
     def get_meta(self) -> Dict:
         """Get metadata about the dataset"""
         return self.kb.get("meta", {})
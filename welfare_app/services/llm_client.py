@@ -0,0 +1,399 @@
+"""
+LLM Client for Sahayak AI
+Shared Groq client layer with pooling, deadlines, retries, circuit breaking and hedging
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+import groq
+import httpx
+from django.conf import settings
+from groq import AsyncGroq, Groq
+
+DEFAULT_DEADLINES = {"citizen": 8.0, "employee": 10.0, "leader": 15.0}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the LLM while the circuit breaker is open"""
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a call's deadline passes before the LLM answers"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and 5xx are worth retrying"""
+    # TimeoutError includes DeadlineExceededError from hedged calls
+    if isinstance(error, (groq.APITimeoutError, groq.APIConnectionError, TimeoutError)):
+        return True
+    if isinstance(error, groq.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+class CircuitBreaker:
+    """
+    Stops calling the LLM after repeated failures
+
+    closed: calls go through; failure_threshold consecutive failures open it
+    open: calls fail immediately with CircuitOpenError for reset_timeout seconds
+    half-open: one trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.short_circuited = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Let a call through or raise CircuitOpenError
+
+        Returns True if the call is the half-open trial; the caller must then
+        call release_trial() when it ends, however it ends.
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            self.short_circuited += 1
+        raise CircuitOpenError("LLM circuit breaker is open")
+
+    def release_trial(self):
+        """End a trial call without counting a success or a failure"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class LLMClient:
+    """
+    Resilient wrapper around the Groq chat completions API
+
+    - one pooled HTTP client per process for the sync and async paths
+    - a per-persona deadline covering all attempts of a call
+    - retries with exponential backoff and full jitter on transient errors
+    - a circuit breaker so callers fail fast (and fall back) during outages
+    - optional hedging: a second identical request is sent if the first has
+      not answered after hedge_after seconds, and the first answer wins
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_connections: int = 100,
+        max_keepalive: int = 20,
+        deadlines: Optional[Dict[str, float]] = None,
+        max_retries: int = 2,
+        retry_base_delay: float = 0.25,
+        retry_max_delay: float = 2.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge_after: Optional[float] = None,
+    ):
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive
+        )
+        # Retries are handled here, so the SDK's own retry loop is disabled
+        self.client = Groq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=httpx.Client(limits=limits),
+        )
+        self.async_client = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=httpx.AsyncClient(limits=limits),
+        )
+        self.deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge_after = hedge_after
+        self._hedge_pool = None
+        self._hedge_pool_lock = threading.Lock()
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def deadline_for(self, persona: str) -> float:
+        return self.deadlines.get(persona, 10.0)
+
+    def _backoff(self, attempt: int) -> float:
+        cap = min(self.retry_max_delay, self.retry_base_delay * (2**attempt))
+        return random.uniform(0, cap)
+
+    # Sync path
+
+    def complete(self, persona: str, **kwargs):
+        """
+        Create a chat completion for a persona, with deadline, retries,
+        circuit breaker and hedging; returns the SDK response object
+
+        Raises CircuitOpenError, DeadlineExceededError or the last API error.
+        """
+        return self._call(persona, lambda timeout: self._attempt(kwargs, timeout))
+
+    def stream(self, persona: str, **kwargs):
+        """
+        Start a streaming chat completion; returns the SDK stream iterator
+
+        Only opening the stream is retried, and it is never hedged; once
+        tokens flow they are passed through as they arrive.
+        """
+        return self._call(
+            persona,
+            lambda timeout: self.client.chat.completions.create(
+                stream=True, timeout=timeout, **kwargs
+            ),
+        )
+
+    def _attempt(self, kwargs: Dict, timeout: float):
+        if self.hedge_after is None or self.hedge_after >= timeout:
+            return self.client.chat.completions.create(timeout=timeout, **kwargs)
+        return self._hedged(
+            lambda: self.client.chat.completions.create(timeout=timeout, **kwargs),
+            timeout,
+        )
+
+    def _call(self, persona: str, attempt: Callable[[float], object]):
+        trial = self.breaker.before_call()
+        try:
+            return self._call_with_retries(persona, attempt)
+        finally:
+            if trial:
+                # Also when interrupted, so the breaker can let another trial through
+                self.breaker.release_trial()
+
+    def _call_with_retries(self, persona: str, attempt: Callable[[float], object]):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_for(persona)
+
+        for attempt_number in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = attempt(remaining)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The request itself is wrong; the service is fine
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt_number == self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt_number)
+                if time.monotonic() + delay >= deadline:
+                    break
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+        self._count("failures")
+        raise DeadlineExceededError(
+            f"No LLM response within {self.deadline_for(persona)}s"
+        )
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        if self._hedge_pool is None:
+            with self._hedge_pool_lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=32, thread_name_prefix="llm-hedge"
+                    )
+        return self._hedge_pool
+
+    def _hedged(self, call: Callable[[], object], timeout: float):
+        deadline = time.monotonic() + timeout
+        pool = self._get_hedge_pool()
+        first = pool.submit(call)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = pool.submit(call)
+        pending = {first, second}
+        error = None
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count("hedge_wins")
+                    # The slower request finishes in the background and is ignored
+                    return future.result()
+                error = future.exception()
+        raise error or DeadlineExceededError("Hedged LLM requests timed out")
+
+    # Async path
+
+    async def acomplete(self, persona: str, **kwargs):
+        """Async version of complete()"""
+        trial = self.breaker.before_call()
+        try:
+            return await self._acomplete_with_retries(persona, kwargs)
+        finally:
+            if trial:
+                # Also when cancelled (e.g. the ASGI client disconnected)
+                self.breaker.release_trial()
+
+    async def _acomplete_with_retries(self, persona: str, kwargs: Dict):
+        self._count("calls")
+        deadline = time.monotonic() + self.deadline_for(persona)
+
+        for attempt_number in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(
+                    self._aattempt(kwargs, remaining), timeout=remaining
+                )
+            except asyncio.TimeoutError:
+                self.breaker.record_failure()
+                break
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt_number == self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._backoff(attempt_number)
+                if time.monotonic() + delay >= deadline:
+                    break
+                self._count("retries")
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+        self._count("failures")
+        raise DeadlineExceededError(
+            f"No LLM response within {self.deadline_for(persona)}s"
+        )
+
+    async def _aattempt(self, kwargs: Dict, timeout: float):
+        create = self.async_client.chat.completions.create
+        if self.hedge_after is None or self.hedge_after >= timeout:
+            return await create(timeout=timeout, **kwargs)
+
+        first = asyncio.ensure_future(create(timeout=timeout, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = asyncio.ensure_future(create(timeout=timeout, **kwargs))
+        pending = {first, second}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def get_stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "breaker_state": self.breaker.state,
+            "breaker_open": self.breaker.state != "closed",
+            "short_circuited": self.breaker.short_circuited,
+        }
+
+
+def build_llm_client(api_key: str) -> LLMClient:
+    """
+    Build the shared LLM client configured in settings
+
+    GROQ_BASE_URL: API base URL (e.g. a local stub server for testing)
+    LLM_MAX_CONNECTIONS / LLM_MAX_KEEPALIVE: HTTP connection pool limits
+    LLM_DEADLINES: seconds per persona, e.g. {"citizen": 8, "leader": 15}
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY: retry policy
+    LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET: circuit breaker policy
+    LLM_HEDGE_AFTER: seconds before a hedged second request (None disables)
+    """
+    return LLMClient(
+        api_key=api_key,
+        base_url=getattr(settings, "GROQ_BASE_URL", None),
+        max_connections=getattr(settings, "LLM_MAX_CONNECTIONS", 100),
+        max_keepalive=getattr(settings, "LLM_MAX_KEEPALIVE", 20),
+        deadlines=getattr(settings, "LLM_DEADLINES", None),
+        max_retries=getattr(settings, "LLM_MAX_RETRIES", 2),
+        retry_base_delay=getattr(settings, "LLM_RETRY_BASE_DELAY", 0.25),
+        retry_max_delay=getattr(settings, "LLM_RETRY_MAX_DELAY", 2.0),
+        breaker=CircuitBreaker(
+            failure_threshold=getattr(settings, "LLM_BREAKER_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "LLM_BREAKER_RESET", 30.0),
+        ),
+        hedge_after=getattr(settings, "LLM_HEDGE_AFTER", None),
+    )
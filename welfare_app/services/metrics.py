@@ -0,0 +1,309 @@
+"""
+Metrics for Sahayak AI
+Per-stage latency histograms and token counters, rendered in Prometheus text format
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+# Seconds; covers microsecond KB lookups up to slow LLM calls
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+REQUEST_LABELS = ("persona", "intent", "language", "model")
+# Any other language value is recorded as "other", so clients can't add series
+LANGUAGE_LABELS = frozenset({"English", "Hindi", "Marathi"})
+
+
+@contextmanager
+def timed(context: Dict, stage: str):
+    """Add the time spent in the block to context["stages"][stage]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(context, stage, time.perf_counter() - start)
+
+
+def record_stage(context: Dict, stage: str, seconds: float):
+    stages = context.setdefault("stages", {})
+    stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+def record_usage(context: Dict, usage):
+    """Copy prompt/completion token counts from a Groq usage object"""
+    if usage is None:
+        return
+    context["usage"] = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+    }
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (caller holds the lock)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple, buckets=None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+        self.series: Dict[Tuple, List] = {}
+
+    def observe(self, labels: Tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            # per-bucket counts (+Inf last), sum
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                label_text = _labels(self.label_names + ("le",), labels + (bound,))
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_number(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set (caller holds the lock)"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple, amount: float = 1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.series.items()):
+            label_text = _labels(self.label_names, labels)
+            lines.append(f"{self.name}{label_text} {_number(value)}")
+        return lines
+
+
+class ChatMetrics:
+    """
+    Request metrics for the chat pipeline
+
+    Handlers and the chatbot add stage timings and token usage to the request
+    context as they go (see timed()); observe() then records the whole request
+    under one lock acquisition, so the cost per request is a few microseconds.
+    """
+
+    def __init__(self, buckets=None):
+        self.stage_seconds = Histogram(
+            "sahayak_stage_duration_seconds",
+            "Time spent in each chat pipeline stage",
+            ("stage",) + REQUEST_LABELS,
+            buckets,
+        )
+        self.requests = Counter(
+            "sahayak_chat_requests_total",
+            "Chat requests by how the answer was produced",
+            REQUEST_LABELS + ("source",),
+        )
+        self.tokens = Counter(
+            "sahayak_llm_tokens_total",
+            "LLM tokens reported by the Groq usage field",
+            ("persona", "model", "type"),
+        )
+        self.context_tokens = Counter(
+            "sahayak_context_tokens_total",
+            "Estimated knowledge base tokens packed into prompts",
+            ("persona", "model"),
+        )
+        self._lock = threading.Lock()
+
+    def observe(self, context: Dict):
+        """Record the stages, tokens and outcome of one finished request"""
+        labels = tuple(str(context.get(name) or "none") for name in REQUEST_LABELS)
+        if labels[2] not in LANGUAGE_LABELS:
+            labels = labels[:2] + ("other",) + labels[3:]
+        persona, model = labels[0], labels[3]
+        usage = context.get("usage")
+        with self._lock:
+            for stage, seconds in context.get("stages", {}).items():
+                self.stage_seconds.observe((stage,) + labels, seconds)
+            self.requests.inc(labels + (context.get("source", "unknown"),))
+            if usage:
+                self.tokens.inc((persona, model, "prompt"), usage["prompt_tokens"])
+                self.tokens.inc(
+                    (persona, model, "completion"), usage["completion_tokens"]
+                )
+            if context.get("context_tokens"):
+                self.context_tokens.inc((persona, model), context["context_tokens"])
+
+    def render(self, stats: Optional[Dict] = None) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Args:
+            stats: Component statistics from the chatbot, exported as gauges
+        """
+        with self._lock:
+            lines = self.stage_seconds.render()
+            lines += self.requests.render()
+            lines += self.tokens.render()
+            lines += self.context_tokens.render()
+        lines += render_stats(stats or {})
+        return "\n".join(lines) + "\n"
+
+
+# Component statistics exported at scrape time: (stats path, name, type, help)
+STATS_METRICS = (
+    (
+        ("cache", "response", "hits"),
+        "sahayak_response_cache_hits_total",
+        "counter",
+        "Response cache hits",
+    ),
+    (
+        ("cache", "response", "misses"),
+        "sahayak_response_cache_misses_total",
+        "counter",
+        "Response cache misses",
+    ),
+    (
+        ("cache", "response", "hit_rate"),
+        "sahayak_response_cache_hit_rate",
+        "gauge",
+        "Response cache hit rate since start",
+    ),
+    (
+        ("cache", "prompt_context", "hits"),
+        "sahayak_prompt_context_cache_hits_total",
+        "counter",
+        "Prompt context cache hits",
+    ),
+    (
+        ("cache", "prompt_context", "misses"),
+        "sahayak_prompt_context_cache_misses_total",
+        "counter",
+        "Prompt context cache misses",
+    ),
+    (("llm", "calls"), "sahayak_llm_calls_total", "counter", "LLM calls made"),
+    (("llm", "retries"), "sahayak_llm_retries_total", "counter", "LLM call retries"),
+    (
+        ("llm", "failures"),
+        "sahayak_llm_failures_total",
+        "counter",
+        "LLM calls that failed after retries",
+    ),
+    (
+        ("llm", "hedges"),
+        "sahayak_llm_hedges_total",
+        "counter",
+        "Hedged LLM requests sent",
+    ),
+    (
+        ("llm", "short_circuited"),
+        "sahayak_llm_short_circuited_total",
+        "counter",
+        "Calls rejected by the open circuit breaker",
+    ),
+    (
+        ("llm", "breaker_open"),
+        "sahayak_llm_breaker_open",
+        "gauge",
+        "1 while the circuit breaker is open or half-open",
+    ),
+    (
+        ("llm", "coalescing", "coalesced"),
+        "sahayak_llm_coalesced_total",
+        "counter",
+        "Requests that shared an in-flight LLM call",
+    ),
+    (
+        ("fast_path", "answered"),
+        "sahayak_fast_path_answered_total",
+        "counter",
+        "Requests answered by the fast path",
+    ),
+    (
+        ("fast_path", "share"),
+        "sahayak_fast_path_share",
+        "gauge",
+        "Share of requests answered by the fast path since start",
+    ),
+)
+
+
+def render_stats(stats: Dict) -> List[str]:
+    """Render the numeric component statistics listed in STATS_METRICS"""
+    lines = []
+    for path, name, metric_type, help_text in STATS_METRICS:
+        value = stats
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        if not isinstance(value, (int, float)):
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+        lines.append(
+            f"{name} {_number(int(value) if isinstance(value, bool) else value)}"
+        )
+    return lines
+
+
+def build_metrics() -> Optional[ChatMetrics]:
+    """
+    Build the request metrics configured in settings
+
+    METRICS_ENABLED: set False to skip recording (the endpoint then returns 404)
+    METRICS_BUCKETS: histogram bucket bounds in seconds
+    """
+    if not getattr(settings, "METRICS_ENABLED", True):
+        return None
+    return ChatMetrics(buckets=getattr(settings, "METRICS_BUCKETS", None))
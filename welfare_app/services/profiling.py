@@ -0,0 +1,270 @@
+"""
+Request Profiling for Sahayak AI
+Captures cProfile or wall-clock stack samples for selected chat requests
+"""
+
+import cProfile
+import json
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core import signing
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Sahayak-Profile"
+TOKEN_SALT = "sahayak.profiling"
+PROFILE_EXTENSIONS = {"cprofile": ".pstats", "sample": ".folded"}
+PROFILE_NAME = re.compile(r"^[\w-]+\.(pstats|folded)$")
+
+# cProfile can only run once per process at a time on Python 3.12+
+_cprofile_lock = threading.Lock()
+
+
+def make_token() -> str:
+    """Signed value for the profiling header (valid for PROFILING_TOKEN_MAX_AGE)"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign("profile")
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack at a fixed interval
+
+    Samples are wall-clock, so time spent waiting (on Groq, on I/O or for the
+    GIL) shows up next to CPU time. The result is in folded-stack format
+    ("outer;inner;leaf count" per line), readable by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:"
+                    f"{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+
+class RequestProfiler:
+    """
+    Profiles selected requests and keeps the slow ones on disk
+
+    A request is profiled when profiling is always on, when it is drawn by the
+    sampling rate, or when it carries a valid signed header (make_token()).
+    Profiles of requests that ran at least slow_threshold seconds are written
+    to the directory with a JSON sidecar; the oldest are deleted beyond max_files.
+    Files are shared by every worker that uses the same directory.
+    """
+
+    def __init__(
+        self,
+        directory,
+        mode: str = "cprofile",
+        always: bool = False,
+        sample_rate: float = 0.0,
+        slow_threshold: float = 0.0,
+        max_files: int = 200,
+        sample_interval: float = 0.005,
+        token_max_age: int = 3600,
+    ):
+        if mode not in PROFILE_EXTENSIONS:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.always = always
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.max_files = max_files
+        self.sample_interval = sample_interval
+        self.token_max_age = token_max_age
+        self._lock = threading.Lock()
+        self.profiled = 0
+        self.saved = 0
+        self.skipped_busy = 0
+
+    def verify_token(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        try:
+            signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+                token, max_age=self.token_max_age
+            )
+        except signing.BadSignature:
+            return False
+        return True
+
+    def should_profile(self, token: Optional[str] = None) -> bool:
+        """Decide whether to profile a request carrying this header value"""
+        if self.always:
+            return True
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return self.verify_token(token)
+
+    @contextmanager
+    def profile(self, info: Dict):
+        """
+        Profile the block and save the result if it was slow enough
+
+        The block may add details about the request to `info`; they are
+        stored in the sidecar next to the profile.
+        """
+        if self.mode == "cprofile":
+            if not _cprofile_lock.acquire(blocking=False):
+                # Another request is being profiled in this process
+                with self._lock:
+                    self.skipped_busy += 1
+                yield
+                return
+            profiler = cProfile.Profile()
+        else:
+            profiler = StackSampler(threading.get_ident(), self.sample_interval)
+
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            if self.mode == "cprofile":
+                profiler.enable()
+            else:
+                profiler.start()
+            yield
+        finally:
+            if self.mode == "cprofile":
+                profiler.disable()
+                _cprofile_lock.release()
+            else:
+                profiler.stop()
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.profiled += 1
+            if duration >= self.slow_threshold:
+                info.update(started_at=started_at, duration=duration)
+                try:
+                    self._save(profiler, info)
+                except Exception:
+                    # Losing a profile must not fail the request it profiled
+                    logger.exception("Could not save request profile")
+
+    def _save(self, profiler, info: Dict):
+        started_at = info["started_at"]
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at))
+        stamp += f"{int(started_at * 1000) % 1000:03d}"
+        base = f"{stamp}-{int(info['duration'] * 1000):06d}ms-{uuid.uuid4().hex[:8]}"
+        name = base + PROFILE_EXTENSIONS[self.mode]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cprofile":
+            profiler.dump_stats(self.directory / name)
+        else:
+            (self.directory / name).write_text(profiler.folded(), encoding="utf-8")
+        sidecar = dict(info, profile=name, mode=self.mode, pid=os.getpid())
+        (self.directory / f"{base}.json").write_text(
+            json.dumps(sidecar, default=str), encoding="utf-8"
+        )
+        with self._lock:
+            self.saved += 1
+        self._rotate()
+
+    def _rotate(self):
+        sidecars = sorted(self.directory.glob("*.json"))
+        for old in sidecars[: max(len(sidecars) - self.max_files, 0)]:
+            for path in self.directory.glob(old.stem + ".*"):
+                path.unlink(missing_ok=True)
+
+    def list_profiles(self, min_duration: float = 0.0, limit: int = 50) -> List[Dict]:
+        """Saved profiles, newest first, of requests at least min_duration long"""
+        profiles = []
+        for sidecar in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                info = json.loads(sidecar.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # rotated away or still being written
+            if info.get("duration", 0) >= min_duration:
+                profiles.append(info)
+                if len(profiles) >= limit:
+                    break
+        return profiles
+
+    def profile_path(self, name: str) -> Optional[Path]:
+        """Path of a saved profile file, or None if the name is not one"""
+        if not PROFILE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def get_stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "always": self.always,
+            "sample_rate": self.sample_rate,
+            "slow_threshold": self.slow_threshold,
+            "profiled": self.profiled,
+            "saved": self.saved,
+            "skipped_busy": self.skipped_busy,
+        }
+
+
+def build_profiler() -> Optional[RequestProfiler]:
+    """
+    Build the request profiler configured in settings
+
+    PROFILING_ENABLED: opt-in; enables the hook, the signed header and /api/profiles/
+    PROFILING_ALWAYS: profile every chat request (staging only)
+    PROFILING_SAMPLE_RATE: share of chat requests profiled at random
+    PROFILING_MODE: 'cprofile' (.pstats) or 'sample' (wall-clock, .folded)
+    PROFILING_SLOW_THRESHOLD: only keep profiles of requests at least this slow (s)
+    PROFILING_DIR / PROFILING_MAX_FILES: where profiles go and how many to keep
+    PROFILING_TOKEN_MAX_AGE: seconds a signed header (manage.py profile_token) is valid
+    """
+    if not getattr(settings, "PROFILING_ENABLED", False):
+        return None
+    return RequestProfiler(
+        directory=getattr(
+            settings,
+            "PROFILING_DIR",
+            os.path.join(tempfile.gettempdir(), "sahayak_profiles"),
+        ),
+        mode=getattr(settings, "PROFILING_MODE", "cprofile"),
+        always=getattr(settings, "PROFILING_ALWAYS", False),
+        sample_rate=getattr(settings, "PROFILING_SAMPLE_RATE", 0.0),
+        slow_threshold=getattr(settings, "PROFILING_SLOW_THRESHOLD", 0.0),
+        max_files=getattr(settings, "PROFILING_MAX_FILES", 200),
+        sample_interval=getattr(settings, "PROFILING_SAMPLE_INTERVAL", 0.005),
+        token_max_age=getattr(settings, "PROFILING_TOKEN_MAX_AGE", 3600),
+    )
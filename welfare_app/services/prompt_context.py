@@ -0,0 +1,93 @@
+"""
+Prompt Context Cache for Sahayak AI
+Serializes knowledge base slices for handler prompts once per KB version
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+
+class PromptContextCache:
+    """
+    Caches packed prompt context keyed by (handler, language, KB version)
+
+    Values are built lazily on first use and shared across requests. Entries for
+    older KB versions are dropped as soon as a newer version is requested; requests
+    still holding an older snapshot get their context built but not stored.
+    At most max_entries are kept per version (3 personas x 3 languages need 9).
+
+    Encoded records (schemes packed per question) are kept apart, in an LRU of
+    max_records, so searches over many schemes never crowd out handler context.
+    """
+
+    def __init__(self, max_entries: int = 32, max_records: int = 512):
+        self.max_entries = max_entries
+        self.max_records = max_records
+        self._entries = {}
+        self._records = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(
+        self, handler: str, language: str, kb_version: int, build: Callable[[], Any]
+    ) -> Any:
+        key = (handler, language, kb_version)
+        value = self._entries.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._switch_version(kb_version)
+            if kb_version == self._version and len(self._entries) < self.max_entries:
+                self._entries[key] = value
+        return value
+
+    def get_or_build_record(
+        self, record_id: str, kb_version: int, build: Callable[[], Any]
+    ) -> Any:
+        """Like get_or_build() for one record, evicting the least recently used"""
+        key = (record_id, kb_version)
+        with self._lock:
+            value = self._records.get(key)
+            if value is not None:
+                self._records.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._switch_version(kb_version)
+            if kb_version == self._version:
+                self._records[key] = value
+                while len(self._records) > self.max_records:
+                    self._records.popitem(last=False)
+        return value
+
+    def _switch_version(self, kb_version: int):
+        # Called with the lock held
+        if self._version is None or kb_version > self._version:
+            self._entries = {}
+            self._records = OrderedDict()
+            self._version = kb_version
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._records = OrderedDict()
+            self._version = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "records": len(self._records),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,181 @@
+"""
+Response Cache for Sahayak AI
+Caches LLM answers for repeated questions in front of the Groq API
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from django.conf import settings
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.।,;:]+$")
+
+
+def normalize_query(text: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry"""
+    text = _WHITESPACE.sub(" ", text.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def request_key(
+    persona: str, language: str, query: str, model: str, kb_version: int
+) -> str:
+    """Hash the inputs that decide an LLM answer into a short stable key"""
+    raw = "\x1f".join(
+        [persona, language, normalize_query(query), model, str(kb_version)]
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class LocalCacheBackend:
+    """In-process LRU cache with a TTL, private to one worker"""
+
+    def __init__(self, max_entries: int = 1024, ttl: int = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self.get(key)
+
+    async def aset(self, key: str, value: str):
+        self.set(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DjangoCacheBackend:
+    """Django cache framework backend, shared by all workers using the same cache"""
+
+    def __init__(self, alias: str = "default", ttl: int = 3600):
+        from django.core.cache import caches
+
+        self.cache = caches[alias]
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: str):
+        self.cache.set(key, value, timeout=self.ttl)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await self.cache.aget(key)
+
+    async def aset(self, key: str, value: str):
+        await self.cache.aset(key, value, timeout=self.ttl)
+
+    def clear(self):
+        # Entries are namespaced by key prefix and expire on their own
+        pass
+
+    def __len__(self):
+        return 0
+
+
+class ResponseCache:
+    """
+    Caches LLM responses keyed on persona, language, normalized query,
+    model and KB version, with hit/miss counters
+    """
+
+    KEY_PREFIX = "sahayak:response:"
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def make_key(
+        self, persona: str, language: str, query: str, model: str, kb_version: int
+    ) -> str:
+        return self.KEY_PREFIX + request_key(
+            persona, language, query, model, kb_version
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        return self._count(self.backend.get(key))
+
+    def set(self, key: str, value: str):
+        self.backend.set(key, value)
+
+    async def aget(self, key: str) -> Optional[str]:
+        return self._count(await self.backend.aget(key))
+
+    async def aset(self, key: str, value: str):
+        await self.backend.aset(key, value)
+
+    def _count(self, value: Optional[str]) -> Optional[str]:
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def clear(self):
+        self.backend.clear()
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_response_cache() -> Optional[ResponseCache]:
+    """
+    Build the response cache configured in settings
+
+    RESPONSE_CACHE_BACKEND: "local" (default), "django" or None to disable
+    RESPONSE_CACHE_MAX_ENTRIES: LRU size for the local backend
+    RESPONSE_CACHE_TTL: seconds an answer stays valid
+    RESPONSE_CACHE_ALIAS: Django cache alias for the django backend
+    """
+    backend_name = getattr(settings, "RESPONSE_CACHE_BACKEND", "local")
+    ttl = getattr(settings, "RESPONSE_CACHE_TTL", 3600)
+
+    if not backend_name:
+        return None
+    if backend_name == "local":
+        max_entries = getattr(settings, "RESPONSE_CACHE_MAX_ENTRIES", 1024)
+        return ResponseCache(LocalCacheBackend(max_entries=max_entries, ttl=ttl))
+    if backend_name == "django":
+        alias = getattr(settings, "RESPONSE_CACHE_ALIAS", "default")
+        return ResponseCache(DjangoCacheBackend(alias=alias, ttl=ttl))
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend_name}")
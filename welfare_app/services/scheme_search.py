@@ -0,0 +1,134 @@
+"""
+Scheme Search for Sahayak AI
+BM25 inverted index over scheme text in English, Hindi and Marathi
+"""
+
+import heapq
+import math
+import re
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+# Word characters plus the whole Devanagari block (vowel signs and viramas are
+# not alphanumeric to Python) except the danda punctuation marks
+_TOKEN = re.compile(r"[\wऀ-ॣ०-ॿ]+")
+
+STOPWORDS = frozenset(
+    # English
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "the to what when where which who why with you your please tell about get "
+    # Hindi
+    "का की के को में है हैं से और या पर मैं मुझे मेरा मेरी क्या कैसे कब कहाँ कौन "
+    "लिए भी यह वह एक हो करें "
+    # Marathi
+    "आणि किंवा मी मला माझा माझी काय कसे कधी कुठे कोण साठी ला चा ची चे आहे आहेत "
+    "हे ते एक करा".split()
+)
+
+# Scheme fields that are indexed, with their BM25F weight. Language variants
+# such as name_hi or description_marathi share the weight of their base field.
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "scheme_name": 3.0,
+    "category": 2.0,
+    "eligibility": 1.5,
+    "description": 1.0,
+    "benefits": 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into words, drop stopwords and fold English plurals"""
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if token.isascii() and len(token) > 3 and token.endswith("s"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+_LANGUAGE_SUFFIX = re.compile(r"_(en|hi|mr|english|hindi|marathi)$")
+
+
+def _field_weight(key: str) -> float:
+    return FIELD_WEIGHTS.get(_LANGUAGE_SUFFIX.sub("", key), 0.0)
+
+
+def _strings(value) -> Iterable[str]:
+    """Yield the text in a field value (string, list or per-language dict)"""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _strings(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+
+
+_NO_POSTINGS = ((), ())
+
+
+class SchemeSearchIndex:
+    """
+    In-memory BM25 index over schemes
+
+    Term frequencies are weighted per field (BM25F-style) and IDF values are
+    precomputed, so a query costs one dict lookup per query term plus a
+    top-k heap over the matching schemes.
+    """
+
+    def __init__(self, schemes: List[Dict], k1: float = 1.2, b: float = 0.75):
+        self.schemes = schemes
+        self.k1 = k1
+        self.b = b
+
+        postings = defaultdict(dict)
+        doc_lengths = []
+        for doc_id, scheme in enumerate(schemes):
+            length = 0.0
+            for key, value in scheme.items():
+                weight = _field_weight(key)
+                if not weight:
+                    continue
+                for text in _strings(value):
+                    for token in tokenize(text):
+                        postings[token][doc_id] = (
+                            postings[token].get(doc_id, 0.0) + weight
+                        )
+                        length += weight
+            doc_lengths.append(length)
+
+        avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 1.0
+        n_docs = len(schemes)
+
+        # Precompute per-posting BM25 contributions: idf * tf-saturation.
+        # Postings are flat arrays rather than lists of tuples, so searching
+        # reads them without refcount writes and workers forked after the
+        # index is built keep sharing its pages
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        for term, docs in postings.items():
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            contributions = array("d")
+            for doc_id, tf in docs.items():
+                norm = k1 * (1 - b + b * doc_lengths[doc_id] / (avg_length or 1.0))
+                contributions.append(idf * tf * (k1 + 1) / (tf + norm))
+            self.postings[term] = (array("l", docs), contributions)
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
+        """Return the top-k schemes for a query, best match first"""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            doc_ids, contributions = self.postings.get(term, _NO_POSTINGS)
+            for doc_id, score in zip(doc_ids, contributions):
+                scores[doc_id] += score
+        if not scores:
+            return []
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [self.schemes[doc_id] for doc_id, _ in best]
+
+    def __len__(self):
+        return len(self.postings)
@@ -0,0 +1,827 @@
+"""
+Session Store for Sahayak AI
+Bounded, evicting storage for per-session conversation history
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Fields of a history entry; pages leave out metadata unless asked for it
+TURN_FIELDS = ("id", "user", "assistant", "timestamp", "metadata")
+PAGE_FIELDS = ("id", "user", "assistant", "timestamp")
+
+
+class Turn:
+    """One conversation turn, stored compactly"""
+
+    __slots__ = (
+        "user",
+        "assistant",
+        "language",
+        "persona",
+        "intent",
+        "timestamp",
+        "id",
+    )
+
+    def __init__(
+        self,
+        user: str,
+        assistant: str,
+        language: str,
+        persona: str,
+        intent: str,
+        timestamp: float = None,
+        id: int = None,
+    ):
+        self.user = user
+        self.assistant = assistant
+        # Interned so every turn shares one copy of each label
+        self.language = sys.intern(language) if language else language
+        self.persona = sys.intern(persona) if persona else persona
+        self.intent = sys.intern(intent) if intent else intent
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        # Increasing within a session; assigned by the store, used as page cursor
+        self.id = id
+
+    @classmethod
+    def from_context(cls, user: str, assistant: str, context: Dict) -> "Turn":
+        return cls(
+            user,
+            assistant,
+            context.get("language"),
+            context.get("persona"),
+            context.get("intent"),
+        )
+
+    @classmethod
+    def from_row(cls, row: Tuple) -> "Turn":
+        return cls(*row)
+
+    def to_row(self) -> Tuple:
+        return (
+            self.user,
+            self.assistant,
+            self.language,
+            self.persona,
+            self.intent,
+            self.timestamp,
+        )
+
+    def to_dict(self, fields: Iterable[str] = TURN_FIELDS) -> Dict:
+        """Expand to the history entry format returned by the API"""
+        entry = {}
+        for field in fields:
+            if field == "metadata":
+                entry["metadata"] = {
+                    "original_query": self.user,
+                    "language": self.language,
+                    "persona": self.persona,
+                    "intent": self.intent,
+                }
+            else:
+                entry[field] = getattr(self, field)
+        return entry
+
+    def size_bytes(self) -> int:
+        return (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.user)
+            + sys.getsizeof(self.assistant)
+        )
+
+
+def select_turns(
+    turns: Iterable[Turn],
+    limit: int,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    since: Optional[float] = None,
+) -> Tuple[List[Turn], bool]:
+    """
+    Pick one page from a session's turns (given oldest first)
+
+    With after or since (and no before) the page is the oldest matching turns,
+    for polling forward; otherwise it is the newest ones, for paging back from
+    before. Returns the page oldest first and whether more turns lie beyond it.
+    """
+    forward = after is not None or (since is not None and before is None)
+    if not forward:
+        turns = reversed(turns)
+    page = []
+    for turn in turns:
+        if (
+            (after is not None and turn.id <= after)
+            or (before is not None and turn.id >= before)
+            or (since is not None and turn.timestamp <= since)
+        ):
+            continue
+        if len(page) == limit:
+            return (page if forward else page[::-1]), True
+        page.append(turn)
+    return (page if forward else page[::-1]), False
+
+
+class _Session:
+    __slots__ = ("turns", "last_access", "size_bytes")
+
+    def __init__(self, max_turns: int):
+        self.turns = deque(maxlen=max_turns)
+        self.last_access = time.monotonic()
+        self.size_bytes = 0
+
+
+class InMemorySessionStore:
+    """
+    Per-process conversation history with bounded memory
+
+    - max_turns: oldest turns of a session are dropped past this cap
+    - max_sessions: least recently used sessions are evicted past this cap
+    - idle_ttl: sessions idle for longer than this many seconds expire
+    """
+
+    def __init__(
+        self, max_turns: int = 50, max_sessions: int = 10000, idle_ttl: int = 3600
+    ):
+        self.max_turns = max_turns
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        # Running totals, so stats never walk the sessions
+        self.turns = 0
+        self.memory_bytes = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+        self.turns_dropped = 0
+
+    def _expire_idle(self, now: float):
+        # Sessions are kept in last-access order, so expired ones are at the front
+        cutoff = now - self.idle_ttl
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if session.last_access >= cutoff:
+                break
+            del self._sessions[session_id]
+            self._forget(session)
+            self.ttl_evictions += 1
+
+    def _forget(self, session: _Session):
+        # Called with the lock held, for a session removed from _sessions
+        self.turns -= len(session.turns)
+        self.memory_bytes -= session.size_bytes
+
+    def append(self, session_id: str, user: str, assistant: str, context: Dict):
+        """Record a completed turn for a session"""
+        turn = Turn.from_context(user, assistant, context)
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self.max_turns)
+                while len(self._sessions) > self.max_sessions:
+                    _, evicted = self._sessions.popitem(last=False)
+                    self._forget(evicted)
+                    self.lru_evictions += 1
+            else:
+                self._sessions.move_to_end(session_id)
+            if len(session.turns) == self.max_turns:
+                dropped = session.turns[0].size_bytes()
+                session.size_bytes -= dropped
+                self.memory_bytes -= dropped
+                self.turns -= 1
+                self.turns_dropped += 1
+            turn.id = self._next_id
+            self._next_id += 1
+            size = turn.size_bytes()
+            session.turns.append(turn)
+            session.size_bytes += size
+            session.last_access = now
+            self.memory_bytes += size
+            self.turns += 1
+
+    def get(self, session_id: str) -> List[Dict]:
+        """Get the history of a session, oldest turn first"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            self._sessions.move_to_end(session_id)
+            session.last_access = now
+            turns = list(session.turns)
+        return [turn.to_dict() for turn in turns]
+
+    def page(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        since: Optional[float] = None,
+    ) -> Tuple[List[Turn], bool]:
+        """One page of a session's turns and whether there are more (select_turns)"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                return [], False
+            self._sessions.move_to_end(session_id)
+            session.last_access = now
+            return select_turns(session.turns, limit, before, after, since)
+
+    def clear(self, session_id: str):
+        """Delete the history of a session"""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._forget(session)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            self._expire_idle(time.monotonic())
+            return {
+                "backend": type(self).__name__,
+                "sessions": len(self._sessions),
+                "turns": self.turns,
+                "approx_memory_bytes": self.memory_bytes,
+                "max_turns": self.max_turns,
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "lru_evictions": self.lru_evictions,
+                "ttl_evictions": self.ttl_evictions,
+                "turns_dropped": self.turns_dropped,
+            }
+
+
+class BufferedSessionStore:
+    """
+    Base class for session stores shared between worker processes
+
+    Appends are queued and written in batches by a background thread so the
+    request never waits on storage. A read of a session with turns still
+    waiting in this process's queue writes them first, so a worker always
+    sees its own writes and every turn read has its id.
+
+    A session whose turns fail to write is retried after RETRY_DELAY, backing
+    off while it keeps failing; one that fails with an error in
+    PERMANENT_ERRORS (retrying cannot help) has its turns logged and
+    discarded, so it never holds back other sessions.
+    """
+
+    PERMANENT_ERRORS = (TypeError, ValueError)
+    # Seconds before failed turns are retried when no append wakes the writer,
+    # doubling after each failed retry
+    RETRY_DELAY = 0.5
+    MAX_RETRY_DELAY = 30.0
+
+    def __init__(
+        self, max_turns: int = 50, idle_ttl: int = 3600, flush_interval: float = 0.05
+    ):
+        self.max_turns = max_turns
+        self.idle_ttl = idle_ttl
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._writer = None
+        self._writer_pid = None
+        self._writer_lock = threading.Lock()
+        self._retry_delay = None  # set while failed turns wait to be retried
+        self.batches_written = 0
+        self.turns_written = 0
+        self.write_errors = 0
+        self.turns_discarded = 0
+        atexit.register(self.flush)
+
+    # Storage hooks implemented by subclasses
+
+    def _write_batch(self, batch: Dict[str, List[Turn]]) -> Dict[str, Exception]:
+        """Write queued turns; returns the error of each session that failed"""
+        errors = {}
+        for session_id, turns in batch.items():
+            try:
+                self._write_session(session_id, turns)
+            except Exception as exc:
+                errors[session_id] = exc
+        return errors
+
+    def _write_session(self, session_id: str, turns: List[Turn]):
+        raise NotImplementedError
+
+    def _read(self, session_id: str) -> List[Turn]:
+        raise NotImplementedError
+
+    def _page(self, session_id: str, limit: int, before, after, since):
+        return select_turns(self._read(session_id), limit, before, after, since)
+
+    def _delete(self, session_id: str):
+        raise NotImplementedError
+
+    # Background writer
+
+    def _ensure_writer(self):
+        # Started lazily (and restarted after fork) so preforked workers each get one
+        if self._writer is not None and self._writer_pid == os.getpid():
+            return
+        with self._writer_lock:
+            if self._writer is not None and self._writer_pid == os.getpid():
+                return
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="session-store-writer", daemon=True
+            )
+            self._writer.start()
+            self._writer_pid = os.getpid()
+
+    def _writer_loop(self):
+        while True:
+            # Also wakes up on its own once failed turns are due for a retry
+            if self._wakeup.wait(self._retry_delay):
+                time.sleep(self.flush_interval)  # let more appends join the batch
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all queued turns now"""
+        # Batches are written in order, also when a read flushes early
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            try:
+                errors = self._write_batch(batch)
+            except Exception as exc:
+                errors = dict.fromkeys(batch, exc)
+            retry = {}
+            for session_id, turns in batch.items():
+                exc = errors.get(session_id)
+                if exc is None:
+                    self.turns_written += len(turns)
+                    continue
+                self.write_errors += 1
+                if isinstance(exc, self.PERMANENT_ERRORS):
+                    self.turns_discarded += len(turns)
+                    logger.error(
+                        "Discarding %d conversation turns of session %r: %r",
+                        len(turns),
+                        session_id,
+                        exc,
+                    )
+                else:
+                    retry[session_id] = turns
+                    logger.error(
+                        "Could not write %d conversation turns of session %r; "
+                        "will retry: %r",
+                        len(turns),
+                        session_id,
+                        exc,
+                    )
+            if len(retry) < len(batch):
+                self.batches_written += 1
+            if retry:
+                self._requeue(retry)
+                self._retry_delay = (
+                    self.RETRY_DELAY
+                    if self._retry_delay is None
+                    else min(self._retry_delay * 2, self.MAX_RETRY_DELAY)
+                )
+                if threading.current_thread() is not self._writer:
+                    # The writer may be asleep with no timeout; have it retry
+                    self._ensure_writer()
+                    self._wakeup.set()
+            else:
+                self._retry_delay = None
+
+    def _requeue(self, batch: Dict[str, List[Turn]]):
+        # Back in front of turns queued since, keeping at most max_turns each
+        with self._pending_lock:
+            for session_id, turns in self._pending.items():
+                batch.setdefault(session_id, []).extend(turns)
+            self._pending = {
+                session_id: turns[-self.max_turns :]
+                for session_id, turns in batch.items()
+            }
+
+    def _flush_session(self, session_id: str):
+        with self._pending_lock:
+            pending = session_id in self._pending
+        if pending:
+            self.flush()
+
+    # Public interface
+
+    def append(self, session_id: str, user: str, assistant: str, context: Dict):
+        """Queue a completed turn for a session"""
+        turn = Turn.from_context(user, assistant, context)
+        with self._pending_lock:
+            self._pending.setdefault(session_id, []).append(turn)
+        self._ensure_writer()
+        self._wakeup.set()
+
+    def get(self, session_id: str) -> List[Dict]:
+        """Get the history of a session, oldest turn first"""
+        self._flush_session(session_id)
+        turns = self._read(session_id)
+        return [turn.to_dict() for turn in turns[-self.max_turns :]]
+
+    def page(
+        self,
+        session_id: str,
+        limit: int,
+        before: Optional[int] = None,
+        after: Optional[int] = None,
+        since: Optional[float] = None,
+    ) -> Tuple[List[Turn], bool]:
+        """One page of a session's turns and whether there are more (select_turns)"""
+        self._flush_session(session_id)
+        return self._page(session_id, limit, before, after, since)
+
+    def clear(self, session_id: str):
+        """Delete the history of a session"""
+        with self._pending_lock:
+            self._pending.pop(session_id, None)
+        self._delete(session_id)
+
+    def get_stats(self) -> Dict:
+        with self._pending_lock:
+            pending = sum(len(turns) for turns in self._pending.values())
+        return {
+            "backend": type(self).__name__,
+            "pending_turns": pending,
+            "batches_written": self.batches_written,
+            "turns_written": self.turns_written,
+            "write_errors": self.write_errors,
+            "turns_discarded": self.turns_discarded,
+            "max_turns": self.max_turns,
+            "idle_ttl": self.idle_ttl,
+        }
+
+
+class SQLiteSessionStore(BufferedSessionStore):
+    """
+    Conversation history in a SQLite database in WAL mode
+
+    All workers on a host open the same file; WAL lets readers proceed while
+    the batch writer of any worker commits.
+    """
+
+    # Bad values in a turn (e.g. a session_id of the wrong type)
+    PERMANENT_ERRORS = BufferedSessionStore.PERMANENT_ERRORS + (
+        sqlite3.IntegrityError,
+        sqlite3.InterfaceError,
+        sqlite3.ProgrammingError,
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS turns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            user TEXT NOT NULL,
+            assistant TEXT NOT NULL,
+            language TEXT,
+            persona TEXT,
+            intent TEXT,
+            timestamp REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS turns_session ON turns (session_id, id);
+        CREATE INDEX IF NOT EXISTS turns_timestamp ON turns (timestamp);
+    """
+
+    # Sessions expire as a whole once their latest turn is idle_ttl old, like
+    # the periodic delete in _insert; turns of a live session never do
+    _LIVE_SESSION = (
+        "session_id = ? AND "
+        "(SELECT MAX(timestamp) FROM turns WHERE session_id = ?) >= ?"
+    )
+
+    def __init__(self, path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = str(path)
+        self._local = threading.local()
+        self._last_expiry = 0.0
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _write_batch(self, batch: Dict[str, List[Turn]]) -> Dict[str, Exception]:
+        # One transaction for the whole batch; if it fails, write session by
+        # session so only the sessions at fault are retried or discarded
+        try:
+            self._insert(batch)
+        except Exception:
+            if len(batch) == 1:
+                raise
+            return super()._write_batch(batch)
+        return {}
+
+    def _write_session(self, session_id: str, turns: List[Turn]):
+        self._insert({session_id: turns})
+
+    def _insert(self, batch: Dict[str, List[Turn]]):
+        conn = self._connection()
+        now = time.time()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO turns (session_id, user, assistant, language, persona, intent, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (session_id,) + turn.to_row()
+                    for session_id, turns in batch.items()
+                    for turn in turns
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM turns WHERE session_id = ? AND id NOT IN "
+                "(SELECT id FROM turns WHERE session_id = ? ORDER BY id DESC LIMIT ?)",
+                [(session_id, session_id, self.max_turns) for session_id in batch],
+            )
+            if now - self._last_expiry > 60:
+                conn.execute(
+                    "DELETE FROM turns WHERE session_id IN (SELECT session_id FROM turns "
+                    "GROUP BY session_id HAVING MAX(timestamp) < ?)",
+                    (now - self.idle_ttl,),
+                )
+                self._last_expiry = now
+
+    def _read(self, session_id: str) -> List[Turn]:
+        rows = self._connection().execute(
+            "SELECT user, assistant, language, persona, intent, timestamp, id FROM turns "
+            f"WHERE {self._LIVE_SESSION} ORDER BY id",
+            (session_id, session_id, time.time() - self.idle_ttl),
+        )
+        return [Turn.from_row(row) for row in rows]
+
+    def _page(self, session_id: str, limit: int, before, after, since):
+        # Same selection as select_turns(), but only the page is read
+        where = [self._LIVE_SESSION]
+        params = [session_id, session_id, time.time() - self.idle_ttl]
+        for clause, value in (
+            ("id > ?", after),
+            ("id < ?", before),
+            ("timestamp > ?", since),
+        ):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        forward = after is not None or (since is not None and before is None)
+        rows = self._connection().execute(
+            "SELECT user, assistant, language, persona, intent, timestamp, id FROM turns "
+            f"WHERE {' AND '.join(where)} ORDER BY id {'ASC' if forward else 'DESC'} "
+            "LIMIT ?",
+            params + [limit + 1],
+        )
+        page = [Turn.from_row(row) for row in rows]
+        has_more = len(page) > limit
+        page = page[:limit]
+        return (page if forward else page[::-1]), has_more
+
+    def _delete(self, session_id: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        sessions, turns = (
+            self._connection()
+            .execute("SELECT COUNT(DISTINCT session_id), COUNT(*) FROM turns")
+            .fetchone()
+        )
+        stats.update({"path": self.path, "sessions": sessions, "turns": turns})
+        return stats
+
+
+class CacheSessionStore(BufferedSessionStore):
+    """
+    Conversation history in Django's cache framework (e.g. Redis or Memcached)
+
+    Each session is one cache entry holding its most recent turns as tuples;
+    the idle TTL is the cache timeout, refreshed on every write.
+
+    Writers in different workers update a session one at a time under a lock
+    entry taken with cache.add() (atomic on every backend), so concurrent
+    appends neither lose turns nor hand out the same turn id twice. The lock
+    expires after LOCK_TIMEOUT seconds in case its holder dies.
+    """
+
+    # v2: rows end with the turn id
+    KEY_PREFIX = "sahayak:history:v2:"
+    LOCK_TIMEOUT = 10
+    LOCK_WAIT = 5.0
+
+    def __init__(self, alias: str = "default", **kwargs):
+        from django.core.cache import caches
+
+        super().__init__(**kwargs)
+        self.cache = caches[alias]
+
+    def _key(self, session_id: str) -> str:
+        return self.KEY_PREFIX + session_id
+
+    @contextmanager
+    def _locked(self, session_id: str):
+        key = self._key(session_id) + ":lock"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.LOCK_WAIT
+        delay = 0.002
+        while not self.cache.add(key, token, timeout=self.LOCK_TIMEOUT):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"History of session {session_id!r} is locked")
+            time.sleep(delay)
+            delay = min(delay * 2, 0.05)
+        try:
+            yield
+        finally:
+            # Not ours any more if it expired and another writer took it
+            if self.cache.get(key) == token:
+                self.cache.delete(key)
+
+    def _write_session(self, session_id: str, turns: List[Turn]):
+        key = self._key(session_id)
+        with self._locked(session_id):
+            rows = list(self.cache.get(key, []))
+            next_id = rows[-1][-1] + 1 if rows else 1
+            for turn in turns:
+                rows.append(turn.to_row() + (next_id,))
+                next_id += 1
+            self.cache.set(key, rows[-self.max_turns :], timeout=self.idle_ttl)
+
+    def _read(self, session_id: str) -> List[Turn]:
+        return [Turn.from_row(row) for row in self.cache.get(self._key(session_id), [])]
+
+    def _delete(self, session_id: str):
+        with self._locked(session_id):
+            self.cache.delete(self._key(session_id))
+
+
+class _SessionLock:
+    __slots__ = ("busy", "waiters", "users")
+
+    def __init__(self):
+        self.busy = False
+        self.waiters = deque()  # grant callbacks, in arrival order
+        self.users = 0  # the holder and the waiters
+
+
+class SessionLocks:
+    """
+    One FIFO lock per active session, so turns of a session run one at a time,
+    in arrival order
+
+    Different sessions run in parallel. A released lock is handed straight to
+    the longest waiting request, whether it waits in a thread or on an event
+    loop, so no newcomer can overtake it. An entry exists only while a request
+    holds or waits for it, so memory follows concurrency, not the number of
+    sessions seen.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _SessionLock] = {}
+        self._lock = threading.Lock()
+        self.contended = 0
+
+    def _acquire(self, session_id: str, grant) -> Tuple[_SessionLock, bool]:
+        """Take the lock if free, else queue grant(); returns (entry, queued)"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                entry = self._entries[session_id] = _SessionLock()
+            entry.users += 1
+            if not entry.busy:
+                entry.busy = True
+                return entry, False
+            entry.waiters.append(grant)
+            self.contended += 1
+            return entry, True
+
+    def _release(self, session_id: str, entry: _SessionLock):
+        with self._lock:
+            entry.users -= 1
+            if entry.waiters:
+                # Stays busy: ownership passes to the next waiter
+                entry.waiters.popleft()()
+            else:
+                entry.busy = False
+                if not entry.users:
+                    del self._entries[session_id]
+
+    @contextmanager
+    def hold(self, session_id: str):
+        """Run the block while holding the session's lock"""
+        granted = threading.Event()
+        entry, queued = self._acquire(session_id, granted.set)
+        if queued:
+            granted.wait()
+        try:
+            yield
+        finally:
+            self._release(session_id, entry)
+
+    @asynccontextmanager
+    async def ahold(self, session_id: str):
+        """Async version of hold(); waits without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def grant():
+            loop.call_soon_threadsafe(_resolve, granted)
+
+        entry, queued = self._acquire(session_id, grant)
+        if queued:
+            try:
+                await granted
+            except asyncio.CancelledError:
+                with self._lock:
+                    owned = grant not in entry.waiters
+                    if not owned:
+                        entry.waiters.remove(grant)
+                        entry.users -= 1
+                if owned:
+                    # Granted just before the cancellation: pass it on
+                    self._release(session_id, entry)
+                raise
+        try:
+            yield
+        finally:
+            self._release(session_id, entry)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"active": len(self._entries), "contended": self.contended}
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def build_session_store():
+    """
+    Build the conversation history store configured in settings
+
+    SESSION_HISTORY_BACKEND: "memory" (default, per worker), "sqlite" or "cache"
+    SESSION_HISTORY_MAX_TURNS: turns kept per session
+    SESSION_HISTORY_MAX_SESSIONS: sessions kept before LRU eviction (memory only)
+    SESSION_HISTORY_IDLE_TTL: seconds of inactivity before a session expires
+    SESSION_HISTORY_SQLITE_PATH: database file for the sqlite backend
+    SESSION_HISTORY_CACHE_ALIAS: Django cache alias for the cache backend
+    SESSION_HISTORY_FLUSH_INTERVAL: seconds appends are batched for (shared backends)
+    """
+    backend = getattr(settings, "SESSION_HISTORY_BACKEND", "memory")
+    max_turns = getattr(settings, "SESSION_HISTORY_MAX_TURNS", 50)
+    idle_ttl = getattr(settings, "SESSION_HISTORY_IDLE_TTL", 3600)
+    flush_interval = getattr(settings, "SESSION_HISTORY_FLUSH_INTERVAL", 0.05)
+
+    if backend == "memory":
+        return InMemorySessionStore(
+            max_turns=max_turns,
+            max_sessions=getattr(settings, "SESSION_HISTORY_MAX_SESSIONS", 10000),
+            idle_ttl=idle_ttl,
+        )
+    if backend == "sqlite":
+        path = getattr(
+            settings,
+            "SESSION_HISTORY_SQLITE_PATH",
+            Path(settings.BASE_DIR) / "session_history.sqlite3",
+        )
+        return SQLiteSessionStore(
+            path, max_turns=max_turns, idle_ttl=idle_ttl, flush_interval=flush_interval
+        )
+    if backend == "cache":
+        return CacheSessionStore(
+            alias=getattr(settings, "SESSION_HISTORY_CACHE_ALIAS", "default"),
+            max_turns=max_turns,
+            idle_ttl=idle_ttl,
+            flush_interval=flush_interval,
+        )
+    raise ValueError(f"Unknown SESSION_HISTORY_BACKEND: {backend}")
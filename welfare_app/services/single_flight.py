@@ -0,0 +1,112 @@
+"""
+Request Coalescing for Sahayak AI
+Lets concurrent identical queries share one LLM call instead of each making their own
+"""
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; callers arriving while it is in
+    flight wait for it and share its result (or exception)
+
+    In-flight calls are tracked with concurrent.futures.Future objects, so
+    threaded and async callers coalesce with each other, including async
+    callers running on different event loops. If the leading call is
+    cancelled (e.g. its client disconnected), a waiting caller takes over.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """Get the in-flight future for key and whether this caller leads it"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+        if not future.done():
+            # The leader never produced a result; waiters retry on their own
+            future.cancel()
+
+    def do(self, key: str, call: Callable[[], object]):
+        """Run call() for key, or wait for the identical call already running"""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except CancelledError:
+                    continue
+            try:
+                result = call()
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._finish(key, future)
+
+    async def ado(self, key: str, call: Callable[[], Awaitable[object]]):
+        """Async version of do(); call is a coroutine function"""
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: a cancelled waiter must not cancel the shared call
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except asyncio.CancelledError:
+                    if future.cancelled():
+                        continue
+                    raise
+            try:
+                result = await call()
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._finish(key, future)
+
+    def get_stats(self) -> Dict:
+        calls = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+        }
+
+
+def build_single_flight() -> Optional[SingleFlight]:
+    """
+    Build the request coalescer configured in settings
+
+    LLM_COALESCE_REQUESTS: set False to give every request its own LLM call
+    """
+    if not getattr(settings, "LLM_COALESCE_REQUESTS", True):
+        return None
+    return SingleFlight()
@@ -0,0 +1,106 @@
+"""
+Process Warm-up for Sahayak AI
+Builds the chatbot before the first request and reports memory use
+"""
+
+import gc
+import logging
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Set by warm_up(); a preforked worker inherits its master's report
+_report: Optional[Dict] = None
+
+
+def memory_usage() -> Dict:
+    """
+    Memory of the current process in MB
+
+    On Linux, pss (proportional set size) charges pages shared with other
+    processes in equal parts, so the pss of every worker sums to the real
+    total; shared and private split rss into pages still shared after fork
+    and pages this process has written to.
+    """
+    usage = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1])
+    except OSError:
+        # No /proc: only the peak is available (bytes on macOS, kB elsewhere)
+        try:
+            import resource
+        except ImportError:  # Windows
+            return usage
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["max_rss_mb"] = round(
+            peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+        )
+        return usage
+
+    def mb(*names):
+        return round(sum(fields.get(name, 0) for name in names) / 1024, 1)
+
+    usage.update(
+        rss_mb=mb("Rss"),
+        pss_mb=mb("Pss"),
+        shared_mb=mb("Shared_Clean", "Shared_Dirty"),
+        private_mb=mb("Private_Clean", "Private_Dirty"),
+    )
+    return usage
+
+
+def warm_up(freeze: bool = True) -> Dict:
+    """
+    Load the knowledge base and build the caches of the first requests
+
+    With freeze, the objects built are moved to the permanent GC generation
+    (gc.freeze()). The collector then never walks them, and in workers forked
+    from this process (gunicorn --preload) it never writes to their headers,
+    so their pages stay shared instead of being copied into every worker.
+    """
+    from .chatbot import get_chatbot_instance
+
+    global _report
+    before = memory_usage()
+    start = time.perf_counter()
+    chatbot = get_chatbot_instance()
+    chatbot.warm_up()
+    seconds = time.perf_counter() - start
+    if freeze:
+        gc.collect()
+        gc.freeze()
+    after = memory_usage()
+
+    _report = {
+        "pid": os.getpid(),
+        "seconds": round(seconds, 3),
+        "kb_version": chatbot.kb_version,
+        "gc_frozen": gc.get_freeze_count(),
+        "before": before,
+        "after": after,
+    }
+    logger.info(
+        "Warmed up in %.2fs (KB version %s): RSS %s -> %s MB",
+        seconds,
+        chatbot.kb_version,
+        before.get("rss_mb", before.get("max_rss_mb")),
+        after.get("rss_mb", after.get("max_rss_mb")),
+    )
+    return _report
+
+
+def get_warmup_stats() -> Dict:
+    """Warm-up report and the current memory of this process"""
+    return {
+        "warmup": _report,
+        "preloaded": _report is not None and _report["pid"] != os.getpid(),
+        "memory": memory_usage(),
+    }
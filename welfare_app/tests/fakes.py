@@ -0,0 +1,172 @@
+"""Test doubles shared by the test modules"""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+from welfare_app.services.chatbot import SahayakChatbot
+
+KB = {
+    "meta": {"name": "Test dataset"},
+    "schemes": [
+        {
+            "scheme_id": "S1",
+            "scheme_name": "Old Age Pension",
+            "category": "Pension",
+            "eligibility": "Age above 60",
+            "documents_required": ["Aadhaar card", "Age proof"],
+        },
+        {
+            "scheme_id": "S2",
+            "scheme_name": "Girl Child Scholarship",
+            "category": "Education",
+            "eligibility": "Girls in class 8 to 12",
+            "documents_required": ["School certificate"],
+        },
+    ],
+    "wards": [
+        {"ward_id": "W1", "ward_name": "Naupada", "population": 1000},
+        {"ward_id": "W2", "ward_name": "Kopri", "population": 3000},
+    ],
+}
+
+# KB plus the figures the analytics engine aggregates
+ANALYTICS_KB = {
+    **KB,
+    "beneficiary_coverage": [
+        {
+            "ward_id": "W1",
+            "scheme_id": "S1",
+            "eligible_population": 100,
+            "enrolled_beneficiaries": 80,
+        },
+        {
+            "ward_id": "W1",
+            "scheme_id": "S2",
+            "eligible_population": 100,
+            "enrolled_beneficiaries": 20,
+        },
+        {
+            "ward_id": "W2",
+            "scheme_id": "S1",
+            "eligible_population": 200,
+            "enrolled_beneficiaries": 50,
+        },
+    ],
+    "vulnerability_scores": [
+        {"ward_id": "w1", "vulnerability_score": 0.8, "risk_level": "High"},
+        {"ward_id": "W2", "vulnerability_score": 0.4, "risk_level": "Low"},
+    ],
+    "scheme_performance": [
+        {
+            "ward_id": "W1",
+            "scheme_id": "S1",
+            "applications_received": 10,
+            "applications_approved": 8,
+            "budget_allocated": 2e7,
+            "budget_utilized": 1e7,
+        },
+        {
+            "ward_id": "W2",
+            "scheme_id": "S1",
+            "applications_received": 30,
+            "applications_approved": 12,
+            "budget_allocated": 1e7,
+            "budget_utilized": 5e6,
+        },
+        {
+            "ward_id": "W1",
+            "scheme_id": "S2",
+            "applications_received": 5,
+            "applications_approved": 5,
+            "budget_allocated": 1e7,
+            "budget_utilized": None,
+        },
+    ],
+    "grievances_summary": [
+        {
+            "ward_id": "W1",
+            "scheme_id": "S1",
+            "total_grievances": 10,
+            "resolved": 6,
+            "pending": 4,
+            "avg_resolution_days": 5,
+        },
+        {
+            "ward_id": "W2",
+            "scheme_id": "S1",
+            "total_grievances": 30,
+            "resolved": 30,
+            "pending": 0,
+            "avg_resolution_days": 9,
+        },
+    ],
+}
+
+
+def completion(content: str):
+    """A chat completion shaped like the Groq SDK's response"""
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def stream_chunk(text: str):
+    """One chunk of a streamed chat completion"""
+    delta = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+class FakeLLM:
+    """Stands in for LLMClient, answering every call with the same text"""
+
+    def __init__(self, answer="Apply at the ward office", error=None):
+        self.answer = answer
+        self.error = error
+        self.calls = 0
+
+    def complete(self, persona, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return completion(self.answer)
+
+    async def acomplete(self, persona, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error:
+            raise self.error
+        return completion(self.answer)
+
+    def stream(self, persona, **kwargs):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        # Split into words, so the answer arrives in several chunks
+        words = self.answer.split(" ")
+        return iter(
+            stream_chunk(word if i == 0 else " " + word) for i, word in enumerate(words)
+        )
+
+    def get_stats(self):
+        return {"calls": self.calls}
+
+
+def write_kb(test, kb=KB) -> str:
+    """Write kb to a temporary dataset file removed after the test"""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    path = os.path.join(directory, "kb.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(kb, f)
+    return path
+
+
+def make_chatbot(test, kb=KB, llm=None) -> SahayakChatbot:
+    """A chatbot on a temporary copy of kb that answers through llm"""
+    chatbot = SahayakChatbot(dataset_path=write_kb(test, kb))
+    chatbot.llm = llm or FakeLLM()
+    chatbot.reload_knowledge_base()  # rebuild the handlers on the fake
+    return chatbot
@@ -0,0 +1,71 @@
+from django.test import SimpleTestCase
+
+from welfare_app.services.ai_controller import AIController, KeywordMatcher
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def test_longest_match_implies_the_keywords_it_contains(self):
+        matcher = KeywordMatcher(["app", "apply", "ply"])
+        self.assertEqual(matcher.scan("please apply"), {"app", "apply", "ply"})
+        self.assertEqual(matcher.scan("an app"), {"app"})
+
+    def test_overlapping_keywords_are_all_found(self):
+        matcher = KeywordMatcher(["abc", "bcd", "cd"])
+        self.assertEqual(matcher.scan("xabcdx"), {"abc", "bcd", "cd"})
+
+    def test_matches_are_the_same_as_substring_checks(self):
+        keywords = ["status", "status update", "stat", "update", "date"]
+        matcher = KeywordMatcher(keywords)
+        for text in ("status update please", "statistics", "no match", "dates"):
+            expected = {kw for kw in keywords if kw in text}
+            self.assertEqual(matcher.scan(text), expected, text)
+
+
+class ClassifyTests(SimpleTestCase):
+    def setUp(self):
+        self.controller = AIController()
+
+    def test_language_menu_choices(self):
+        for choice, language in AIController.LANGUAGE_CHOICES.items():
+            self.assertEqual(
+                self.controller.classify(f" {choice} ")["language"], language
+            )
+
+    def test_devanagari_text_is_hindi_and_latin_text_english(self):
+        self.assertEqual(self.controller.classify("योजना बताइए")["language"], "Hindi")
+        self.assertEqual(self.controller.classify("tell me")["language"], "English")
+
+    def test_leader_keywords_outrank_employee_keywords(self):
+        result = self.controller.classify("pending applications report")
+        self.assertEqual(result["persona"], "leader")
+        self.assertEqual(result["persona_scores"], {"leader": 1, "employee": 3})
+
+    def test_employee_then_citizen_persona(self):
+        self.assertEqual(
+            self.controller.classify("approve this")["persona"], "employee"
+        )
+        self.assertEqual(self.controller.classify("hello")["persona"], "citizen")
+
+    def test_intent_follows_priority_order(self):
+        self.assertEqual(
+            self.controller.classify("status of my pension scheme")["intent"],
+            "check_status",
+        )
+        self.assertEqual(
+            self.controller.classify("pension scheme complaint")["intent"], "grievance"
+        )
+        self.assertEqual(
+            self.controller.classify("pension scheme")["intent"], "scheme_info"
+        )
+        self.assertEqual(self.controller.classify("hello")["intent"], "general_query")
+
+    def test_edited_keywords_apply_after_rebuilding_the_matcher(self):
+        self.controller.leader_keywords.append("budget")
+        self.controller._build_matcher()
+        self.assertEqual(self.controller.classify("budget")["persona"], "leader")
+
+    def test_analyze_uses_the_language_override(self):
+        context = self.controller.analyze("योजना", language_override="Marathi")
+        self.assertEqual(context["language"], "Marathi")
+        self.assertEqual(context["intent"], "scheme_info")
+        self.assertEqual(context["original_query"], "योजना")
@@ -0,0 +1,138 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from welfare_app.services import analytics as analytics_module
+from welfare_app.services.analytics import KBAnalytics, build_analytics
+
+from .fakes import ANALYTICS_KB
+
+
+class KBAnalyticsTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.analytics = KBAnalytics(ANALYTICS_KB)
+
+    def test_ward_figures(self):
+        naupada = self.analytics.get_ward("w1")
+        self.assertEqual(naupada["ward_name"], "Naupada")
+        self.assertEqual(naupada["eligible_population"], 200)
+        self.assertEqual(naupada["enrolled_beneficiaries"], 100)
+        self.assertEqual(naupada["coverage_ratio"], 0.5)
+        self.assertEqual(naupada["vulnerability_score"], 0.8)
+        self.assertEqual(naupada["risk_level"], "High")
+        self.assertEqual(naupada["applications_received"], 15)
+        self.assertEqual(naupada["approval_rate"], 0.8667)
+        self.assertEqual(naupada["resolution_rate"], 0.6)
+        self.assertEqual(naupada["priority_score"], 0.4)
+
+    def test_scheme_figures(self):
+        pension = self.analytics.get_scheme("S1")
+        self.assertEqual(pension["name"], "Old Age Pension")
+        self.assertEqual(pension["applications_received"], 40)
+        self.assertEqual(pension["approval_rate"], 0.5)
+        self.assertEqual(pension["budget_utilization"], 0.5)
+        self.assertEqual(pension["grievances_total"], 40)
+        self.assertEqual(pension["resolution_rate"], 0.9)
+        # Weighted by grievances: (5 x 10 + 9 x 30) / 40
+        self.assertEqual(pension["avg_resolution_days"], 8.0)
+
+    def test_missing_values_stay_unknown(self):
+        scholarship = self.analytics.get_scheme("S2")
+        self.assertIsNone(scholarship["budget_utilized"])
+        self.assertIsNone(scholarship["budget_utilization"])
+        self.assertIsNone(scholarship["grievances_total"])
+        self.assertIsNone(scholarship["resolution_rate"])
+
+    def test_city_summary(self):
+        summary = self.analytics.summary
+        self.assertEqual(summary["total_wards"], 2)
+        self.assertEqual(summary["population"], 4000)
+        self.assertEqual(summary["coverage_ratio"], 0.375)
+        self.assertEqual(summary["applications_received"], 45)
+        self.assertEqual(summary["approval_rate"], 0.5556)
+        self.assertEqual(summary["budget_utilization"], 0.375)
+        self.assertEqual(summary["grievances_pending"], 4)
+        self.assertEqual(summary["wards_by_risk_level"], {"High": 1, "Low": 1})
+
+    def test_budget_by_category_in_crores(self):
+        self.assertEqual(
+            self.analytics.budget_by_category,
+            [
+                {
+                    "category": "Pension",
+                    "allocated": 3.0,
+                    "spent": 1.5,
+                    "utilization": 0.5,
+                },
+                {
+                    "category": "Education",
+                    "allocated": 1.0,
+                    "spent": 0.0,
+                    "utilization": 0.0,
+                },
+            ],
+        )
+
+    def test_bottlenecks(self):
+        bottlenecks = self.analytics.get_bottlenecks()
+        self.assertEqual(
+            [row["ward_id"] for row in bottlenecks["priority_wards"]], ["W1", "W2"]
+        )
+        self.assertEqual(
+            [row["ward_id"] for row in bottlenecks["lowest_coverage_wards"]],
+            ["W2", "W1"],
+        )
+        # Schemes with no utilization figure are left out
+        self.assertEqual(
+            [row["scheme_id"] for row in bottlenecks["underutilized_schemes"]], ["S1"]
+        )
+        self.assertEqual(len(self.analytics.get_bottlenecks(1)["priority_wards"]), 1)
+
+    def test_sorting_filtering_and_limits(self):
+        wards = self.analytics.get_wards(sort="coverage_ratio")
+        self.assertEqual([row["ward_id"] for row in wards], ["W2", "W1"])
+        wards = self.analytics.get_wards(
+            sort="coverage_ratio", descending=True, limit=1
+        )
+        self.assertEqual([row["ward_id"] for row in wards], ["W1"])
+        schemes = self.analytics.get_schemes(sort="budget_utilization")
+        self.assertEqual([row["scheme_id"] for row in schemes], ["S1", "S2"])
+        schemes = self.analytics.get_schemes(category="education")
+        self.assertEqual([row["scheme_id"] for row in schemes], ["S2"])
+        with self.assertRaises(ValueError):
+            self.analytics.get_wards(sort="no_such_field")
+
+    def test_build_without_numpy_returns_none(self):
+        with mock.patch.object(analytics_module, "np", None):
+            self.assertIsNone(build_analytics(ANALYTICS_KB))
+
+
+class AnalyticsViewTests(SimpleTestCase):
+    def get(self, path, analytics):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.retriever.get_analytics.return_value = analytics
+            chatbot.return_value.retriever.version = 3
+            return self.client.get(path)
+
+    def test_endpoints_serve_precomputed_figures(self):
+        analytics = KBAnalytics(ANALYTICS_KB)
+        response = self.get("/api/analytics/wards/?sort=coverage_ratio", analytics)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["kb_version"], 3)
+        self.assertEqual([row["ward_id"] for row in body["wards"]], ["W2", "W1"])
+
+        response = self.get("/api/analytics/schemes/S1/", analytics)
+        self.assertEqual(response.json()["scheme"]["approval_rate"], 0.5)
+
+    def test_error_statuses(self):
+        analytics = KBAnalytics(ANALYTICS_KB)
+        self.assertEqual(
+            self.get("/api/analytics/wards/W9/", analytics).status_code, 404
+        )
+        self.assertEqual(
+            self.get("/api/analytics/wards/?sort=bogus", analytics).status_code, 400
+        )
+        self.assertEqual(self.get("/api/analytics/summary/", None).status_code, 503)
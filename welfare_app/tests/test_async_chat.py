@@ -0,0 +1,37 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from welfare_app.tests.fakes import FakeLLM, make_chatbot
+
+
+class AsyncChatTests(SimpleTestCase):
+    def setUp(self):
+        self.llm = FakeLLM("Apply online")
+        self.chatbot = make_chatbot(self, llm=self.llm)
+
+    async def test_achat_answers_like_chat_and_records_the_turn(self):
+        result = await self.chatbot.achat(
+            "How do I apply?", session_id="s", language="English", use_cache=False
+        )
+        self.assertEqual(result["response"], "Apply online")
+        self.assertEqual(result["language"], "English")
+        history = self.chatbot.get_conversation_history("s")
+        self.assertEqual([turn["user"] for turn in history], ["How do I apply?"])
+        self.assertEqual(self.llm.calls, 1)
+
+    async def test_async_endpoint(self):
+        async def aget_chatbot_instance():
+            return self.chatbot
+
+        with mock.patch(
+            "welfare_app.views.aget_chatbot_instance", aget_chatbot_instance
+        ):
+            response = await self.async_client.post(
+                "/api/chat/async/",
+                json.dumps({"message": "How do I apply?", "session_id": "s"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["response"], "Apply online")
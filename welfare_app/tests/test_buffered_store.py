@@ -0,0 +1,228 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.session_store import (
+    CacheSessionStore,
+    SQLiteSessionStore,
+    Turn,
+    build_session_store,
+)
+
+CONTEXT = {"language": "English", "persona": "employee", "intent": "general"}
+
+
+class SharedStoreTests:
+    """Behaviour common to the stores shared between workers"""
+
+    def make_store(self, **kwargs):
+        raise NotImplementedError
+
+    def test_other_workers_read_the_written_history(self):
+        other = self.make_store()
+        self.store.append("s", "q1", "a1", CONTEXT)
+        self.store.append("s", "q2", "a2", CONTEXT)
+        self.store.flush()
+        history = other.get("s")
+        self.assertEqual([t["user"] for t in history], ["q1", "q2"])
+        self.assertEqual(history[0]["metadata"]["persona"], "employee")
+
+    def test_a_worker_reads_its_own_queued_turns(self):
+        self.store.append("s", "q1", "a1", CONTEXT)
+        self.assertEqual([t["user"] for t in self.store.get("s")], ["q1"])
+
+    def test_only_the_newest_max_turns_are_kept(self):
+        store = self.make_store(max_turns=2)
+        for i in range(3):
+            store.append("s", f"q{i}", "a", CONTEXT)
+            store.flush()
+        self.assertEqual([t["user"] for t in store.get("s")], ["q1", "q2"])
+
+    def test_pages_follow_turn_ids(self):
+        for i in range(5):
+            self.store.append("s", f"q{i}", "a", CONTEXT)
+        newest, more = self.store.page("s", 2)
+        self.assertEqual(([t.user for t in newest], more), (["q3", "q4"], True))
+        older, more = self.store.page("s", 2, before=newest[0].id)
+        self.assertEqual(([t.user for t in older], more), (["q1", "q2"], True))
+        newer, more = self.store.page("s", 10, after=older[-1].id)
+        self.assertEqual(([t.user for t in newer], more), (["q3", "q4"], False))
+
+    def test_clear_deletes_written_and_queued_turns(self):
+        self.store.append("s", "q1", "a1", CONTEXT)
+        self.store.flush()
+        self.store.append("s", "q2", "a2", CONTEXT)
+        self.store.clear("s")
+        self.store.flush()
+        self.assertEqual(self.store.get("s"), [])
+
+
+class SQLiteSessionStoreTests(SharedStoreTests, SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.store = self.make_store()
+
+    def make_store(self, **kwargs):
+        kwargs.setdefault("idle_ttl", 60)
+        return SQLiteSessionStore(
+            os.path.join(self.directory, "history.sqlite3"), **kwargs
+        )
+
+    def test_failed_batch_is_requeued_and_written_later(self):
+        self.store.append("s", "q1", "a1", CONTEXT)
+        with mock.patch.object(
+            SQLiteSessionStore,
+            "_write_batch",
+            side_effect=sqlite3.OperationalError("database is locked"),
+        ):
+            with self.assertLogs("welfare_app.services.session_store", "ERROR"):
+                self.store.flush()
+        self.store.append("s", "q2", "a2", CONTEXT)
+        self.store.flush()
+        self.assertEqual([t["user"] for t in self.store.get("s")], ["q1", "q2"])
+        self.assertEqual(self.store.write_errors, 1)
+
+    def test_failed_batch_is_retried_without_further_appends(self):
+        self.store.RETRY_DELAY = 0.01
+        insert = SQLiteSessionStore._insert
+        failures = [sqlite3.OperationalError("database is locked")] * 2
+
+        def flaky_insert(store, batch):
+            if failures:
+                raise failures.pop()
+            insert(store, batch)
+
+        with mock.patch.object(SQLiteSessionStore, "_insert", flaky_insert):
+            with self.assertLogs("welfare_app.services.session_store", "ERROR"):
+                self.store.append("s", "q1", "a1", CONTEXT)
+                deadline = time.monotonic() + 5
+                while self.store.turns_written == 0 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+        self.assertEqual(self.store.turns_written, 1)
+        self.assertEqual(self.store.write_errors, 2)
+        self.assertIsNone(self.store._retry_delay)
+
+    def test_concurrent_first_appends_start_one_writer(self):
+        start = threading.Barrier(8)
+
+        def append(i):
+            start.wait()
+            self.store.append(f"s{i}", "q", "a", CONTEXT)
+
+        started_writers = []
+        real_start = threading.Thread.start
+
+        def record_start(thread):
+            if thread.name == "session-store-writer":
+                started_writers.append(thread)
+            real_start(thread)
+
+        with mock.patch.object(threading.Thread, "start", record_start):
+            threads = [threading.Thread(target=append, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(started_writers), 1)
+        self.store.flush()
+
+    def test_bad_session_is_discarded_without_blocking_others(self):
+        self.store.append(None, "q", "a", CONTEXT)
+        self.store.append("good", "q1", "a1", CONTEXT)
+        with self.assertLogs("welfare_app.services.session_store", "ERROR"):
+            self.store.flush()
+        self.store.append("good", "q2", "a2", CONTEXT)
+        self.assertEqual([t["user"] for t in self.store.get("good")], ["q1", "q2"])
+        stats = self.store.get_stats()
+        self.assertEqual((stats["pending_turns"], stats["turns_discarded"]), (0, 1))
+
+    def test_long_running_session_keeps_its_early_turns(self):
+        conn = self.store._connection()
+        old = time.time() - 3600
+        conn.executemany(
+            "INSERT INTO turns (session_id, user, assistant, language, persona, "
+            "intent, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                ("s", "early", "a", "English", "employee", "general", old),
+                ("s", "recent", "a", "English", "employee", "general", time.time()),
+                ("idle", "old", "a", "English", "employee", "general", old),
+            ],
+        )
+        self.assertEqual([t["user"] for t in self.store.get("s")], ["early", "recent"])
+        turns, _ = self.store.page("s", 10)
+        self.assertEqual([t.user for t in turns], ["early", "recent"])
+        self.assertEqual(self.store.get("idle"), [])
+
+
+class CacheSessionStoreTests(SharedStoreTests, SimpleTestCase):
+    def setUp(self):
+        self.store = self.make_store()
+        self.addCleanup(self.store.cache.clear)
+
+    def make_store(self, **kwargs):
+        kwargs.setdefault("idle_ttl", 60)
+        return CacheSessionStore(**kwargs)
+
+    def test_bad_session_is_discarded_without_blocking_others(self):
+        self.store.append(7, "q", "a", CONTEXT)
+        self.store.append("good", "q1", "a1", CONTEXT)
+        with self.assertLogs("welfare_app.services.session_store", "ERROR"):
+            self.store.flush()
+        self.assertEqual([t["user"] for t in self.store.get("good")], ["q1"])
+        self.assertEqual(self.store.get_stats()["pending_turns"], 0)
+
+    def test_concurrent_writers_keep_every_turn_with_unique_ids(self):
+        # One store per simulated worker, all sharing the same cache
+        stores = [CacheSessionStore(idle_ttl=60) for _ in range(4)]
+
+        def write(store, worker):
+            for i in range(10):
+                store._write_session(
+                    "s", [Turn.from_context(f"{worker}-{i}", "a", CONTEXT)]
+                )
+
+        def slow_get(cache, key, *args, **kwargs):
+            value = get(cache, key, *args, **kwargs)
+            time.sleep(0.001)  # widen the read-modify-write window
+            return value
+
+        get = LocMemCache.get
+        threads = [
+            threading.Thread(target=write, args=(store, worker))
+            for worker, store in enumerate(stores)
+        ]
+        with mock.patch.object(LocMemCache, "get", slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        ids = [turn["id"] for turn in self.store.get("s")]
+        self.assertEqual(sorted(ids), list(range(1, 41)))
+
+
+class BuildSessionStoreTests(SimpleTestCase):
+    def test_backend_comes_from_settings(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "history.sqlite3")
+        with override_settings(
+            SESSION_HISTORY_BACKEND="sqlite",
+            SESSION_HISTORY_SQLITE_PATH=path,
+            SESSION_HISTORY_MAX_TURNS=7,
+        ):
+            store = build_session_store()
+        self.assertIsInstance(store, SQLiteSessionStore)
+        self.assertEqual((store.path, store.max_turns), (path, 7))
+        with override_settings(SESSION_HISTORY_BACKEND="cache"):
+            self.assertIsInstance(build_session_store(), CacheSessionStore)
+        with override_settings(SESSION_HISTORY_BACKEND="redis"):
+            with self.assertRaises(ValueError):
+                build_session_store()
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.chatbot import SahayakChatbot
+
+
+class ChatBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = SahayakChatbot.__new__(SahayakChatbot)
+        self.chatbot._batch_executor = None
+        self.chatbot._batch_executor_lock = threading.Lock()
+        self.chatbot.chat = lambda message, session_id, **kwargs: {
+            "response": f"{session_id}:{message}"
+        }
+
+    def test_invalid_session_id_fails_only_its_item(self):
+        results = self.chatbot.chat_batch(
+            [
+                {"message": "one", "session_id": ["a"]},
+                {"message": "two", "session_id": {"a": 1}},
+                {"message": "three", "session_id": "s1"},
+                {"message": "four", "session_id": None},
+                {"message": "five"},
+            ]
+        )
+        self.assertEqual(
+            [r.get("error") for r in results[:2]],
+            ["session_id must be a string"] * 2,
+        )
+        self.assertEqual(
+            [r["response"] for r in results[2:]],
+            ["s1:three", "default:four", "default:five"],
+        )
+
+    def test_results_keep_input_order_and_errors_stay_per_item(self):
+        def chat(message, session_id, **kwargs):
+            if message == "boom":
+                raise RuntimeError("handler failed")
+            time.sleep(0.05 if session_id == "slow" else 0)
+            return {"response": f"{session_id}:{message}"}
+
+        self.chatbot.chat = chat
+        results = self.chatbot.chat_batch(
+            [
+                {"message": "one", "session_id": "slow"},
+                {"message": "   "},
+                {"message": "boom", "session_id": "s2"},
+                {"message": "two", "session_id": "fast"},
+                "not an item",
+            ]
+        )
+        self.assertEqual(
+            results,
+            [
+                {"success": True, "response": "slow:one"},
+                {"success": False, "error": "Message is required"},
+                {"success": False, "error": "handler failed"},
+                {"success": True, "response": "fast:two"},
+                {"success": False, "error": "Message is required"},
+            ],
+        )
+
+    def test_sessions_run_concurrently_and_each_session_in_order(self):
+        # Both sessions must be inside chat() at once for the barrier to pass
+        barrier = threading.Barrier(2, timeout=5)
+        seen = []
+        lock = threading.Lock()
+
+        def chat(message, session_id, **kwargs):
+            if message == "first":
+                barrier.wait()
+            with lock:
+                seen.append((session_id, message))
+            return {"response": message}
+
+        self.chatbot.chat = chat
+        items = [
+            {"message": message, "session_id": session_id}
+            for message in ("first", "second", "third")
+            for session_id in ("a", "b")
+        ]
+        results = self.chatbot.chat_batch(items)
+        self.assertTrue(all(r["success"] for r in results))
+        for session_id in ("a", "b"):
+            self.assertEqual(
+                [m for s, m in seen if s == session_id], ["first", "second", "third"]
+            )
+
+
+class ChatBatchViewTests(SimpleTestCase):
+    def post(self, body):
+        return self.client.post(
+            "/api/chat/batch/", json.dumps(body), content_type="application/json"
+        )
+
+    @override_settings(CHAT_BATCH_MAX_ITEMS=2)
+    def test_batch_size_is_capped(self):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            response = self.post({"items": [{"message": "hi"}] * 3})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "At most 2 items per batch")
+        chatbot.return_value.chat_batch.assert_not_called()
+
+    def test_empty_or_missing_items_are_rejected(self):
+        for body in ({"items": []}, {"items": "hi"}, {}):
+            self.assertEqual(self.post(body).status_code, 400)
+
+    def test_items_and_cache_flag_are_passed_through(self):
+        items = [{"message": "hi", "session_id": "s1"}]
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.chat_batch.return_value = [{"success": True}]
+            response = self.post({"items": items, "use_cache": False})
+        self.assertEqual(
+            response.json(), {"success": True, "results": [{"success": True}]}
+        )
+        chatbot.return_value.chat_batch.assert_called_once_with(items, use_cache=False)
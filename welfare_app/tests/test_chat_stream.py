@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.ai_controller import AIController
+from welfare_app.services.chatbot import SahayakChatbot
+from welfare_app.services.handlers import CitizenHandler
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+from welfare_app.services.response_cache import LocalCacheBackend, ResponseCache
+from welfare_app.services.session_store import InMemorySessionStore, SessionLocks
+from welfare_app.tests.fakes import FakeLLM
+
+
+class ChatStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = SahayakChatbot.__new__(SahayakChatbot)
+        self.chatbot.session_locks = SessionLocks()
+        self.chatbot.session_store = InMemorySessionStore()
+        self.chatbot.metrics = None
+        self.chatbot.fast_path = None
+        self.chatbot._is_language_change = lambda message: False
+        self.chatbot.check_for_kb_update = lambda: None
+        self.chatbot._analyze = lambda message, language: {
+            "language": "English",
+            "persona": "citizen",
+            "intent": "general",
+        }
+        self.chatbot._snapshot = SimpleNamespace(
+            registry=SimpleNamespace(
+                route_stream=lambda context, use_cache: iter(["Hel", "lo"])
+            )
+        )
+        self.recorded = threading.Event()
+        record = SahayakChatbot._record_turn.__get__(self.chatbot)
+
+        def record_turn(*args):
+            record(*args)
+            self.recorded.set()
+
+        self.chatbot._record_turn = record_turn
+
+    def test_session_lock_is_not_held_while_the_client_is_slow(self):
+        events = self.chatbot.chat_stream("hi", session_id="s")
+        self.assertEqual(next(events)["event"], "meta")
+        # The client has read one event; the turn still completes and unlocks
+        self.assertTrue(self.recorded.wait(5))
+        with self.chatbot.session_locks.hold("s"):
+            pass
+        self.assertEqual([e["data"].get("text") for e in events], ["Hel", "lo", None])
+        self.assertEqual(
+            self.chatbot.get_conversation_history("s")[0]["assistant"], "Hello"
+        )
+
+    def test_async_stream_yields_the_same_events(self):
+        async def collect():
+            return [
+                event["event"]
+                async for event in self.chatbot.achat_stream("hi", session_id="s")
+            ]
+
+        self.assertEqual(asyncio.run(collect()), ["meta", "token", "token", "done"])
+
+    def test_errors_end_the_stream_with_an_error_event(self):
+        def fail(context, use_cache):
+            raise RuntimeError("boom")
+
+        self.chatbot._snapshot.registry.route_stream = fail
+        with self.assertLogs("welfare_app.services.chatbot", "ERROR"):
+            events = list(self.chatbot.chat_stream("hi", session_id="s"))
+        self.assertEqual(events[-1], {"event": "error", "data": {"error": "boom"}})
+
+
+class HandlerStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.llm = FakeLLM("Visit the ward office")
+        self.handler = CitizenHandler(
+            KnowledgeRetriever({"schemes": [{"scheme_id": "S1"}]}),
+            self.llm,
+            response_cache=ResponseCache(LocalCacheBackend()),
+        )
+
+    def context(self):
+        return AIController().analyze("How to apply?", language_override="English")
+
+    def test_answer_streams_in_chunks_and_is_cached_whole(self):
+        chunks = list(self.handler.stream(self.context()))
+        self.assertEqual(chunks, ["Visit", " the", " ward", " office"])
+        context = self.context()
+        self.assertEqual(list(self.handler.stream(context)), ["Visit the ward office"])
+        self.assertEqual((context["source"], self.llm.calls), ("cache", 1))
+
+    def test_failure_before_the_first_chunk_streams_the_fallback(self):
+        self.llm.error = RuntimeError("down")
+        context = self.context()
+        with self.assertLogs("welfare_app.services.handlers", "WARNING"):
+            chunks = list(self.handler.stream(context))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(context["source"], "fallback")
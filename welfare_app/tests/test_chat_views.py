@@ -0,0 +1,83 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+
+class ChatSessionIdTests(SimpleTestCase):
+    def post(self, path, body):
+        return self.client.post(path, json.dumps(body), content_type="application/json")
+
+    def test_non_string_session_id_is_rejected(self):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            for path in (
+                "/api/chat/",
+                "/api/chat/async/",
+                "/api/chat/stream/",
+                "/api/history/clear/",
+            ):
+                for session_id in (7, ["a"], {"a": 1}):
+                    response = self.post(
+                        path, {"message": "hello", "session_id": session_id}
+                    )
+                    self.assertEqual(response.status_code, 400, path)
+                    self.assertEqual(
+                        response.json()["error"], "session_id must be a string"
+                    )
+        chatbot.return_value.chat.assert_not_called()
+        chatbot.return_value.clear_conversation_history.assert_not_called()
+
+    def test_null_session_id_uses_the_default_session(self):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.chat.return_value = {
+                "response": "hi",
+                "language": "English",
+                "persona": "citizen",
+                "intent": "general",
+            }
+            response = self.post("/api/chat/", {"message": "hello", "session_id": None})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            chatbot.return_value.chat.call_args.kwargs["session_id"], "default"
+        )
+
+
+class ChatStreamViewTests(SimpleTestCase):
+    def test_wsgi_requests_get_server_sent_events(self):
+        events = [
+            {"event": "meta", "data": {"persona": "citizen"}},
+            {"event": "token", "data": {"text": "नमस्ते"}},
+        ]
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.chat_stream.return_value = iter(events)
+            response = self.client.post(
+                "/api/chat/stream/",
+                json.dumps({"message": "hello"}),
+                content_type="application/json",
+            )
+            body = b"".join(response.streaming_content).decode()
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            body,
+            'event: meta\ndata: {"persona": "citizen"}\n\n'
+            'event: token\ndata: {"text": "नमस्ते"}\n\n',
+        )
+
+    async def test_asgi_requests_get_an_async_stream(self):
+        async def achat_stream(message, **kwargs):
+            yield {"event": "token", "data": {"text": message}}
+
+        async def aget_chatbot_instance():
+            return mock.Mock(achat_stream=achat_stream)
+
+        with mock.patch(
+            "welfare_app.views.aget_chatbot_instance", aget_chatbot_instance
+        ):
+            response = await self.async_client.post(
+                "/api/chat/stream/",
+                json.dumps({"message": "hello"}),
+                content_type="application/json",
+            )
+            self.assertTrue(response.is_async)
+            body = b"".join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(body, b'event: token\ndata: {"text": "hello"}\n\n')
@@ -0,0 +1,57 @@
+import json
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.context_packer import (
+    estimate_tokens,
+    get_token_budget,
+    pack_records,
+    pack_sections,
+)
+
+
+class EstimateTokensTests(SimpleTestCase):
+    def test_devanagari_costs_more_per_character(self):
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("पेंशन"), 4)
+
+
+class PackRecordsTests(SimpleTestCase):
+    def test_records_are_kept_whole_within_the_budget(self):
+        records = [{"id": i, "text": "x" * 40} for i in range(10)]
+        packed = pack_records(records, budget=50)
+        self.assertLessEqual(packed.tokens, 50)
+        self.assertEqual(json.loads(packed.text), records[: packed.records])
+        self.assertEqual(packed.records + packed.dropped, 10)
+
+    def test_smaller_records_fill_the_space_a_large_one_leaves(self):
+        records = [{"id": 1}, {"id": 2, "text": "x" * 400}, {"id": 3}]
+        packed = pack_records(records, budget=20)
+        self.assertEqual(json.loads(packed.text), [{"id": 1}, {"id": 3}])
+        self.assertEqual(packed.dropped, 1)
+
+
+class PackSectionsTests(SimpleTestCase):
+    def test_every_section_gets_its_first_records(self):
+        sections = {
+            "stats": {"total": 3},
+            "schemes": [{"id": f"S{i}", "text": "x" * 40} for i in range(5)],
+            "wards": [{"id": f"W{i}", "text": "x" * 40} for i in range(5)],
+        }
+        packed = pack_sections(sections, budget=60)
+        data = json.loads(packed.text)
+        self.assertEqual(data["stats"], {"total": 3})
+        self.assertEqual(data["schemes"][0]["id"], "S0")
+        self.assertEqual(data["wards"][0]["id"], "W0")
+        self.assertLessEqual(packed.tokens, 60)
+
+
+class TokenBudgetTests(SimpleTestCase):
+    def test_budgets_per_persona_and_model(self):
+        self.assertEqual(get_token_budget("leader", "any"), 1200)
+        with override_settings(
+            CONTEXT_TOKEN_BUDGETS={"citizen": 500, "big-model": {"leader": 3000}}
+        ):
+            self.assertEqual(get_token_budget("citizen", "any"), 500)
+            self.assertEqual(get_token_budget("leader", "big-model"), 3000)
+            self.assertEqual(get_token_budget("leader", "any"), 1200)
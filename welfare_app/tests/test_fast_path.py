@@ -0,0 +1,115 @@
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.fast_path import FastPathResolver, build_fast_path
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+
+from .fakes import ANALYTICS_KB, FakeLLM, make_chatbot
+
+
+class FastPathTests(SimpleTestCase):
+    def setUp(self):
+        self.retriever = KnowledgeRetriever(ANALYTICS_KB)
+        self.resolver = FastPathResolver()
+
+    def resolve(self, query, language="English", retriever=None):
+        context = {"language": language}
+        response = self.resolver.resolve(query, context, retriever or self.retriever)
+        return response, context.get("fast_path")
+
+    def test_counts_in_each_language(self):
+        self.assertEqual(
+            self.resolve("How many schemes are there?"),
+            ("There are 2 welfare schemes.", "count"),
+        )
+        self.assertEqual(
+            self.resolve("कुल योजनाएं कितनी हैं", "Hindi"),
+            ("कुल 2 कल्याण योजनाएं हैं।", "count"),
+        )
+        self.assertEqual(
+            self.resolve("एकूण प्रभाग किती", "Marathi"),
+            ("एकूण 2 प्रभाग आहेत.", "count"),
+        )
+
+    def test_scheme_eligibility_and_documents_by_name(self):
+        self.assertEqual(
+            self.resolve("eligibility for old age pension"),
+            ("Eligibility for Old Age Pension: Age above 60", "eligibility"),
+        )
+        self.assertEqual(
+            self.resolve("documents required for Old Age Pension")[0],
+            "Documents required for Old Age Pension: Aadhaar card, Age proof",
+        )
+
+    def test_ward_coverage_from_analytics(self):
+        self.assertEqual(
+            self.resolve("coverage in Naupada"),
+            (
+                "Naupada coverage: 100 of 200 eligible residents enrolled (50.0%).",
+                "coverage",
+            ),
+        )
+
+    def test_open_or_ambiguous_questions_go_to_the_llm(self):
+        for query in (
+            "how many schemes and wards",
+            "eligibility for old age pension in naupada",
+            "what documents and eligibility for old age pension",
+            "eligibility for the xyz abc scheme",
+            "why was my application rejected",
+            "",
+        ):
+            self.assertEqual(self.resolve(query), (None, None), query)
+
+    def test_long_questions_are_not_checked(self):
+        resolver = FastPathResolver(max_words=3)
+        context = {"language": "English"}
+        query = "eligibility for old age pension"
+        self.assertIsNone(resolver.resolve(query, context, self.retriever))
+
+    def test_names_follow_the_current_kb_version(self):
+        kb = {
+            **ANALYTICS_KB,
+            "schemes": [
+                {
+                    "scheme_id": "S9",
+                    "scheme_name": "Free Bus Pass",
+                    "eligibility": "60+",
+                }
+            ],
+        }
+        self.resolve("eligibility for old age pension")
+        newer = KnowledgeRetriever(kb, version=2)
+        self.assertEqual(
+            self.resolve("eligibility for free bus pass", retriever=newer)[0],
+            "Eligibility for Free Bus Pass: 60+",
+        )
+        self.assertEqual(
+            self.resolve("eligibility for old age pension", retriever=newer),
+            (None, None),
+        )
+
+    def test_stats(self):
+        self.resolve("how many wards")
+        self.resolve("why was my application rejected")
+        self.assertEqual(
+            self.resolver.get_stats(),
+            {"checked": 2, "answered": 1, "share": 0.5, "by_kind": {"count": 1}},
+        )
+
+    @override_settings(FAST_PATH_ENABLED=False)
+    def test_fast_path_can_be_disabled(self):
+        self.assertIsNone(build_fast_path())
+
+
+class ChatbotFastPathTests(SimpleTestCase):
+    def test_factual_questions_skip_the_llm(self):
+        llm = FakeLLM()
+        chatbot = make_chatbot(self, kb=ANALYTICS_KB, llm=llm)
+        result = chatbot.chat("how many wards are there", session_id="s1")
+        self.assertEqual(result["response"], "There are 2 wards.")
+        self.assertEqual(result["fast_path"], "count")
+        self.assertEqual(llm.calls, 0)
+
+        result = chatbot.chat("tell me something about pensions", session_id="s1")
+        self.assertIsNone(result["fast_path"])
+        self.assertEqual(llm.calls, 1)
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.session_store import Turn, select_turns
+
+from .fakes import make_chatbot
+
+
+def turns(count: int):
+    return [
+        Turn(f"q{i}", f"a{i}", "English", "citizen", "general_query", 100.0 + i, i)
+        for i in range(1, count + 1)
+    ]
+
+
+class SelectTurnsTests(SimpleTestCase):
+    def ids(self, page):
+        found, more = page
+        return [turn.id for turn in found], more
+
+    def test_pages_back_from_the_newest_turn(self):
+        self.assertEqual(self.ids(select_turns(turns(5), 2)), ([4, 5], True))
+        self.assertEqual(self.ids(select_turns(turns(5), 2, before=4)), ([2, 3], True))
+        self.assertEqual(self.ids(select_turns(turns(5), 2, before=2)), ([1], False))
+
+    def test_polls_forward_from_after_or_since(self):
+        self.assertEqual(self.ids(select_turns(turns(5), 2, after=1)), ([2, 3], True))
+        self.assertEqual(self.ids(select_turns(turns(5), 9, after=3)), ([4, 5], False))
+        self.assertEqual(
+            self.ids(select_turns(turns(5), 2, since=102.0)), ([3, 4], True)
+        )
+
+    def test_since_with_before_pages_back(self):
+        self.assertEqual(
+            self.ids(select_turns(turns(5), 9, before=5, since=102.0)), ([3, 4], False)
+        )
+
+
+class HistoryEndpointTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = make_chatbot(self)
+        for i in range(1, 4):
+            self.chatbot.session_store.append(
+                "s1", f"q{i}", f"a{i}", {"language": "Hindi", "persona": "employee"}
+            )
+        patcher = mock.patch(
+            "welfare_app.views.get_chatbot_instance", return_value=self.chatbot
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, **params):
+        return self.client.get("/api/history/", {"session_id": "s1", **params})
+
+    def test_pages_link_by_cursor(self):
+        body = self.get(limit=2).json()
+        self.assertEqual([t["user"] for t in body["history"]], ["q2", "q3"])
+        self.assertTrue(body["has_more"])
+
+        body = self.get(limit=2, before=body["cursors"]["before"]).json()
+        self.assertEqual([t["user"] for t in body["history"]], ["q1"])
+        self.assertFalse(body["has_more"])
+
+        body = self.get(after=body["cursors"]["after"]).json()
+        self.assertEqual([t["user"] for t in body["history"]], ["q2", "q3"])
+
+    def test_metadata_only_when_asked_for(self):
+        entry = self.get().json()["history"][0]
+        self.assertEqual(set(entry), {"id", "user", "assistant", "timestamp"})
+
+        entry = self.get(fields="user,metadata").json()["history"][0]
+        self.assertEqual(set(entry), {"user", "metadata"})
+        self.assertEqual(entry["metadata"]["persona"], "employee")
+
+    @override_settings(HISTORY_MAX_PAGE_SIZE=1)
+    def test_page_size_is_capped(self):
+        self.assertEqual(len(self.get(limit=50).json()["history"]), 1)
+
+    def test_bad_parameters_are_rejected(self):
+        for params in ({"limit": "x"}, {"limit": 0}, {"fields": "user,password"}):
+            self.assertEqual(self.get(**params).status_code, 400, params)
@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app import views
+from welfare_app.services.chatbot import KnowledgeSnapshot, SahayakChatbot
+from welfare_app.services.http_cache import EncodedResponseCache
+
+from .fakes import make_chatbot
+
+
+class EncodedResponseCacheTests(SimpleTestCase):
+    def test_bodies_are_built_once_per_kb_version(self):
+        cache = EncodedResponseCache()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {"n": len(builds)}
+
+        first = cache.get("stats", 1, build)
+        self.assertIs(cache.get("stats", 1, build), first)
+        newer = cache.get("stats", 2, build)
+        self.assertNotEqual(newer.etag, first.etag)
+        self.assertEqual(len(builds), 2)
+        self.assertEqual(cache.get_stats()["kb_version"], 2)
+
+    def test_keys_past_the_cap_are_not_stored(self):
+        cache = EncodedResponseCache(max_entries=1)
+        cache.get("a", 1, dict)
+        cache.get("b", 1, dict)
+        self.assertEqual(cache.get_stats()["entries"], 1)
+
+
+class GreetingCacheTests(SimpleTestCase):
+    def setUp(self):
+        chatbot = SahayakChatbot.__new__(SahayakChatbot)
+        chatbot._snapshot = KnowledgeSnapshot(None, None, None, 7, 1_700_000_000)
+        patches = [
+            mock.patch.object(views, "get_chatbot_instance", return_value=chatbot),
+            mock.patch.object(views, "_encoded_responses", EncodedResponseCache(4)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_spellings_of_a_language_share_one_entry(self):
+        etags = set()
+        for value in ("hi", "Hindi", "HINDI", "2"):
+            response = self.client.get("/api/greeting/", {"language": value})
+            self.assertEqual(response.json()["language"], "Hindi")
+            etags.add(response["ETag"])
+        self.assertEqual(len(etags), 1)
+        self.assertEqual(views._encoded_responses.get_stats()["entries"], 1)
+
+    def test_unknown_values_do_not_fill_the_cache(self):
+        for i in range(10):
+            self.client.get("/api/greeting/", {"language": f"junk{i}"})
+        self.assertEqual(views._encoded_responses.get_stats()["entries"], 1)
+        self.client.get("/api/greeting/", {"language": "mr"})
+        self.assertEqual(views._encoded_responses.get_stats()["entries"], 2)
+
+    def test_if_none_match_gets_304(self):
+        response = self.client.get("/api/greeting/", {"language": "en"})
+        again = self.client.get(
+            "/api/greeting/", {"language": "en"}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(again.status_code, 304)
+
+
+class CachedEndpointTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = make_chatbot(self)
+        patches = [
+            mock.patch.object(views, "get_chatbot_instance", return_value=self.chatbot),
+            mock.patch.object(views, "_encoded_responses", EncodedResponseCache()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_stats_validators_follow_the_kb_version(self):
+        response = self.client.get("/api/stats/")
+        self.assertEqual(response.json()["stats"]["total_schemes"], 2)
+        self.assertIn("max-age=", response["Cache-Control"])
+        again = self.client.get(
+            "/api/stats/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(again.status_code, 304)
+
+        self.chatbot.reload_knowledge_base()
+        newer = self.client.get("/api/stats/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(newer.status_code, 200)
+        self.assertNotEqual(newer["ETag"], response["ETag"])
+
+    def test_runtime_stats_are_never_cached(self):
+        response = self.client.get("/api/stats/", {"runtime": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("no-cache", response["Cache-Control"])
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_languages_are_static(self):
+        response = self.client.get("/api/languages/")
+        self.assertEqual(len(response.json()["languages"]), 3)
+        again = self.client.get("/api/languages/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+class HealthTests(SimpleTestCase):
+    def test_liveness_does_not_touch_the_chatbot(self):
+        with mock.patch.object(views, "get_chatbot_instance") as chatbot:
+            response = self.client.get("/api/health/")
+        self.assertEqual(response.json()["status"], "healthy")
+        chatbot.assert_not_called()
+
+    def test_readiness_reports_the_kb_and_llm(self):
+        chatbot = make_chatbot(self)
+        chatbot.llm.breaker = breaker = mock.Mock(state="closed")
+        with mock.patch.object(views, "get_chatbot_instance", return_value=chatbot):
+            body = self.client.get("/api/ready/").json()
+            self.assertEqual(body["status"], "ready")
+            self.assertEqual(body["schemes_count"], 2)
+
+            breaker.state = "open"
+            response = self.client.get("/api/ready/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["status"], "degraded")
+            with override_settings(READY_REQUIRES_LLM=True):
+                self.assertEqual(self.client.get("/api/ready/").status_code, 503)
+
+    def test_not_ready_until_the_kb_loads(self):
+        with mock.patch.object(
+            views, "get_chatbot_instance", side_effect=FileNotFoundError("kb.json")
+        ):
+            response = self.client.get("/api/ready/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["status"], "unavailable")
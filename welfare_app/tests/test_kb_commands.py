@@ -0,0 +1,127 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from welfare_app.services.kb_loader import (
+    file_signature,
+    load_knowledge_base,
+    load_snapshot,
+    validate_knowledge_base,
+    write_snapshot,
+)
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+
+DATASET = {
+    "schemes": [{"scheme_id": "S1", "scheme_name": "Old Age Pension"}],
+    "wards": [{"ward_id": "W1", "ward_name": "Ward 1"}],
+}
+
+
+class ReloadKbTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "kb.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(DATASET, f)
+
+    def reload(self, *args):
+        before = file_signature(self.path)
+        call_command(
+            "reload_kb",
+            "--path",
+            self.path,
+            *args,
+            stdout=io.StringIO(),
+            stderr=io.StringIO()
+        )
+        self.assertGreater(file_signature(self.path)[0], before[0])
+
+    def test_compile_writes_a_snapshot_matching_the_touched_file(self):
+        self.reload("--compile")
+        self.assertIsNotNone(load_snapshot(self.path))
+
+    def test_plain_reload_leaves_a_compiled_snapshot_stale(self):
+        call_command("compile_kb", "--path", self.path, stdout=io.StringIO())
+        self.assertIsNotNone(load_snapshot(self.path))
+        self.reload()
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_plain_reload_rejects_an_invalid_file(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"schemes": [{"scheme_name": "No id"}]}, f)
+        before = file_signature(self.path)
+        with self.assertRaisesMessage(CommandError, "Invalid knowledge base"):
+            call_command("reload_kb", "--path", self.path, stdout=io.StringIO())
+        self.assertEqual(file_signature(self.path), before)
+
+
+class CompileKbTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "kb.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(DATASET, f)
+
+    def test_edit_during_compile_leaves_the_snapshot_stale(self):
+        def load_then_edit(path):
+            knowledge_base = load_knowledge_base(path)
+            edited = dict(DATASET, schemes=DATASET["schemes"] * 2)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(edited, f)
+            return knowledge_base
+
+        with mock.patch(
+            "welfare_app.management.commands.compile_kb.load_knowledge_base",
+            load_then_edit,
+        ):
+            with self.assertRaises(CommandError):
+                call_command("compile_kb", "--path", self.path, stdout=io.StringIO())
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_snapshot_round_trip_keeps_records_shared_with_indexes(self):
+        call_command("compile_kb", "--path", self.path, stdout=io.StringIO())
+        knowledge_base, indexes = load_snapshot(self.path)
+        self.assertEqual(knowledge_base, DATASET)
+        self.assertIs(
+            indexes["schemes"]["scheme_id"]["S1"][0], knowledge_base["schemes"][0]
+        )
+        retriever = KnowledgeRetriever(knowledge_base, indexes=indexes)
+        self.assertEqual(
+            [s["scheme_id"] for s in retriever.search_schemes("pension")], ["S1"]
+        )
+
+    def test_snapshot_of_another_format_is_ignored(self):
+        with mock.patch("welfare_app.services.kb_loader.SNAPSHOT_FORMAT", 0):
+            write_snapshot(self.path, DATASET, {}, file_signature(self.path))
+        self.assertIsNone(load_snapshot(self.path))
+
+    def test_invalid_dataset_is_not_compiled(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"schemes": "none"}, f)
+        with self.assertRaisesMessage(CommandError, "Invalid knowledge base"):
+            call_command("compile_kb", "--path", self.path, stdout=io.StringIO())
+        self.assertIsNone(load_snapshot(self.path))
+
+
+class ValidateKnowledgeBaseTests(SimpleTestCase):
+    def test_reports_structural_problems(self):
+        self.assertEqual(validate_knowledge_base(DATASET), [])
+        self.assertEqual(
+            validate_knowledge_base(
+                {"schemes": [{"scheme_name": "x"}, "y"], "meta": []}
+            ),
+            [
+                "'meta' must be an object",
+                "schemes[0] is missing 'scheme_id'",
+                "schemes[1] must be an object",
+                "Missing collection 'wards'",
+            ],
+        )
@@ -0,0 +1,78 @@
+import json
+import os
+import time
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.kb_loader import KnowledgeBaseWatcher, file_signature
+from welfare_app.tests.fakes import KB, make_chatbot, write_kb
+
+NEW_SCHEME = {"scheme_id": "S9", "scheme_name": "Housing Grant"}
+
+
+def rewrite(path, kb):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(kb, f)
+    # Make sure the change shows even within the filesystem's mtime resolution
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+class KnowledgeBaseReloadTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = make_chatbot(self)
+        self.path = self.chatbot.dataset_path
+
+    def test_reload_swaps_in_a_new_version_atomically(self):
+        before = self.chatbot.snapshot
+        rewrite(self.path, dict(KB, schemes=KB["schemes"] + [NEW_SCHEME]))
+        version = self.chatbot.reload_knowledge_base()
+
+        self.assertGreater(version, before.version)
+        self.assertEqual(self.chatbot.kb_version, version)
+        self.assertEqual(len(self.chatbot.retriever.get_schemes()), 3)
+        # A request holding the old snapshot keeps a consistent old view
+        self.assertEqual(len(before.retriever.get_schemes()), 2)
+        self.assertIsNot(before.registry, self.chatbot.registry)
+
+    def test_broken_file_keeps_the_current_version(self):
+        version = self.chatbot.kb_version
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        with self.assertLogs("welfare_app.services.chatbot", "ERROR"):
+            self.chatbot._reload_in_background()
+        self.assertEqual(self.chatbot.kb_version, version)
+        self.assertEqual(len(self.chatbot.retriever.get_schemes()), 2)
+        # Not retried until the file changes again
+        self.assertEqual(
+            self.chatbot.kb_watcher.loaded_signature, file_signature(self.path)
+        )
+
+    def test_changed_file_is_reloaded_in_the_background(self):
+        version = self.chatbot.kb_version
+        self.chatbot.kb_watcher.check_interval = 0.001
+        rewrite(self.path, dict(KB, schemes=[NEW_SCHEME]))
+        deadline = time.monotonic() + 5
+        while self.chatbot.kb_version == version and time.monotonic() < deadline:
+            time.sleep(0.005)
+            self.chatbot.check_for_kb_update()
+        self.assertEqual(self.chatbot.retriever.get_schemes(), [NEW_SCHEME])
+
+
+class KnowledgeBaseWatcherTests(SimpleTestCase):
+    def test_detects_changes_once_per_interval(self):
+        path = write_kb(self)
+        watcher = KnowledgeBaseWatcher(path, check_interval=0.01)
+        rewrite(path, {"schemes": []})
+        self.assertFalse(watcher.changed())  # interval not yet elapsed
+        time.sleep(0.02)
+        self.assertTrue(watcher.changed())
+        watcher.mark_loaded(file_signature(path))
+        time.sleep(0.02)
+        self.assertFalse(watcher.changed())
+
+    def test_interval_of_zero_disables_watching(self):
+        path = write_kb(self)
+        watcher = KnowledgeBaseWatcher(path, check_interval=0)
+        rewrite(path, {"schemes": []})
+        self.assertFalse(watcher.changed())
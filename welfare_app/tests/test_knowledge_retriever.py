@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+
+KB = {
+    "schemes": [
+        {"scheme_id": "S1", "scheme_name": "Old Age Pension", "category": "Pension"},
+        {"scheme_id": "S2", "scheme_name": "Widow Pension", "category": "pension"},
+        {"scheme_id": "S3", "scheme_name": "Scholarship", "category": "Education"},
+        {"scheme_name": "No id"},
+    ],
+    "scheme_performance": [{"scheme_id": "S1", "utilization": 80}],
+    "grievances_summary": [{"scheme_id": "S2", "total": 4}],
+    "wards": [{"ward_id": "W1", "ward_name": "Naupada"}],
+    "beneficiary_coverage": [{"ward_id": "W1", "coverage": 0.5}],
+    "vulnerability_scores": [{"ward_id": "W1", "score": 7}],
+}
+
+
+class KnowledgeRetrieverIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.retriever = KnowledgeRetriever(KB)
+
+    def test_lookups_by_id_are_case_insensitive(self):
+        self.assertEqual(self.retriever.get_schemes(scheme_id="s1"), [KB["schemes"][0]])
+        self.assertEqual(self.retriever.get_performance("s1")[0]["utilization"], 80)
+        self.assertEqual(self.retriever.get_grievances("S2")[0]["total"], 4)
+        self.assertEqual(self.retriever.get_wards("w1")[0]["ward_name"], "Naupada")
+        self.assertEqual(self.retriever.get_coverage("W1")[0]["coverage"], 0.5)
+        self.assertEqual(self.retriever.get_vulnerability("W1")[0]["score"], 7)
+
+    def test_categories_are_grouped_case_insensitively(self):
+        pensions = self.retriever.get_schemes(category="PENSION")
+        self.assertEqual([s["scheme_id"] for s in pensions], ["S1", "S2"])
+
+    def test_unknown_keys_and_no_filter(self):
+        self.assertEqual(self.retriever.get_schemes(scheme_id="S9"), [])
+        self.assertEqual(self.retriever.get_wards("W9"), [])
+        self.assertEqual(self.retriever.get_schemes(), KB["schemes"])
+        self.assertEqual(self.retriever.get_performance(), KB["scheme_performance"])
+
+    def test_prebuilt_indexes_are_used_as_given(self):
+        indexes = self.retriever.indexes
+        retriever = KnowledgeRetriever(KB, version=2, indexes=indexes)
+        self.assertIs(retriever.indexes, indexes)
+        self.assertEqual(
+            retriever.get_schemes(scheme_id="S3")[0]["category"], "Education"
+        )
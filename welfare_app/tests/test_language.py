@@ -0,0 +1,26 @@
+from django.test import SimpleTestCase
+
+from welfare_app.services.ai_controller import AIController
+from welfare_app.services.chatbot import SahayakChatbot
+
+
+class LanguageNormalizationTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = SahayakChatbot.__new__(SahayakChatbot)
+        self.chatbot.controller = AIController()
+        self.chatbot.metrics = None
+
+    def test_override_is_mapped_to_a_supported_language(self):
+        for value, expected in [
+            ("hi", "Hindi"),
+            ("MARATHI", "Marathi"),
+            ("3", "Marathi"),
+            ("klingon", "English"),
+        ]:
+            context = self.chatbot._analyze("scheme list", value)
+            self.assertEqual(context["language"], expected)
+
+    def test_missing_or_invalid_override_falls_back_to_detection(self):
+        for value in (None, "", 42, ["hi"]):
+            context = self.chatbot._analyze("योजना के बारे में बताइए", value)
+            self.assertEqual(context["language"], "Hindi")
@@ -0,0 +1,159 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.llm_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    LLMClient,
+)
+
+
+def half_open_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    breaker.opened_at = time.monotonic() - 60
+    return breaker
+
+
+class CircuitBreakerStateTests(SimpleTestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30.0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+    def test_open_breaker_short_circuits(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+        breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        self.assertEqual(breaker.short_circuited, 1)
+
+    def test_half_open_trial_success_closes(self):
+        breaker = half_open_breaker()
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.before_call())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertFalse(breaker.before_call())
+
+    def test_half_open_trial_failure_reopens(self):
+        breaker = half_open_breaker()
+        self.assertTrue(breaker.before_call())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+
+
+class RetryTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3)
+        self.client = LLMClient(
+            "test-key", breaker=self.breaker, max_retries=2, retry_base_delay=0
+        )
+
+    def failing(self, errors, result="ok"):
+        errors = list(errors)
+
+        def attempt(timeout):
+            if errors:
+                raise errors.pop(0)
+            return result
+
+        return attempt
+
+    def test_transient_errors_are_retried(self):
+        attempt = self.failing([TimeoutError(), TimeoutError()])
+        self.assertEqual(self.client._call("citizen", attempt), "ok")
+        self.assertEqual(self.client.retries, 2)
+        self.assertEqual(self.breaker.state, "closed")
+        self.assertEqual(self.breaker.failures, 0)
+
+    def test_exhausted_retries_raise_and_open_the_breaker(self):
+        attempt = self.failing([TimeoutError()] * 3)
+        with self.assertRaises(TimeoutError):
+            self.client._call("citizen", attempt)
+        self.assertEqual(self.client.failures, 1)
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpenError):
+            self.client._call("citizen", self.failing([]))
+
+    def test_non_retryable_errors_are_raised_without_counting(self):
+        attempt = self.failing([ValueError("bad request")])
+        with self.assertRaises(ValueError):
+            self.client._call("citizen", attempt)
+        self.assertEqual(self.client.retries, 0)
+        self.assertEqual(self.breaker.failures, 0)
+
+
+class CircuitBreakerTrialTests(SimpleTestCase):
+    def test_cancelled_async_trial_releases_the_breaker(self):
+        breaker = half_open_breaker()
+        client = LLMClient("test-key", breaker=breaker)
+
+        async def hang(**kwargs):
+            await asyncio.sleep(60)
+
+        async def run():
+            with mock.patch.object(
+                client.async_client.chat.completions, "create", hang
+            ):
+                task = asyncio.ensure_future(client.acomplete("citizen", messages=[]))
+                await asyncio.sleep(0.01)
+                self.assertTrue(breaker.trial_in_flight)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(run())
+        self.assertFalse(breaker.trial_in_flight)
+        self.assertEqual(breaker.state, "half-open")
+        self.assertTrue(breaker.before_call())
+
+    def test_interrupted_sync_trial_releases_the_breaker(self):
+        breaker = half_open_breaker()
+        client = LLMClient("test-key", breaker=breaker)
+
+        def interrupted(timeout):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            client._call("citizen", interrupted)
+        self.assertFalse(breaker.trial_in_flight)
+        self.assertTrue(breaker.before_call())
+
+    def test_only_one_trial_while_half_open(self):
+        breaker = half_open_breaker()
+        self.assertTrue(breaker.before_call())
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+
+class HedgedCallTests(SimpleTestCase):
+    def test_hedged_timeouts_open_the_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = LLMClient(
+            "test-key",
+            breaker=breaker,
+            deadlines={"citizen": 0.3},
+            hedge_after=0.2,
+        )
+
+        def hang(**kwargs):
+            time.sleep(1)
+
+        with mock.patch.object(client.client.chat.completions, "create", hang):
+            started = time.monotonic()
+            with self.assertRaises(DeadlineExceededError):
+                client.complete("citizen", messages=[])
+            elapsed = time.monotonic() - started
+        self.assertEqual(breaker.state, "open")
+        # The hedge waits only for what is left of the deadline
+        self.assertLess(elapsed, 0.45)
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.metrics import (
+    ChatMetrics,
+    record_stage,
+    record_usage,
+    render_stats,
+    timed,
+)
+
+from .fakes import ANALYTICS_KB, make_chatbot
+
+CONTEXT = {
+    "persona": "citizen",
+    "intent": "scheme_info",
+    "language": "English",
+    "model": "m",
+    "source": "llm",
+}
+LABELS = 'persona="citizen",intent="scheme_info",language="English",model="m"'
+
+
+class StageRecordingTests(SimpleTestCase):
+    def test_stage_times_add_up(self):
+        context = {}
+        record_stage(context, "llm", 0.25)
+        record_stage(context, "llm", 0.5)
+        with timed(context, "retrieval"):
+            pass
+        self.assertEqual(context["stages"]["llm"], 0.75)
+        self.assertGreaterEqual(context["stages"]["retrieval"], 0.0)
+
+    def test_usage_is_copied_from_the_sdk_object(self):
+        context = {}
+        record_usage(context, None)
+        self.assertNotIn("usage", context)
+        record_usage(
+            context, SimpleNamespace(prompt_tokens=120, completion_tokens=None)
+        )
+        self.assertEqual(
+            context["usage"], {"prompt_tokens": 120, "completion_tokens": 0}
+        )
+
+
+class ChatMetricsTests(SimpleTestCase):
+    def test_unknown_languages_share_one_series(self):
+        metrics = ChatMetrics()
+        for language in ("Hindi", "klingon", "x" * 50, None):
+            metrics.observe(
+                {
+                    "persona": "citizen",
+                    "intent": "general",
+                    "language": language,
+                    "model": "m",
+                    "source": "llm",
+                    "stages": {"total": 0.1},
+                }
+            )
+        output = metrics.render()
+        self.assertIn('language="Hindi"', output)
+        self.assertIn('language="other"', output)
+        self.assertNotIn("klingon", output)
+        self.assertNotIn('language="none"', output)
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = ChatMetrics(buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.5, 2.0):
+            metrics.observe({**CONTEXT, "stages": {"llm": seconds}})
+        lines = metrics.render().splitlines()
+        name = "sahayak_stage_duration_seconds"
+        for bound, count in (("0.1", 1), ("1.0", 2), ("+Inf", 3)):
+            self.assertIn(
+                f'{name}_bucket{{stage="llm",{LABELS},le="{bound}"}} {count}', lines
+            )
+        self.assertIn(f'{name}_sum{{stage="llm",{LABELS}}} 2.55', lines)
+        self.assertIn(f'{name}_count{{stage="llm",{LABELS}}} 3', lines)
+
+    def test_requests_and_tokens_are_counted(self):
+        metrics = ChatMetrics()
+        usage = {"prompt_tokens": 100, "completion_tokens": 20}
+        metrics.observe({**CONTEXT, "usage": usage, "context_tokens": 60})
+        metrics.observe({**CONTEXT, "usage": usage})
+        lines = metrics.render().splitlines()
+        self.assertIn(f'sahayak_chat_requests_total{{{LABELS},source="llm"}} 2', lines)
+        self.assertIn(
+            'sahayak_llm_tokens_total{persona="citizen",model="m",type="prompt"} 200',
+            lines,
+        )
+        self.assertIn(
+            'sahayak_context_tokens_total{persona="citizen",model="m"} 60', lines
+        )
+
+    def test_component_stats_are_exported(self):
+        lines = render_stats(
+            {"llm": {"calls": 3, "breaker_open": True}, "fast_path": None}
+        )
+        self.assertIn("sahayak_llm_calls_total 3", lines)
+        self.assertIn("sahayak_llm_breaker_open 1", lines)
+        self.assertFalse(any(line.startswith("sahayak_fast_path") for line in lines))
+
+
+class MetricsEndpointTests(SimpleTestCase):
+    def test_chat_requests_show_up_in_the_endpoint(self):
+        chatbot = make_chatbot(self, kb=ANALYTICS_KB)
+        chatbot.chat("how many wards are there")
+        with mock.patch("welfare_app.views.get_chatbot_instance", return_value=chatbot):
+            response = self.client.get("/api/metrics/")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn('source="fast_path"} 1', body)
+        self.assertIn("sahayak_fast_path_answered_total 1", body)
+
+    def test_disabled_metrics_return_404(self):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.render_metrics.return_value = None
+            self.assertEqual(self.client.get("/api/metrics/").status_code, 404)
@@ -0,0 +1,51 @@
+import contextlib
+import io
+import json
+
+from django.test import SimpleTestCase
+
+from benchmarks import micro_bench
+
+BASELINE = {
+    "thresholds": {"default": 1.5, "analyze": 3.0},
+    "results": {
+        "get_stats": {"100": 10.0, "1000": 0.5},
+        "analyze": {"100": 10.0},
+    },
+}
+
+
+class RegressionCheckTests(SimpleTestCase):
+    def test_slower_than_threshold_fails(self):
+        failures = micro_bench.check({"get_stats": {"100": 16.0}}, BASELINE)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("get_stats @ 100 records", failures[0])
+        self.assertEqual(micro_bench.check({"get_stats": {"100": 14.0}}, BASELINE), [])
+
+    def test_per_stage_threshold(self):
+        self.assertEqual(micro_bench.check({"analyze": {"100": 25.0}}, BASELINE), [])
+        self.assertEqual(
+            len(micro_bench.check({"analyze": {"100": 25.0}}, BASELINE, threshold=2)),
+            1,
+        )
+
+    def test_timer_noise_and_new_stages_are_ignored(self):
+        # 3x slower, but by less than MIN_DELTA_US
+        self.assertEqual(micro_bench.check({"get_stats": {"1000": 1.5}}, BASELINE), [])
+        self.assertEqual(micro_bench.check({"new_stage": {"100": 99.0}}, BASELINE), [])
+
+
+class StageTests(SimpleTestCase):
+    def test_every_stage_runs_on_a_small_kb(self):
+        with open(micro_bench.BENCH_DIR / "corpus.jsonl", encoding="utf-8") as f:
+            queries = [json.loads(line) for line in f if line.strip()][:6]
+        with contextlib.redirect_stderr(io.StringIO()):
+            results = micro_bench.run([100], list(micro_bench.STAGES), queries, 1)
+        self.assertEqual(set(results), set(micro_bench.STAGES))
+        for stage, timings in results.items():
+            self.assertGreater(timings["100"], 0, stage)
+
+    def test_baseline_covers_every_stage(self):
+        with open(micro_bench.BENCH_DIR / "micro_baseline.json") as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline["results"]), set(micro_bench.STAGES))
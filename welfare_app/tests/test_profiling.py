@@ -0,0 +1,131 @@
+import json
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.profiling import (
+    PROFILE_HEADER,
+    RequestProfiler,
+    build_profiler,
+    make_token,
+)
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class RequestProfilerTests(SimpleTestCase):
+    def test_disabled_by_default(self):
+        self.assertIsNone(build_profiler())
+        with override_settings(PROFILING_ENABLED=True):
+            self.assertIsNotNone(build_profiler())
+
+    def test_save_error_does_not_fail_the_request(self):
+        with tempfile.NamedTemporaryFile() as blocker:
+            # The directory can't be created: its parent is a file
+            profiler = RequestProfiler(Path(blocker.name) / "profiles", mode="sample")
+            with self.assertLogs("welfare_app.services.profiling", "ERROR"):
+                with profiler.profile({"path": "/api/chat/"}):
+                    result = "response"
+        self.assertEqual(result, "response")
+        self.assertEqual(profiler.saved, 0)
+
+    def make_profiler(self, **kwargs) -> RequestProfiler:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return RequestProfiler(directory.name, **kwargs)
+
+    def test_requests_are_selected_by_signed_header(self):
+        profiler = self.make_profiler()
+        self.assertTrue(profiler.should_profile(make_token()))
+        self.assertFalse(profiler.should_profile(None))
+        self.assertFalse(profiler.should_profile(make_token() + "x"))
+        expired = self.make_profiler(token_max_age=-1)
+        self.assertFalse(expired.should_profile(make_token()))
+        self.assertTrue(self.make_profiler(always=True).should_profile(None))
+
+    def test_only_slow_requests_are_saved(self):
+        profiler = self.make_profiler(slow_threshold=0.02)
+        with profiler.profile({"path": "/fast/"}):
+            pass
+        with profiler.profile({"path": "/slow/"}):
+            busy(0.03)
+        profiles = profiler.list_profiles()
+        self.assertEqual([p["path"] for p in profiles], ["/slow/"])
+        self.assertEqual(profiler.get_stats()["profiled"], 2)
+        path = profiler.profile_path(profiles[0]["profile"])
+        self.assertEqual(path.suffix, ".pstats")
+
+    def test_sampled_stacks_are_folded(self):
+        profiler = self.make_profiler(mode="sample", sample_interval=0.001)
+        with profiler.profile({}):
+            busy(0.05)
+        name = profiler.list_profiles()[0]["profile"]
+        folded = profiler.profile_path(name).read_text(encoding="utf-8")
+        self.assertIn("busy (test_profiling.py:", folded)
+
+    def test_oldest_profiles_are_rotated_out(self):
+        profiler = self.make_profiler(max_files=2)
+        for i in range(3):
+            with profiler.profile({"n": i}):
+                pass
+            time.sleep(0.002)  # distinct millisecond stamps
+        self.assertEqual([p["n"] for p in profiler.list_profiles()], [2, 1])
+        self.assertEqual(len(list(profiler.directory.iterdir())), 4)
+
+    def test_profile_names_cannot_leave_the_directory(self):
+        profiler = self.make_profiler()
+        self.assertIsNone(profiler.profile_path("../settings.pstats"))
+        self.assertIsNone(profiler.profile_path("missing.pstats"))
+
+
+class ProfilingViewTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profiler = RequestProfiler(directory.name)
+        patcher = mock.patch("welfare_app.views.get_chatbot_instance")
+        chatbot = patcher.start()
+        self.addCleanup(patcher.stop)
+        chatbot.return_value.profiler = self.profiler
+        chatbot.return_value.chat.return_value = {
+            "response": "hi",
+            "language": "English",
+            "persona": "citizen",
+            "intent": "general_query",
+            "stages": {"llm": 0.1},
+        }
+
+    def chat(self, **headers):
+        return self.client.post(
+            "/api/chat/",
+            json.dumps({"message": "hello"}),
+            content_type="application/json",
+            headers=headers,
+        )
+
+    def test_header_profiles_the_request(self):
+        self.chat()
+        self.assertEqual(self.profiler.profiled, 0)
+        token = make_token()
+        self.assertEqual(self.chat(**{PROFILE_HEADER: token}).status_code, 200)
+        self.assertEqual(self.profiler.profiled, 1)
+
+        response = self.client.get("/api/profiles/", headers={PROFILE_HEADER: token})
+        entry = response.json()["profiles"][0]
+        self.assertEqual(entry["path"], "/api/chat/")
+        self.assertEqual(entry["status"], 200)
+        self.assertEqual(entry["stages"], {"llm": 0.1})
+
+        response = self.client.get(entry["url"], headers={PROFILE_HEADER: token})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content))
+
+    def test_profile_endpoints_need_the_header(self):
+        self.assertEqual(self.client.get("/api/profiles/").status_code, 403)
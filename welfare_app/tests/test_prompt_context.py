@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase
+
+from welfare_app.services.prompt_context import PromptContextCache
+
+
+class PromptContextCacheTests(SimpleTestCase):
+    def test_entries_are_capped(self):
+        cache = PromptContextCache(max_entries=2)
+        for language in ("a", "b", "c", "d"):
+            cache.get_or_build("citizen", language, 1, lambda: object())
+        self.assertEqual(cache.get_stats()["entries"], 2)
+
+    def test_scheme_records_do_not_crowd_out_handler_context(self):
+        cache = PromptContextCache(max_records=4)
+        for i in range(100):
+            cache.get_or_build_record(f"S{i}", 1, lambda: object())
+        built = []
+        for _ in range(2):
+            cache.get_or_build("employee", "Hindi", 1, lambda: built.append(1) or 1)
+        self.assertEqual(len(built), 1)
+        self.assertEqual(cache.get_stats()["records"], 4)
+
+    def test_records_are_evicted_least_recently_used(self):
+        cache = PromptContextCache(max_records=2)
+        for record_id in ("a", "b", "a", "c"):
+            cache.get_or_build_record(record_id, 1, lambda: record_id)
+        self.assertEqual(list(cache._records), [("a", 1), ("c", 1)])
+
+    def test_context_is_built_once_per_version(self):
+        cache = PromptContextCache()
+        built = []
+
+        def build():
+            built.append(1)
+            return len(built)
+
+        self.assertEqual(cache.get_or_build("citizen", "Hindi", 1, build), 1)
+        self.assertEqual(cache.get_or_build("citizen", "Hindi", 1, build), 1)
+        self.assertEqual(cache.get_or_build("citizen", "English", 1, build), 2)
+        self.assertEqual(cache.get_stats()["hits"], 1)
+
+    def test_newer_version_drops_older_entries(self):
+        cache = PromptContextCache()
+        cache.get_or_build("citizen", "Hindi", 1, lambda: "v1")
+        cache.get_or_build_record("S1", 1, lambda: "r1")
+        self.assertEqual(cache.get_or_build("citizen", "Hindi", 2, lambda: "v2"), "v2")
+        self.assertEqual(cache.get_stats()["entries"], 1)
+        self.assertEqual(cache.get_stats()["records"], 0)
+
+    def test_requests_on_an_older_version_are_not_stored(self):
+        cache = PromptContextCache()
+        cache.get_or_build("citizen", "Hindi", 2, lambda: "v2")
+        self.assertEqual(cache.get_or_build("citizen", "Hindi", 1, lambda: "v1"), "v1")
+        self.assertEqual(cache.get_or_build("citizen", "Hindi", 2, lambda: "x"), "v2")
+        self.assertEqual(cache.get_stats()["entries"], 1)
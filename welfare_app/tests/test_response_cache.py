@@ -0,0 +1,84 @@
+import time
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.ai_controller import AIController
+from welfare_app.services.handlers import CitizenHandler
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+from welfare_app.services.response_cache import (
+    LocalCacheBackend,
+    ResponseCache,
+    normalize_query,
+)
+from welfare_app.tests.fakes import FakeLLM
+
+KB = {"schemes": [{"scheme_id": "S1", "scheme_name": "Old Age Pension"}]}
+
+
+class NormalizeQueryTests(SimpleTestCase):
+    def test_case_spacing_and_trailing_punctuation_are_ignored(self):
+        self.assertEqual(
+            normalize_query("  How do I   apply?? "), normalize_query("how do i apply")
+        )
+        self.assertEqual(normalize_query("पेंशन कैसे मिलेगी।"), "पेंशन कैसे मिलेगी")
+
+
+class LocalCacheBackendTests(SimpleTestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        backend = LocalCacheBackend(max_entries=2)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+        self.assertEqual((backend.get("a"), backend.get("b")), ("1", None))
+        self.assertEqual(len(backend), 2)
+
+    def test_entries_expire_after_the_ttl(self):
+        backend = LocalCacheBackend(ttl=0)
+        backend.set("a", "1")
+        time.sleep(0.001)
+        self.assertIsNone(backend.get("a"))
+        self.assertEqual(len(backend), 0)
+
+
+class HandlerResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.llm = FakeLLM()
+        self.cache = ResponseCache(LocalCacheBackend())
+        self.handler = CitizenHandler(
+            KnowledgeRetriever(KB), self.llm, response_cache=self.cache
+        )
+
+    def context(self, query):
+        return AIController().analyze(query, language_override="English")
+
+    def test_repeated_question_is_answered_from_the_cache(self):
+        first = self.handler.handle(self.context("How do I apply for pension?"))
+        context = self.context("how do i apply for pension")
+        second = self.handler.handle(context)
+        self.assertEqual(first, second)
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual(context["source"], "cache")
+        self.assertEqual(self.cache.get_stats()["hit_rate"], 0.5)
+
+    def test_use_cache_false_bypasses_the_cache(self):
+        self.handler.handle(self.context("How do I apply for pension?"))
+        self.handler.handle(
+            self.context("How do I apply for pension?"), use_cache=False
+        )
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_fallback_answers_are_not_cached(self):
+        self.llm.error = RuntimeError("down")
+        with self.assertLogs("welfare_app.services.handlers", "WARNING"):
+            self.handler.handle(self.context("How do I apply for pension?"))
+        self.llm.error = None
+        context = self.context("How do I apply for pension?")
+        self.handler.handle(context)
+        self.assertEqual(context["source"], "llm")
+
+    def test_kb_version_is_part_of_the_key(self):
+        self.handler.handle(self.context("How do I apply for pension?"))
+        self.handler.retriever = KnowledgeRetriever(KB, version=2)
+        self.handler.handle(self.context("How do I apply for pension?"))
+        self.assertEqual(self.llm.calls, 2)
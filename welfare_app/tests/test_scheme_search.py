@@ -0,0 +1,108 @@
+from django.test import SimpleTestCase
+
+from welfare_app.services.ai_controller import AIController
+from welfare_app.services.handlers import CitizenHandler
+from welfare_app.services.knowledge_retriever import KnowledgeRetriever
+from welfare_app.services.scheme_search import (
+    SchemeSearchIndex,
+    _field_weight,
+    tokenize,
+)
+from welfare_app.tests.fakes import FakeLLM
+
+SCHEMES = [
+    {
+        "scheme_id": "S1",
+        "scheme_name": "Old Age Pension",
+        "category": "Pension",
+        "description": "Monthly support for senior citizens",
+    },
+    {
+        "scheme_id": "S2",
+        "scheme_name": "Widow Support",
+        "category": "Women",
+        "description": "Pension for widows",
+    },
+    {
+        "scheme_id": "S3",
+        "scheme_name": "Girl Child Scholarship",
+        "category": "Education",
+        "eligibility": "Girls studying in classes 8 to 12",
+    },
+]
+
+
+class TokenizeTests(SimpleTestCase):
+    def test_stopwords_are_dropped_and_plurals_folded(self):
+        self.assertEqual(
+            tokenize("What are the Pensions for widows?"), ["pension", "widow"]
+        )
+
+    def test_devanagari_words_stay_whole(self):
+        self.assertEqual(
+            tokenize("वृद्धावस्था पेंशन के लिए।"), ["वृद्धावस्था", "पेंशन"]
+        )
+
+
+class FieldWeightTests(SimpleTestCase):
+    def test_language_variants_share_the_base_weight(self):
+        for key, base in [
+            ("scheme_name_hi", "scheme_name"),
+            ("scheme_name_mr", "scheme_name"),
+            ("name_hi", "name"),
+            ("description_marathi", "description"),
+        ]:
+            self.assertEqual(_field_weight(key), _field_weight(base))
+            self.assertGreater(_field_weight(key), 0)
+
+    def test_unlisted_fields_are_not_indexed(self):
+        self.assertEqual(_field_weight("scheme_id"), 0.0)
+        self.assertEqual(_field_weight("category_id"), 0.0)
+
+
+class SchemeSearchIndexTests(SimpleTestCase):
+    def test_finds_a_scheme_by_its_hindi_name(self):
+        index = SchemeSearchIndex(
+            [
+                {"scheme_id": "S1", "scheme_name": "Old Age Pension"},
+                {
+                    "scheme_id": "S2",
+                    "scheme_name": "Girl Child Scholarship",
+                    "scheme_name_hi": "कन्या छात्रवृत्ति",
+                },
+            ]
+        )
+        results = index.search("छात्रवृत्ति")
+        self.assertEqual([scheme["scheme_id"] for scheme in results], ["S2"])
+
+    def test_name_matches_rank_above_description_matches(self):
+        index = SchemeSearchIndex(SCHEMES)
+        results = index.search("pension")
+        self.assertEqual([scheme["scheme_id"] for scheme in results], ["S1", "S2"])
+
+    def test_results_are_limited_to_k(self):
+        index = SchemeSearchIndex(SCHEMES)
+        self.assertEqual(len(index.search("pension scholarship girls", k=2)), 2)
+
+    def test_no_matching_terms_returns_nothing(self):
+        index = SchemeSearchIndex(SCHEMES)
+        self.assertEqual(index.search("the and of"), [])
+        self.assertEqual(index.search("tractor"), [])
+        self.assertEqual(SchemeSearchIndex([]).search("pension"), [])
+
+
+class CitizenPromptTests(SimpleTestCase):
+    def prompt(self, query):
+        handler = CitizenHandler(KnowledgeRetriever({"schemes": SCHEMES}), FakeLLM())
+        context = AIController().analyze(query, language_override="English")
+        return handler.build_messages(context)[1]["content"]
+
+    def test_only_matching_schemes_are_sent(self):
+        prompt = self.prompt("scholarship for girls")
+        self.assertIn("Girl Child Scholarship", prompt)
+        self.assertNotIn("Old Age Pension", prompt)
+
+    def test_default_schemes_are_sent_when_nothing_matches(self):
+        prompt = self.prompt("tractor subsidy")
+        for scheme in SCHEMES:
+            self.assertIn(scheme["scheme_name"], prompt)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.session_store import SessionLocks
+
+
+class SessionLocksTests(SimpleTestCase):
+    def test_threads_and_coroutines_run_in_arrival_order(self):
+        locks = SessionLocks()
+        order = []
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever)
+        loop_thread.start()
+
+        def in_thread(n):
+            with locks.hold("s"):
+                order.append(n)
+
+        async def in_loop(n):
+            async with locks.ahold("s"):
+                order.append(n)
+
+        def queued():
+            return locks._entries["s"].users
+
+        try:
+            futures, threads = [], []
+            with locks.hold("s"):
+                for n in range(8):
+                    if n % 2:
+                        futures.append(
+                            asyncio.run_coroutine_threadsafe(in_loop(n), loop)
+                        )
+                    else:
+                        threads.append(threading.Thread(target=in_thread, args=(n,)))
+                        threads[-1].start()
+                    # Wait until this request is queued before sending the next
+                    while queued() != n + 2:
+                        time.sleep(0.001)
+            for thread in threads:
+                thread.join()
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+
+        self.assertEqual(order, list(range(8)))
+        self.assertEqual(locks.get_stats(), {"active": 0, "contended": 8})
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        locks = SessionLocks()
+
+        async def run():
+            async with locks.ahold("s"):
+                waiter = asyncio.ensure_future(locks.ahold("s").__aenter__())
+                await asyncio.sleep(0.01)
+                waiter.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await waiter
+            async with locks.ahold("s"):
+                pass
+
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertEqual(locks.get_stats()["active"], 0)
+
+    def test_waiter_cancelled_after_the_handoff_passes_the_lock_on(self):
+        locks = SessionLocks()
+
+        async def run():
+            ctx = locks.ahold("s")
+            await ctx.__aenter__()
+            waiter = asyncio.ensure_future(locks.ahold("s").__aenter__())
+            await asyncio.sleep(0.01)
+            # Release (granting the waiter) and cancel it before it resumes
+            await ctx.__aexit__(None, None, None)
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            async with locks.ahold("s"):
+                pass
+
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+        self.assertEqual(locks.get_stats()["active"], 0)
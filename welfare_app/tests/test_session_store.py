@@ -0,0 +1,101 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from welfare_app.services.session_store import InMemorySessionStore
+
+CONTEXT = {"language": "English", "persona": "citizen", "intent": "general"}
+
+
+def walked_totals(store):
+    turns = [t for s in store._sessions.values() for t in s.turns]
+    return len(turns), sum(t.size_bytes() for t in turns)
+
+
+class InMemorySessionStoreStatsTests(SimpleTestCase):
+    def test_totals_follow_drops_evictions_and_clears(self):
+        store = InMemorySessionStore(max_turns=3, max_sessions=2, idle_ttl=3600)
+        for i in range(5):
+            store.append("a", f"question {i}", "answer" * i, CONTEXT)
+        store.append("b", "q", "a", CONTEXT)
+        store.append("c", "q", "a", CONTEXT)  # evicts "a"
+        store.clear("b")
+        stats = store.get_stats()
+        self.assertEqual(
+            (stats["turns"], stats["approx_memory_bytes"]), walked_totals(store)
+        )
+        self.assertEqual(stats["sessions"], 1)
+
+        store.idle_ttl = 0
+        time.sleep(0.01)
+        stats = store.get_stats()
+        self.assertEqual((stats["turns"], stats["approx_memory_bytes"]), (0, 0))
+
+    def test_stats_while_appending(self):
+        store = InMemorySessionStore(max_turns=50)
+        stop = threading.Event()
+
+        def append():
+            while not stop.is_set():
+                store.append("busy", "q", "a", CONTEXT)
+
+        writer = threading.Thread(target=append)
+        writer.start()
+        try:
+            for _ in range(200):
+                store.get_stats()
+        finally:
+            stop.set()
+            writer.join()
+
+
+class InMemorySessionStoreTests(SimpleTestCase):
+    def test_history_is_returned_oldest_first_with_metadata(self):
+        store = InMemorySessionStore()
+        store.append("s", "q1", "a1", CONTEXT)
+        store.append("s", "q2", "a2", CONTEXT)
+        history = store.get("s")
+        self.assertEqual([t["user"] for t in history], ["q1", "q2"])
+        self.assertLess(history[0]["id"], history[1]["id"])
+        self.assertEqual(
+            history[0]["metadata"],
+            {
+                "original_query": "q1",
+                "language": "English",
+                "persona": "citizen",
+                "intent": "general",
+            },
+        )
+        self.assertEqual(store.get("unknown"), [])
+
+    def test_oldest_turns_are_dropped_past_max_turns(self):
+        store = InMemorySessionStore(max_turns=2)
+        for i in range(4):
+            store.append("s", f"q{i}", "a", CONTEXT)
+        self.assertEqual([t["user"] for t in store.get("s")], ["q2", "q3"])
+        self.assertEqual(store.get_stats()["turns_dropped"], 2)
+
+    def test_least_recently_used_session_is_evicted(self):
+        store = InMemorySessionStore(max_sessions=2)
+        store.append("a", "q", "a", CONTEXT)
+        store.append("b", "q", "a", CONTEXT)
+        store.get("a")  # "b" is now the least recently used
+        store.append("c", "q", "a", CONTEXT)
+        self.assertEqual(store.get("b"), [])
+        self.assertEqual(len(store.get("a")), 1)
+        self.assertEqual(store.get_stats()["lru_evictions"], 1)
+
+    def test_idle_sessions_expire(self):
+        store = InMemorySessionStore(idle_ttl=0.01)
+        store.append("s", "q", "a", CONTEXT)
+        time.sleep(0.02)
+        self.assertEqual(store.get("s"), [])
+        self.assertEqual(store.get_stats()["ttl_evictions"], 1)
+
+    def test_clear_deletes_only_that_session(self):
+        store = InMemorySessionStore()
+        store.append("a", "q", "a", CONTEXT)
+        store.append("b", "q", "a", CONTEXT)
+        store.clear("a")
+        self.assertEqual((store.get("a"), len(store.get("b"))), ([], 1))
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.services.single_flight import SingleFlight, build_single_flight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+
+    def run_concurrently(self, call, callers=4, key="q"):
+        """Start callers, release the leader once the rest are waiting on it"""
+        release = threading.Event()
+        calls = []
+
+        def leader_call():
+            calls.append(1)
+            release.wait(5)
+            return call()
+
+        with ThreadPoolExecutor(callers) as pool:
+            futures = [pool.submit(self.flight.do, key, leader_call)]
+            while self.flight.leaders == 0:
+                time.sleep(0.001)
+            futures += [
+                pool.submit(self.flight.do, key, leader_call)
+                for _ in range(callers - 1)
+            ]
+            while self.flight.coalesced < callers - 1:
+                time.sleep(0.001)
+            release.set()
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(e)
+        return calls, outcomes
+
+    def test_concurrent_identical_calls_share_one_result(self):
+        calls, outcomes = self.run_concurrently(lambda: "answer")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes, ["answer"] * 4)
+        self.assertEqual(
+            self.flight.get_stats(),
+            {"in_flight": 0, "leaders": 1, "coalesced": 3, "coalesced_rate": 0.75},
+        )
+
+    def test_waiters_get_the_leaders_exception(self):
+        error = RuntimeError("LLM down")
+
+        def fail():
+            raise error
+
+        calls, outcomes = self.run_concurrently(fail)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(outcomes, [error] * 4)
+
+    def test_sequential_calls_are_not_coalesced(self):
+        self.assertEqual(self.flight.do("q", lambda: 1), 1)
+        self.assertEqual(self.flight.do("q", lambda: 2), 2)
+        self.assertEqual(self.flight.get_stats()["leaders"], 2)
+
+    def test_waiter_takes_over_when_the_async_leader_is_cancelled(self):
+        calls = []
+
+        async def slow():
+            calls.append("leader")
+            await asyncio.sleep(60)
+
+        async def fast():
+            calls.append("waiter")
+            return "answer"
+
+        async def run():
+            leader = asyncio.ensure_future(self.flight.ado("q", slow))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(self.flight.ado("q", fast))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        self.assertEqual(asyncio.run(run()), "answer")
+        self.assertEqual(calls, ["leader", "waiter"])
+        self.assertEqual(self.flight.get_stats()["in_flight"], 0)
+
+    @override_settings(LLM_COALESCE_REQUESTS=False)
+    def test_coalescing_can_be_disabled(self):
+        self.assertIsNone(build_single_flight())
@@ -0,0 +1,80 @@
+import json
+import threading
+from unittest import mock
+
+import groq
+from django.test import SimpleTestCase, override_settings
+
+from benchmarks.stub_llm_server import StubConfig, build_parser, make_server
+from welfare_app.services.llm_client import LLMClient
+
+
+class StubLLMServerTests(SimpleTestCase):
+    """The load-test stub must speak the Groq wire format the client uses"""
+
+    def start_stub(self, *args):
+        config = StubConfig(
+            build_parser().parse_args(
+                ["--latency", "fixed:0", "--token-interval", "0", *args]
+            )
+        )
+        server = make_server("127.0.0.1", 0, config)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        client = LLMClient(
+            "test-key",
+            base_url=f"http://127.0.0.1:{server.server_address[1]}",
+            retry_base_delay=0,
+        )
+        return config, client
+
+    def test_completion(self):
+        config, client = self.start_stub("--completion-tokens", "5")
+        response = client.complete(
+            "citizen", model="stub", messages=[{"role": "user", "content": "hi"}]
+        )
+        self.assertEqual(len(response.choices[0].message.content.split()), 5)
+        self.assertEqual(response.usage.completion_tokens, 5)
+        self.assertEqual(config.stats()["requests"], 1)
+
+    def test_streaming(self):
+        config, client = self.start_stub("--completion-tokens", "4")
+        stream = client.stream("citizen", model="stub", messages=[])
+        text = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+        self.assertEqual(len(text.split()), 4)
+        self.assertEqual(config.stats()["streams"], 1)
+
+    def test_injected_errors_are_retried(self):
+        config, client = self.start_stub("--error-rate", "1", "--error-status", "503")
+        with self.assertRaises(groq.APIStatusError):
+            client.complete("citizen", model="stub", messages=[])
+        self.assertEqual(config.stats()["errors"], client.max_retries + 1)
+        self.assertEqual(client.get_stats()["retries"], client.max_retries)
+
+
+class ServerTimingTests(SimpleTestCase):
+    def post(self):
+        with mock.patch("welfare_app.views.get_chatbot_instance") as chatbot:
+            chatbot.return_value.chat.return_value = {
+                "response": "hi",
+                "language": "English",
+                "persona": "citizen",
+                "intent": "general_query",
+                "stages": {"analyze": 0.001, "llm": 0.25},
+            }
+            return self.client.post(
+                "/api/chat/",
+                json.dumps({"message": "hello"}),
+                content_type="application/json",
+            )
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_stage_durations_in_milliseconds(self):
+        self.assertEqual(
+            self.post()["Server-Timing"], "analyze;dur=1.000, llm;dur=250.000"
+        )
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_header_is_off_by_default(self):
+        self.assertFalse(self.post().has_header("Server-Timing"))
@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from welfare_app.services import chatbot as chatbot_module
+
+from .fakes import FakeLLM, completion, make_chatbot
+
+
+class TrackingLLM(FakeLLM):
+    """Records how many calls overlap"""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def complete(self, persona, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return completion(kwargs["messages"][-1]["content"])
+
+
+class ChatbotSingletonTests(SimpleTestCase):
+    def test_concurrent_first_requests_build_one_chatbot(self):
+        built = []
+
+        def slow_build():
+            time.sleep(0.05)
+            built.append(object())
+            return built[-1]
+
+        with mock.patch.object(chatbot_module, "_chatbot_instance", None):
+            with mock.patch.object(chatbot_module, "SahayakChatbot", slow_build):
+                with ThreadPoolExecutor(8) as pool:
+                    instances = list(
+                        pool.map(
+                            lambda _: chatbot_module.get_chatbot_instance(), range(8)
+                        )
+                    )
+        self.assertEqual(len(built), 1)
+        self.assertTrue(all(instance is built[0] for instance in instances))
+
+
+class ConcurrentChatTests(SimpleTestCase):
+    def chat_concurrently(self, session_ids):
+        llm = TrackingLLM(delay=0.02)
+        chatbot = make_chatbot(self, llm=llm)
+        with ThreadPoolExecutor(len(session_ids)) as pool:
+            futures = [
+                pool.submit(
+                    chatbot.chat,
+                    f"tell me about pensions {i}",
+                    session_id=session_id,
+                    use_cache=False,
+                )
+                for i, session_id in enumerate(session_ids)
+            ]
+            for future in futures:
+                future.result()
+        return chatbot, llm
+
+    def test_turns_of_one_session_run_one_at_a_time(self):
+        chatbot, llm = self.chat_concurrently(["s1"] * 4)
+        self.assertEqual(llm.max_active, 1)
+        self.assertEqual(len(chatbot.get_conversation_history("s1")), 4)
+
+    def test_different_sessions_run_in_parallel(self):
+        chatbot, llm = self.chat_concurrently(["s1", "s2", "s3", "s4"])
+        self.assertGreater(llm.max_active, 1)
+        for session_id in ("s1", "s2", "s3", "s4"):
+            history = chatbot.get_conversation_history(session_id)
+            self.assertEqual(len(history), 1)
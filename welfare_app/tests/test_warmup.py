@@ -0,0 +1,87 @@
+import os
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase, override_settings
+
+from welfare_app.apps import _is_server_process
+from welfare_app.services import warmup
+
+from .fakes import make_chatbot
+
+
+class ServerProcessTests(SimpleTestCase):
+    def is_server(self, *argv, run_main=None):
+        environ = {"RUN_MAIN": run_main} if run_main else {}
+        with mock.patch("sys.argv", list(argv)), mock.patch.dict(
+            "os.environ", environ, clear=True
+        ):
+            return _is_server_process()
+
+    def test_servers_warm_up(self):
+        self.assertTrue(self.is_server("/venv/bin/gunicorn", "tmcm.wsgi:application"))
+        self.assertTrue(self.is_server("/venv/bin/uvicorn", "tmcm.asgi:application"))
+        self.assertTrue(self.is_server("/venv/lib/uvicorn/__main__.py", "app"))
+        self.assertTrue(self.is_server("manage.py", "runserver", "--noreload"))
+        self.assertTrue(self.is_server("manage.py", "runserver", run_main="true"))
+
+    def test_other_programs_skip_it(self):
+        self.assertFalse(self.is_server("manage.py", "migrate"))
+        self.assertFalse(self.is_server("/venv/bin/django-admin", "migrate"))
+        self.assertFalse(self.is_server("manage.py", "runserver"))
+        self.assertFalse(self.is_server("/venv/bin/pytest"))
+        self.assertFalse(self.is_server("/venv/bin/celery", "worker"))
+        self.assertFalse(self.is_server("scripts/export.py"))
+
+
+class WarmUpTests(SimpleTestCase):
+    def setUp(self):
+        self.chatbot = make_chatbot(self)
+        patcher = mock.patch(
+            "welfare_app.services.chatbot.get_chatbot_instance",
+            return_value=self.chatbot,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # warm_up() keeps its report in a module global
+        report = mock.patch.object(warmup, "_report", None)
+        report.start()
+        self.addCleanup(report.stop)
+
+    def test_first_request_caches_are_built(self):
+        self.chatbot.context_cache.clear()
+        warmup.warm_up(freeze=False)
+        # Three personas in three languages
+        self.assertEqual(self.chatbot.context_cache.get_stats()["entries"], 9)
+        self.assertIsNotNone(self.chatbot.fast_path._names)
+
+    def test_report(self):
+        report = warmup.warm_up(freeze=False)
+        self.assertEqual(report["pid"], os.getpid())
+        self.assertEqual(report["kb_version"], self.chatbot.kb_version)
+        self.assertIn("rss_mb", report["after"])
+        stats = warmup.get_warmup_stats()
+        self.assertEqual(stats["warmup"], report)
+        self.assertFalse(stats["preloaded"])
+
+    def test_forked_workers_report_the_preload(self):
+        report = warmup.warm_up(freeze=False)
+        with mock.patch("os.getpid", return_value=report["pid"] + 1):
+            self.assertTrue(warmup.get_warmup_stats()["preloaded"])
+
+
+class AppReadyTests(SimpleTestCase):
+    def ready(self, is_server=True):
+        with mock.patch(
+            "welfare_app.apps._is_server_process", return_value=is_server
+        ), mock.patch("welfare_app.services.warmup.warm_up") as warm_up:
+            apps.get_app_config("welfare_app").ready()
+        return warm_up
+
+    def test_warm_up_is_opt_in(self):
+        self.ready().assert_not_called()
+
+    @override_settings(WARMUP_ON_START=True, WARMUP_GC_FREEZE=False)
+    def test_servers_warm_up_when_enabled(self):
+        self.ready().assert_called_once_with(freeze=False)
+        self.ready(is_server=False).assert_not_called()
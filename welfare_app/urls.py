@@ -4,15 +4,42 @@ from . import views
 urlpatterns = [
     # Main chat endpoint
     path("chat/", views.chat_api, name="chat"),
+    path("chat/batch/", views.chat_batch_api, name="chat_batch"),
+    path("chat/async/", views.chat_api_async, name="chat_async"),
+    path("chat/stream/", views.chat_stream_api, name="chat_stream"),
     # Greeting message
     path("greeting/", views.get_greeting, name="greeting"),
     # Statistics
     path("stats/", views.get_stats, name="stats"),
+    path("metrics/", views.metrics, name="metrics"),
+    path("profiles/", views.profiles, name="profiles"),
+    path("profiles/<str:name>/", views.profile_file, name="profile_file"),
+    # Precomputed analytics
+    path("analytics/summary/", views.analytics_summary, name="analytics_summary"),
+    path("analytics/wards/", views.analytics_wards, name="analytics_wards"),
+    path(
+        "analytics/wards/<str:ward_id>/",
+        views.analytics_ward_detail,
+        name="analytics_ward_detail",
+    ),
+    path("analytics/schemes/", views.analytics_schemes, name="analytics_schemes"),
+    path(
+        "analytics/schemes/<str:scheme_id>/",
+        views.analytics_scheme_detail,
+        name="analytics_scheme_detail",
+    ),
+    path(
+        "analytics/bottlenecks/",
+        views.analytics_bottlenecks,
+        name="analytics_bottlenecks",
+    ),
+    path("analytics/budget/", views.analytics_budget, name="analytics_budget"),
     # Conversation history
     path("history/", views.get_conversation_history, name="history"),
     path("history/clear/", views.clear_history, name="clear_history"),
     # Health check
     path("health/", views.health_check, name="health"),
+    path("ready/", views.readiness_check, name="ready"),
     # Available languages
     path("languages/", views.get_languages, name="languages"),
 ]
@@ -1,16 +1,119 @@
 from django.shortcuts import render
 import json
-from django.http import JsonResponse
+from functools import wraps
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils.cache import (
+    add_never_cache_headers,
+    get_conditional_response,
+    patch_cache_control,
+)
+from django.utils.http import http_date
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.views import View
-from django.utils.decorators import method_decorator 
+from django.utils.decorators import method_decorator
+
+from .services import aget_chatbot_instance, get_chatbot_instance
+from .services.http_cache import EncodedJSON, EncodedResponseCache
+from .services.profiling import PROFILE_HEADER
+from .services.session_store import PAGE_FIELDS, TURN_FIELDS
+from .services.warmup import get_warmup_stats
+
+# Bodies of /api/greeting/ and /api/stats/, encoded once per KB version
+_encoded_responses = EncodedResponseCache()
+
+# Static bodies, encoded once per process
+_LANGUAGES = EncodedJSON(
+    {
+        "success": True,
+        "languages": [
+            {"code": "1", "name": "English", "native": "English"},
+            {"code": "2", "name": "Hindi", "native": "हिंदी"},
+            {"code": "3", "name": "Marathi", "native": "मराठी"},
+        ],
+    }
+)
+_ALIVE = EncodedJSON({"success": True, "status": "healthy", "service": "Sahayak AI"})
+
+
+def _cached_json(request, encoded: EncodedJSON) -> HttpResponse:
+    """
+    Serve a pre-encoded JSON body with its validators and Cache-Control
+
+    Answers 304 Not Modified when If-None-Match or If-Modified-Since shows
+    the client already has this body.
+    """
+    response = HttpResponse(encoded.body, content_type="application/json")
+    response["ETag"] = encoded.etag
+    if encoded.last_modified is not None:
+        response["Last-Modified"] = http_date(encoded.last_modified)
+    patch_cache_control(
+        response, public=True, max_age=getattr(settings, "HTTP_CACHE_MAX_AGE", 60)
+    )
+    return get_conditional_response(
+        request,
+        etag=encoded.etag,
+        last_modified=encoded.last_modified,
+        response=response,
+    )
+
+
+def _profiled(view):
+    """
+    Profile the view for requests the profiler selects
+
+    Covers request parsing, SahayakChatbot.chat and response encoding.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            profiler = get_chatbot_instance().profiler
+        except Exception:
+            profiler = None  # the view reports the error
+        if profiler is None or not profiler.should_profile(
+            request.headers.get(PROFILE_HEADER)
+        ):
+            return view(request, *args, **kwargs)
+
+        info = {"path": request.path}
+        with profiler.profile(info):
+            response = view(request, *args, **kwargs)
+            info["status"] = response.status_code
+            info["stages"] = getattr(response, "chat_stages", None)
+        return response
+
+    return wrapper
 
-from .services import get_chatbot_instance
+
+def _session_id(body: dict):
+    """
+    The session_id of a request body
+
+    "default" when it is missing or null; None when it is not a string, which
+    callers reject with a 400 (it would fail when history is written).
+    """
+    session_id = body.get("session_id")
+    if session_id is None:
+        return "default"
+    if not isinstance(session_id, str):
+        return None
+    return session_id
+
+
+_INVALID_SESSION_ID = {"success": False, "error": "session_id must be a string"}
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@_profiled
 def chat_api(request):
     """
     Main chat endpoint
@@ -19,7 +122,8 @@ def chat_api(request):
     Body: {
         "message": "user message here",
         "session_id": "optional-session-id",
-        "language": "English|Hindi|Marathi" (optional)
+        "language": "English|Hindi|Marathi" (optional),
+        "use_cache": true (optional, false bypasses the response cache)
     }
 
     Response: {
@@ -34,29 +138,92 @@ def chat_api(request):
         # Parse request body
         body = json.loads(request.body.decode("utf-8"))
         message = body.get("message", "").strip()
-        session_id = body.get("session_id", "default")
+        session_id = _session_id(body)
         language = body.get("language")
+        use_cache = body.get("use_cache", True) is not False
 
         if not message:
             return JsonResponse(
                 {"success": False, "error": "Message is required"}, status=400
             )
+        if session_id is None:
+            return JsonResponse(_INVALID_SESSION_ID, status=400)
 
         # Get chatbot instance and process message
         chatbot = get_chatbot_instance()
-        result = chatbot.chat(message, session_id=session_id, language=language)
+        result = chatbot.chat(
+            message, session_id=session_id, language=language, use_cache=use_cache
+        )
+
+        return _chat_response(result)
 
+    except json.JSONDecodeError:
         return JsonResponse(
-            {
-                "success": True,
-                "response": result["response"],
-                "language": result["language"],
-                "persona": result["persona"],
-                "intent": result["intent"],
-                "language_changed": result.get("language_changed", False),
-            }
+            {"success": False, "error": "Invalid JSON in request body"}, status=400
+        )
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+def _chat_response(result: dict) -> JsonResponse:
+    """Build the JSON response for a chat result"""
+    response = JsonResponse(
+        {
+            "success": True,
+            "response": result["response"],
+            "language": result["language"],
+            "persona": result["persona"],
+            "intent": result["intent"],
+            "language_changed": result.get("language_changed", False),
+        }
+    )
+    if result.get("stages") and getattr(settings, "SERVER_TIMING_HEADER", False):
+        response["Server-Timing"] = _server_timing(result["stages"])
+    # Read by the profiling hook
+    response.chat_stages = result.get("stages")
+    return response
+
+
+def _server_timing(stages: dict) -> str:
+    """Format stage durations (seconds) as a Server-Timing header (milliseconds)"""
+    return ", ".join(
+        f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in stages.items()
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def chat_api_async(request):
+    """
+    Async chat endpoint for ASGI deployments
+
+    POST /api/chat/async/
+    Body and response: same as /api/chat/
+
+    The LLM call is awaited on the AsyncGroq client, so a single ASGI worker
+    can keep many requests in flight. Under WSGI use /api/chat/.
+    """
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+        message = body.get("message", "").strip()
+        session_id = _session_id(body)
+        language = body.get("language")
+        use_cache = body.get("use_cache", True) is not False
+
+        if not message:
+            return JsonResponse(
+                {"success": False, "error": "Message is required"}, status=400
+            )
+        if session_id is None:
+            return JsonResponse(_INVALID_SESSION_ID, status=400)
+
+        chatbot = await aget_chatbot_instance()
+        result = await chatbot.achat(
+            message, session_id=session_id, language=language, use_cache=use_cache
         )
 
+        return _chat_response(result)
+
     except json.JSONDecodeError:
         return JsonResponse(
             {"success": False, "error": "Invalid JSON in request body"}, status=400
@@ -65,6 +232,129 @@ def chat_api(request):
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def chat_batch_api(request):
+    """
+    Batch chat endpoint for IVR/WhatsApp bridges
+
+    POST /api/chat/batch/
+    Body: {
+        "items": [
+            {"message": "...", "session_id": "optional", "language": "optional"},
+            ...
+        ],
+        "use_cache": true (optional)
+    }
+
+    Response: {
+        "success": true,
+        "results": [{"success": true, "response": ..., ...} | {"success": false, "error": ...}]
+    }
+
+    Items are processed concurrently; results are returned in input order and
+    messages of one session are answered in the order given.
+    """
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+        items = body.get("items") if isinstance(body, dict) else body
+        use_cache = (
+            not isinstance(body, dict) or body.get("use_cache", True) is not False
+        )
+
+        if not isinstance(items, list) or not items:
+            return JsonResponse(
+                {"success": False, "error": "items must be a non-empty list"},
+                status=400,
+            )
+
+        max_items = getattr(settings, "CHAT_BATCH_MAX_ITEMS", 50)
+        if len(items) > max_items:
+            return JsonResponse(
+                {"success": False, "error": f"At most {max_items} items per batch"},
+                status=400,
+            )
+
+        chatbot = get_chatbot_instance()
+        results = chatbot.chat_batch(items, use_cache=use_cache)
+
+        return JsonResponse({"success": True, "results": results})
+
+    except json.JSONDecodeError:
+        return JsonResponse(
+            {"success": False, "error": "Invalid JSON in request body"}, status=400
+        )
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def chat_stream_api(request):
+    """
+    Streaming chat endpoint (Server-Sent Events)
+
+    POST /api/chat/stream/
+    Body: same as /api/chat/
+
+    Events:
+        event: meta   data: {"language", "persona", "intent", "language_changed"}
+        event: token  data: {"text": "next chunk of the response"}
+        event: done   data: {"response": "full response"}
+        event: error  data: {"error": "message"}
+
+    Tokens are streamed under both WSGI and ASGI.
+    """
+    try:
+        body = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return JsonResponse(
+            {"success": False, "error": "Invalid JSON in request body"}, status=400
+        )
+
+    message = body.get("message", "").strip()
+    session_id = _session_id(body)
+    language = body.get("language")
+    use_cache = body.get("use_cache", True) is not False
+
+    if not message:
+        return JsonResponse(
+            {"success": False, "error": "Message is required"}, status=400
+        )
+    if session_id is None:
+        return JsonResponse(_INVALID_SESSION_ID, status=400)
+
+    kwargs = {"session_id": session_id, "language": language, "use_cache": use_cache}
+
+    def event_stream():
+        try:
+            chatbot = get_chatbot_instance()
+            for event in chatbot.chat_stream(message, **kwargs):
+                yield _sse_event(event["event"], event["data"])
+        except Exception as e:
+            yield _sse_event("error", {"error": str(e)})
+
+    async def aevent_stream():
+        try:
+            chatbot = await aget_chatbot_instance()
+            async for event in chatbot.achat_stream(message, **kwargs):
+                yield _sse_event(event["event"], event["data"])
+        except Exception as e:
+            yield _sse_event("error", {"error": str(e)})
+
+    # Under ASGI, Django sends a sync iterator only once it is exhausted
+    events = aevent_stream() if isinstance(request, ASGIRequest) else event_stream()
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_greeting(request):
@@ -74,13 +364,21 @@ def get_greeting(request):
     GET /api/greeting/?language=English
     """
     try:
-        language = request.GET.get("language", "English")
         chatbot = get_chatbot_instance()
-        greeting = chatbot.get_greeting(language)
-
-        return JsonResponse(
-            {"success": True, "greeting": greeting, "language": language}
+        # One cache entry and ETag per supported language, whatever the spelling
+        language = chatbot.set_language(request.GET.get("language", "English"))
+        snapshot = chatbot.snapshot
+        encoded = _encoded_responses.get(
+            ("greeting", language),
+            snapshot.version,
+            lambda: {
+                "success": True,
+                "greeting": chatbot.get_greeting(language),
+                "language": language,
+            },
+            last_modified=snapshot.modified,
         )
+        return _cached_json(request, encoded)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
@@ -91,37 +389,327 @@ def get_stats(request):
     """
     Get knowledge base statistics
 
-    GET /api/stats/
+    GET /api/stats/            (cacheable, changes only with the KB version)
+    GET /api/stats/?runtime=1  (adds live cache, session, LLM and process stats)
     """
     try:
         chatbot = get_chatbot_instance()
-        stats = chatbot.get_stats()
+        snapshot = chatbot.snapshot
+        if request.GET.get("runtime", "").lower() not in ("1", "true", "yes"):
+            encoded = _encoded_responses.get(
+                "stats",
+                snapshot.version,
+                lambda: {
+                    "success": True,
+                    "stats": snapshot.retriever.get_stats(),
+                    "kb_version": snapshot.version,
+                },
+                last_modified=snapshot.modified,
+            )
+            return _cached_json(request, encoded)
 
-        return JsonResponse({"success": True, "stats": stats})
+        response = JsonResponse(
+            {
+                "success": True,
+                "stats": snapshot.retriever.get_stats(),
+                "kb_version": snapshot.version,
+                "cache": chatbot.get_cache_stats(),
+                "sessions": chatbot.get_history_stats(),
+                "llm": chatbot.get_llm_stats(),
+                "fast_path": chatbot.get_fast_path_stats(),
+                "profiling": chatbot.get_profiling_stats(),
+                "http_cache": _encoded_responses.get_stats(),
+                "process": get_warmup_stats(),
+            }
+        )
+        add_never_cache_headers(response)
+        return response
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+
+def _analytics_request(request, build):
+    """
+    Run an analytics view against the current KB snapshot
+
+    build(analytics, request) returns the response payload, or None for 404.
+    """
+    try:
+        chatbot = get_chatbot_instance()
+        retriever = chatbot.retriever
+        analytics = retriever.get_analytics()
+        if analytics is None:
+            return JsonResponse(
+                {
+                    "success": False,
+                    "error": "Analytics are unavailable (NumPy missing)",
+                },
+                status=503,
+            )
+        payload = build(analytics, request)
+        if payload is None:
+            return JsonResponse({"success": False, "error": "Not found"}, status=404)
+        return JsonResponse(
+            {"success": True, "kb_version": retriever.version, **payload}
+        )
+    except ValueError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
 
+def _sort_params(request) -> dict:
+    limit = request.GET.get("limit")
+    return {
+        "sort": request.GET.get("sort"),
+        "descending": request.GET.get("order", "asc").lower() == "desc",
+        "limit": int(limit) if limit else None,
+    }
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_summary(request):
+    """
+    City-wide coverage, approval, budget and grievance figures
+
+    GET /api/analytics/summary/
+    """
+    return _analytics_request(
+        request, lambda analytics, request: {"summary": analytics.summary}
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_wards(request):
+    """
+    Per-ward aggregates
+
+    GET /api/analytics/wards/?sort=coverage_ratio&order=asc&limit=10
+    """
+    return _analytics_request(
+        request,
+        lambda analytics, request: {
+            "wards": analytics.get_wards(**_sort_params(request))
+        },
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_ward_detail(request, ward_id):
+    """
+    Aggregates for one ward
+
+    GET /api/analytics/wards/<ward_id>/
+    """
+
+    def build(analytics, request):
+        ward = analytics.get_ward(ward_id)
+        return {"ward": ward} if ward else None
+
+    return _analytics_request(request, build)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_schemes(request):
+    """
+    Per-scheme utilization, approval and grievance aggregates
+
+    GET /api/analytics/schemes/?category=Health&sort=budget_utilization&order=asc
+    """
+    return _analytics_request(
+        request,
+        lambda analytics, request: {
+            "schemes": analytics.get_schemes(
+                category=request.GET.get("category"), **_sort_params(request)
+            )
+        },
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_scheme_detail(request, scheme_id):
+    """
+    Aggregates for one scheme
+
+    GET /api/analytics/schemes/<scheme_id>/
+    """
+
+    def build(analytics, request):
+        scheme = analytics.get_scheme(scheme_id)
+        return {"scheme": scheme} if scheme else None
+
+    return _analytics_request(request, build)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_bottlenecks(request):
+    """
+    Top-N priority wards, coverage gaps, grievance backlogs and weak schemes
+
+    GET /api/analytics/bottlenecks/?n=5
+    """
+
+    def build(analytics, request):
+        n = request.GET.get("n")
+        return {"bottlenecks": analytics.get_bottlenecks(int(n) if n else None)}
+
+    return _analytics_request(request, build)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def analytics_budget(request):
+    """
+    Allocated and spent budget per scheme category, in ₹ crores
+
+    GET /api/analytics/budget/
+    """
+    return _analytics_request(
+        request,
+        lambda analytics, request: {"budget": analytics.budget_by_category},
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Request latency, token and cache metrics in Prometheus text format
+
+    GET /api/metrics/
+    """
+    text = get_chatbot_instance().render_metrics()
+    if text is None:
+        return HttpResponse("Metrics are disabled\n", status=404)
+    return HttpResponse(text, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _profiler_request(request):
+    """
+    The profiler for a profile endpoint request, or an error response
+
+    Profiles expose code paths and timings, so these endpoints need the same
+    signed header that turns profiling on for a request.
+    """
+    profiler = get_chatbot_instance().profiler
+    if profiler is None:
+        return None, JsonResponse(
+            {"success": False, "error": "Profiling is disabled"}, status=404
+        )
+    if not profiler.verify_token(request.headers.get(PROFILE_HEADER)):
+        return None, JsonResponse(
+            {"success": False, "error": f"A valid {PROFILE_HEADER} header is required"},
+            status=403,
+        )
+    return profiler, None
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def profiles(request):
+    """
+    Recent slow chat requests with their profiles, newest first
+
+    GET /api/profiles/?min_ms=500&limit=50
+    Header: X-Sahayak-Profile (python manage.py profile_token)
+    """
+    profiler, error = _profiler_request(request)
+    if error:
+        return error
+    try:
+        min_ms = float(request.GET.get("min_ms", 0))
+        limit = int(request.GET.get("limit", 50))
+    except ValueError:
+        return JsonResponse(
+            {"success": False, "error": "min_ms and limit must be numbers"}, status=400
+        )
+
+    entries = profiler.list_profiles(min_duration=min_ms / 1000, limit=limit)
+    for entry in entries:
+        entry["url"] = request.build_absolute_uri(f"{entry['profile']}/")
+    return JsonResponse(
+        {"success": True, "profiles": entries, "profiling": profiler.get_stats()}
+    )
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def profile_file(request, name):
+    """
+    Download a saved profile (.pstats for cProfile, .folded for stack samples)
+
+    GET /api/profiles/<name>/
+    """
+    profiler, error = _profiler_request(request)
+    if error:
+        return error
+    path = profiler.profile_path(name)
+    if path is None:
+        return JsonResponse(
+            {"success": False, "error": "Profile not found"}, status=404
+        )
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def get_conversation_history(request):
     """
-    Get conversation history for a session
+    Get one page of conversation history for a session, oldest turn first
 
-    GET /api/history/?session_id=xxx
+    GET /api/history/?session_id=xxx&limit=50&before=<id>&after=<id>&since=<unix time>
+    &fields=id,user,assistant,timestamp,metadata
     """
+    try:
+        params = _history_params(request)
+    except ValueError as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
     try:
         session_id = request.GET.get("session_id", "default")
         chatbot = get_chatbot_instance()
-        history = chatbot.get_conversation_history(session_id)
+        page = chatbot.get_history_page(session_id, **params)
 
-        return JsonResponse(
-            {"success": True, "session_id": session_id, "history": history}
-        )
+        return JsonResponse({"success": True, "session_id": session_id, **page})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
 
 
+def _history_params(request) -> dict:
+    def number(name, cast):
+        value = request.GET.get(name)
+        if value in (None, ""):
+            return None
+        try:
+            return cast(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number") from None
+
+    limit = number("limit", int)
+    if limit is None:
+        limit = getattr(settings, "HISTORY_PAGE_SIZE", 50)
+    elif limit < 1:
+        raise ValueError("limit must be at least 1")
+    fields = request.GET.get("fields")
+    if fields:
+        fields = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = set(fields) - set(TURN_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return {
+        "limit": min(limit, getattr(settings, "HISTORY_MAX_PAGE_SIZE", 200)),
+        "before": number("before", int),
+        "after": number("after", int),
+        "since": number("since", float),
+        "fields": fields or PAGE_FIELDS,
+    }
+
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def clear_history(request):
@@ -133,7 +721,9 @@ def clear_history(request):
     """
     try:
         body = json.loads(request.body.decode("utf-8"))
-        session_id = body.get("session_id", "default")
+        session_id = _session_id(body)
+        if session_id is None:
+            return JsonResponse(_INVALID_SESSION_ID, status=400)
 
         chatbot = get_chatbot_instance()
         chatbot.clear_conversation_history(session_id)
@@ -149,28 +739,53 @@ def clear_history(request):
 @require_http_methods(["GET"])
 def health_check(request):
     """
-    Health check endpoint
+    Liveness probe: answers in constant time without touching the chatbot
 
     GET /api/health/
     """
+    response = HttpResponse(_ALIVE.body, content_type="application/json")
+    add_never_cache_headers(response)
+    return response
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def readiness_check(request):
+    """
+    Readiness probe: the knowledge base is loaded and the LLM is reachable
+
+    GET /api/ready/
+
+    503 until the knowledge base is loaded (the first call loads it). While
+    the LLM circuit breaker is open the status is "degraded": answers come
+    from the knowledge base. That is a 503 too if READY_REQUIRES_LLM is set.
+    """
     try:
         chatbot = get_chatbot_instance()
-        stats = chatbot.get_stats()
-
-        return JsonResponse(
+        snapshot = chatbot.snapshot
+        stats = snapshot.retriever.get_stats()
+        breaker_state = chatbot.llm.breaker.state
+        llm_available = breaker_state != "open"
+        ready = llm_available or not getattr(settings, "READY_REQUIRES_LLM", False)
+        response = JsonResponse(
             {
-                "success": True,
-                "status": "healthy",
+                "success": ready,
+                "status": "ready" if llm_available else "degraded",
                 "service": "Sahayak AI",
                 "knowledge_base_loaded": True,
+                "kb_version": snapshot.version,
                 "schemes_count": stats["total_schemes"],
                 "wards_count": stats["total_wards"],
-            }
+                "llm": {"available": llm_available, "breaker_state": breaker_state},
+            },
+            status=200 if ready else 503,
         )
     except Exception as e:
-        return JsonResponse(
-            {"success": False, "status": "unhealthy", "error": str(e)}, status=500
+        response = JsonResponse(
+            {"success": False, "status": "unavailable", "error": str(e)}, status=503
         )
+    add_never_cache_headers(response)
+    return response
 
 
 @csrf_exempt
@@ -181,13 +796,4 @@ def get_languages(request):
 
     GET /api/languages/
     """
-    return JsonResponse(
-        {
-            "success": True,
-            "languages": [
-                {"code": "1", "name": "English", "native": "English"},
-                {"code": "2", "name": "Hindi", "native": "हिंदी"},
-                {"code": "3", "name": "Marathi", "native": "मराठी"},
-            ],
-        }
-    )
\ No newline at end of file
+    return _cached_json(request, _LANGUAGES)